@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.activitymodel import Activity, ActivityCreate, ActivityUpdate
 from services.activitycrud import ActivityCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/activities", tags=["activities"])
 
@@ -19,7 +21,7 @@ async def create_activity(activity: ActivityCreate):
     - **active**: Active status (default: true)
     """
     try:
-        result = ActivityCRUD.create_activity(activity)
+        result = await run_db(ActivityCRUD.create_activity, activity)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -31,7 +33,7 @@ async def get_activity(activity_id: int):
     Retrieve a single activity by ID.
     """
     try:
-        activity = ActivityCRUD.get_activity(activity_id)
+        activity = await run_db(ActivityCRUD.get_activity, activity_id)
         if not activity:
             raise HTTPException(status_code=404, detail="Activity not found")
         return activity
@@ -40,13 +42,32 @@ async def get_activity(activity_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[Activity])
+async def get_activities_by_ids(request: IdList):
+    """
+    Retrieve many activities by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Activity IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(ActivityCRUD.get_activities_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Activity])
-async def get_all_activities():
+async def get_all_activities(multi: IdsParams = Depends()):
     """
     Retrieve all activities.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those activities, in that order.
     """
     try:
-        activities = ActivityCRUD.get_all_activities()
+        if multi.ids is not None:
+            records = await run_db(ActivityCRUD.get_activities_by_ids, multi.ids)
+            return records
+        
+        activities = await run_db(ActivityCRUD.get_all_activities)
         return activities
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -57,7 +78,7 @@ async def get_activities_by_organization(org_id: int):
     Retrieve all activities for a specific organization.
     """
     try:
-        activities = ActivityCRUD.get_activities_by_org(org_id)
+        activities = await run_db(ActivityCRUD.get_activities_by_org, org_id)
         return activities
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -72,7 +93,7 @@ async def update_activity(activity_id: int, activity: ActivityUpdate):
     - All other fields are optional
     """
     try:
-        result = ActivityCRUD.update_activity(activity_id, activity)
+        result = await run_db(ActivityCRUD.update_activity, activity_id, activity)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -86,7 +107,7 @@ async def delete_activity(activity_id: int):
     Delete an activity by ID.
     """
     try:
-        result = ActivityCRUD.delete_activity(activity_id)
+        result = await run_db(ActivityCRUD.delete_activity, activity_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 from model.activitytrainermodel import ActivityTrainer, ActivityTrainerCreate, ActivityTrainerUpdate
 from services.activitytrainercrud import ActivityTrainerCRUD
+from utils.executor import run_db
 
 router = APIRouter(prefix="/activitytrainers", tags=["activitytrainers"])
 
@@ -16,7 +17,7 @@ async def create_activity_trainer(activity_trainer: ActivityTrainerCreate):
     - **role**: Trainer role for this activity (optional)
     """
     try:
-        result = ActivityTrainerCRUD.create_activity_trainer(activity_trainer)
+        result = await run_db(ActivityTrainerCRUD.create_activity_trainer, activity_trainer)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -34,7 +35,7 @@ async def get_activity_trainers_by_organization(org_id: int):
     - **org_id**: Organization ID (required)
     """
     try:
-        activity_trainers = ActivityTrainerCRUD.get_activity_trainers_by_org(org_id)
+        activity_trainers = await run_db(ActivityTrainerCRUD.get_activity_trainers_by_org, org_id)
         return activity_trainers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -45,7 +46,7 @@ async def get_trainers_by_activity(activity_id: int):
     Retrieve all trainers assigned to a specific activity.
     """
     try:
-        trainers = ActivityTrainerCRUD.get_trainers_by_activity(activity_id)
+        trainers = await run_db(ActivityTrainerCRUD.get_trainers_by_activity, activity_id)
         return trainers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -56,7 +57,7 @@ async def get_activities_by_trainer(trainer_id: int):
     Retrieve all activities assigned to a specific trainer.
     """
     try:
-        activities = ActivityTrainerCRUD.get_activities_by_trainer(trainer_id)
+        activities = await run_db(ActivityTrainerCRUD.get_activities_by_trainer, trainer_id)
         return activities
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,7 +68,7 @@ async def get_all_activity_trainers():
     Retrieve all activity-trainer relationships.
     """
     try:
-        activity_trainers = ActivityTrainerCRUD.get_all_activity_trainers()
+        activity_trainers = await run_db(ActivityTrainerCRUD.get_all_activity_trainers)
         return activity_trainers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -78,7 +79,7 @@ async def get_activity_trainer(activity_id: int, trainer_id: int):
     Retrieve a specific activity-trainer relationship.
     """
     try:
-        activity_trainer = ActivityTrainerCRUD.get_activity_trainer(activity_id, trainer_id)
+        activity_trainer = await run_db(ActivityTrainerCRUD.get_activity_trainer, activity_id, trainer_id)
         if not activity_trainer:
             raise HTTPException(status_code=404, detail="Activity trainer relationship not found")
         return activity_trainer
@@ -98,7 +99,7 @@ async def update_activity_trainer(activity_id: int, trainer_id: int, activity_tr
     - **role**: Trainer role (optional)
     """
     try:
-        result = ActivityTrainerCRUD.update_activity_trainer(activity_id, trainer_id, activity_trainer)
+        result = await run_db(ActivityTrainerCRUD.update_activity_trainer, activity_id, trainer_id, activity_trainer)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -112,7 +113,7 @@ async def delete_activity_trainer(activity_id: int, trainer_id: int):
     Delete an activity-trainer relationship.
     """
     try:
-        result = ActivityTrainerCRUD.delete_activity_trainer(activity_id, trainer_id)
+        result = await run_db(ActivityTrainerCRUD.delete_activity_trainer, activity_id, trainer_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from model.attendancemodel import Attendance, AttendanceCreate, AttendanceUpdate
-from services.attendancecrud import AttendanceCRUD
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query, Header
+from typing import List, Optional
+from model.attendancemodel import Attendance, AttendanceCreate, AttendanceUpdate, AttendanceBulkCreate, AttendanceChanges
+from services.attendancecrud import AttendanceCRUD, ATTENDANCE_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
+from utils.sync import SyncParams, SYNC_TOKEN_EXPIRED
+from utils.responses import list_response
+from utils.etag import collection_etag, etag_matches, set_etag, not_modified
+from utils.export import export_response, EXPORT_CHUNK_SIZE
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
+attendance_filters = ListParams(ATTENDANCE_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_attendance(attendance: AttendanceCreate):
@@ -19,42 +29,141 @@ async def create_attendance(attendance: AttendanceCreate):
     - **marked_by**: User ID who marked attendance (optional)
     """
     try:
-        result = AttendanceCRUD.create_attendance(attendance)
+        result = await run_db(AttendanceCRUD.create_attendance, attendance)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/session/{session_id}/bulk", response_model=dict)
+async def bulk_mark_attendance(session_id: int, bulk: AttendanceBulkCreate):
+    """
+    Mark attendance for a whole session roster in one transaction.
+    
+    - **session_id**: Session ID (required in URL)
+    - **marked_at**: Default timestamp for all records (optional, defaults to now)
+    - **marked_by**: Default user ID who marked attendance (optional)
+    - **records**: List of { enrollment_id, status, marked_at, marked_by } (required)
+    
+    Existing attendance for an enrollment in the session is updated, new records are
+    inserted, and each record gets a result of "created", "updated" or "rejected".
+    """
+    try:
+        result = await run_db(AttendanceCRUD.bulk_mark_attendance, session_id, bulk)
+        return result
+    except Exception as e:
+        if "not found" in str(e).lower():
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ============== GET ENDPOINTS ==============
 @router.get("/session/{session_id}", response_model=List[Attendance])
-async def get_attendance_by_session(session_id: int):
+async def get_attendance_by_session(session_id: int, response: Response, page: PageParams = Depends(),
+                                    filters: ListQuery = Depends(attendance_filters), if_none_match: Optional[str] = Header(None)):
     """
     Retrieve all attendance records for a specific session.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    The response carries an ETag; send it back in If-None-Match to get 304 Not Modified while the page is unchanged.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:present) and **sort** (e.g. ?sort=-marked_at) on: status, marked_at.
     """
     try:
-        attendance_records = AttendanceCRUD.get_attendance_by_session(session_id)
-        return attendance_records
+        version = await run_db(AttendanceCRUD.get_attendance_by_session_version, session_id, page.limit, page.after_id, filters)
+        etag = collection_etag(Attendance, version, page.limit, page.after_id, filters.key)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        attendance_records = await run_db(AttendanceCRUD.get_attendance_by_session, session_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, attendance_records, "attendance_id", page.limit, filters)
+        return list_response(attendance_records, Attendance, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/enrollment/{enrollment_id}", response_model=List[Attendance])
-async def get_attendance_by_enrollment(enrollment_id: int):
+async def get_attendance_by_enrollment(enrollment_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(attendance_filters)):
     """
     Retrieve all attendance records for a specific enrollment.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:present) and **sort** (e.g. ?sort=-marked_at) on: status, marked_at.
     """
     try:
-        attendance_records = AttendanceCRUD.get_attendance_by_enrollment(enrollment_id)
-        return attendance_records
+        attendance_records = await run_db(AttendanceCRUD.get_attendance_by_enrollment, enrollment_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, attendance_records, "attendance_id", page.limit, filters)
+        return list_response(attendance_records, Attendance, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes", response_model=AttendanceChanges)
+async def get_attendance_changes(sync: SyncParams = Depends(), session_id: Optional[int] = Query(None, description="Only sync the attendance records of this session")):
+    """
+    Delta sync: attendance records inserted, updated or deleted since the last sync.
+    
+    - **since**: sync_token from the previous response (optional, omit for a full sync)
+    - **limit**: Maximum number of changes to return (optional, defaults to 500)
+    - **session_id**: Only sync the attendance records of this session (optional; use the same value on every sync)
+    
+    Apply **changes** (upserts) and **deleted** (ids), store **sync_token** and pass it back as
+    **since**; while **has_more** is true, sync again straight away.
+    A **410** means the token is older than the retained deletes; start over with a full sync.
+    """
+    try:
+        return await run_db(AttendanceCRUD.get_attendance_changes, sync.since_version, sync.limit, session_id)
+    except Exception as e:
+        if SYNC_TOKEN_EXPIRED in str(e):
+            raise HTTPException(status_code=410, detail=SYNC_TOKEN_EXPIRED)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_attendance(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")):
+    """
+    Stream all attendance records as NDJSON (default) or CSV.
+    
+    - **format**: "ndjson" or "csv" (optional)
+    
+    Rows are read from the database in chunks and written as they arrive, so memory
+    use stays flat regardless of table size.
+    """
+    try:
+        chunks = AttendanceCRUD.iter_attendance_export(EXPORT_CHUNK_SIZE)
+        return await export_response(chunks, export_format, "attendance")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[Attendance])
+async def get_attendance_by_ids(request: IdList):
+    """
+    Retrieve many attendance records by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Attendance record IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(AttendanceCRUD.get_attendance_by_ids, request.ids)
+        return list_response(records, Attendance)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[Attendance])
-async def get_all_attendance():
+async def get_all_attendance(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(attendance_filters), multi: IdsParams = Depends()):
     """
     Retrieve all attendance records.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:present) and **sort** (e.g. ?sort=-marked_at) on: status, marked_at.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those attendance records, in that order.
     """
     try:
-        attendance_records = AttendanceCRUD.get_all_attendance()
-        return attendance_records
+        if multi.ids is not None:
+            records = await run_db(AttendanceCRUD.get_attendance_by_ids, multi.ids)
+            return list_response(records, Attendance)
+        
+        attendance_records = await run_db(AttendanceCRUD.get_all_attendance, page.limit, page.after_id, filters)
+        set_next_cursor(response, attendance_records, "attendance_id", page.limit, filters)
+        return list_response(attendance_records, Attendance, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -64,7 +173,7 @@ async def get_attendance(attendance_id: int):
     Retrieve a single attendance record by ID.
     """
     try:
-        attendance = AttendanceCRUD.get_attendance(attendance_id)
+        attendance = await run_db(AttendanceCRUD.get_attendance, attendance_id)
         if not attendance:
             raise HTTPException(status_code=404, detail="Attendance record not found")
         return attendance
@@ -83,7 +192,7 @@ async def update_attendance(attendance_id: int, attendance: AttendanceUpdate):
     - All other fields are optional
     """
     try:
-        result = AttendanceCRUD.update_attendance(attendance_id, attendance)
+        result = await run_db(AttendanceCRUD.update_attendance, attendance_id, attendance)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -97,7 +206,7 @@ async def delete_attendance(attendance_id: int):
     Delete an attendance record by ID.
     """
     try:
-        result = AttendanceCRUD.delete_attendance(attendance_id)
+        result = await run_db(AttendanceCRUD.delete_attendance, attendance_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.batchmodel import Batch, BatchCreate, BatchUpdate
 from services.batchcrud import BatchCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/batches", tags=["batches"])
 
@@ -22,7 +24,7 @@ async def create_batch(batch: BatchCreate):
     - **status**: Batch status (required)
     """
     try:
-        result = BatchCRUD.create_batch(batch)
+        result = await run_db(BatchCRUD.create_batch, batch)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -34,7 +36,7 @@ async def get_batches_by_organization(org_id: int):
     Retrieve all batches for a specific organization.
     """
     try:
-        batches = BatchCRUD.get_batches_by_org(org_id)
+        batches = await run_db(BatchCRUD.get_batches_by_org, org_id)
         return batches
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -45,18 +47,37 @@ async def get_batches_by_activity(activity_id: int):
     Retrieve all batches for a specific activity.
     """
     try:
-        batches = BatchCRUD.get_batches_by_activity(activity_id)
+        batches = await run_db(BatchCRUD.get_batches_by_activity, activity_id)
         return batches
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[Batch])
+async def get_batches_by_ids(request: IdList):
+    """
+    Retrieve many batches by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Batch IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(BatchCRUD.get_batches_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Batch])
-async def get_all_batches():
+async def get_all_batches(multi: IdsParams = Depends()):
     """
     Retrieve all batches.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those batches, in that order.
     """
     try:
-        batches = BatchCRUD.get_all_batches()
+        if multi.ids is not None:
+            records = await run_db(BatchCRUD.get_batches_by_ids, multi.ids)
+            return records
+        
+        batches = await run_db(BatchCRUD.get_all_batches)
         return batches
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,7 +88,7 @@ async def get_batch(batch_id: int):
     Retrieve a single batch by ID.
     """
     try:
-        batch = BatchCRUD.get_batch(batch_id)
+        batch = await run_db(BatchCRUD.get_batch, batch_id)
         if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
         return batch
@@ -86,7 +107,7 @@ async def update_batch(batch_id: int, batch: BatchUpdate):
     - All other fields are optional
     """
     try:
-        result = BatchCRUD.update_batch(batch_id, batch)
+        result = await run_db(BatchCRUD.update_batch, batch_id, batch)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -100,7 +121,7 @@ async def delete_batch(batch_id: int):
     Delete a batch by ID.
     """
     try:
-        result = BatchCRUD.delete_batch(batch_id)
+        result = await run_db(BatchCRUD.delete_batch, batch_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from model.batchsessionmodel import BatchSession, BatchSessionCreate, BatchSessionUpdate
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Header, Query
+from typing import List, Optional
+from model.batchsessionmodel import BatchSession, BatchSessionCreate, BatchSessionUpdate, BatchSessionChanges
 from services.batchsessioncrud import BatchSessionCRUD
+from utils.executor import run_db
+from utils.sync import SyncParams, SYNC_TOKEN_EXPIRED
+from utils.responses import list_response
+from utils.etag import collection_etag, etag_matches, set_etag, not_modified
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/batchsessions", tags=["batchsessions"])
 
@@ -21,13 +26,13 @@ async def create_batch_session(session: BatchSessionCreate):
     """
     try:
         # Check if session name already exists for this batch
-        if BatchSessionCRUD.session_name_exists(session.batch_id, session.session_name):
+        if await run_db(BatchSessionCRUD.session_name_exists, session.batch_id, session.session_name):
             raise HTTPException(
                 status_code=409,
                 detail=f"A session with name '{session.session_name}' already exists for this batch"
             )
         
-        result = BatchSessionCRUD.create_batch_session(session)
+        result = await run_db(BatchSessionCRUD.create_batch_session, session)
         return result
     except HTTPException:
         raise
@@ -36,23 +41,70 @@ async def create_batch_session(session: BatchSessionCreate):
 
 # ============== GET ENDPOINTS ==============
 @router.get("/batch/{batch_id}", response_model=List[BatchSession])
-async def get_sessions_by_batch(batch_id: int):
+async def get_sessions_by_batch(batch_id: int, response: Response, if_none_match: Optional[str] = Header(None)):
     """
     Retrieve all sessions for a specific batch.
+    
+    The response carries an ETag; send it back in If-None-Match to get 304 Not Modified while the sessions are unchanged.
+    """
+    try:
+        version = await run_db(BatchSessionCRUD.get_sessions_by_batch_version, batch_id)
+        etag = collection_etag(BatchSession, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        sessions = await run_db(BatchSessionCRUD.get_sessions_by_batch, batch_id)
+        return list_response(sessions, BatchSession, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes", response_model=BatchSessionChanges)
+async def get_batch_session_changes(sync: SyncParams = Depends(), batch_id: Optional[int] = Query(None, description="Only sync the sessions of this batch")):
+    """
+    Delta sync: sessions inserted, updated or deleted since the last sync.
+    
+    - **since**: sync_token from the previous response (optional, omit for a full sync)
+    - **limit**: Maximum number of changes to return (optional, defaults to 500)
+    - **batch_id**: Only sync the sessions of this batch (optional; use the same value on every sync)
+    
+    Apply **changes** (upserts) and **deleted** (ids), store **sync_token** and pass it back as
+    **since**; while **has_more** is true, sync again straight away.
+    A **410** means the token is older than the retained deletes; start over with a full sync.
     """
     try:
-        sessions = BatchSessionCRUD.get_sessions_by_batch(batch_id)
-        return sessions
+        return await run_db(BatchSessionCRUD.get_batch_session_changes, sync.since_version, sync.limit, batch_id)
+    except Exception as e:
+        if SYNC_TOKEN_EXPIRED in str(e):
+            raise HTTPException(status_code=410, detail=SYNC_TOKEN_EXPIRED)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[BatchSession])
+async def get_batch_sessions_by_ids(request: IdList):
+    """
+    Retrieve many batch sessions by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Batch session IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(BatchSessionCRUD.get_batch_sessions_by_ids, request.ids)
+        return list_response(records, BatchSession)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[BatchSession])
-async def get_all_batch_sessions():
+async def get_all_batch_sessions(multi: IdsParams = Depends()):
     """
     Retrieve all batch sessions.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those batch sessions, in that order.
     """
     try:
-        batch_sessions = BatchSessionCRUD.get_all_batch_sessions()
+        if multi.ids is not None:
+            records = await run_db(BatchSessionCRUD.get_batch_sessions_by_ids, multi.ids)
+            return list_response(records, BatchSession)
+        
+        batch_sessions = await run_db(BatchSessionCRUD.get_all_batch_sessions)
         return batch_sessions
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -63,7 +115,7 @@ async def get_batch_session(session_id: int):
     Retrieve a single batch session by ID.
     """
     try:
-        batch_session = BatchSessionCRUD.get_batch_session(session_id)
+        batch_session = await run_db(BatchSessionCRUD.get_batch_session, session_id)
         if not batch_session:
             raise HTTPException(status_code=404, detail="Batch session not found")
         return batch_session
@@ -82,7 +134,7 @@ async def update_batch_session(session_id: int, session: BatchSessionUpdate):
     - All other fields are optional
     """
     try:
-        result = BatchSessionCRUD.update_batch_session(session_id, session)
+        result = await run_db(BatchSessionCRUD.update_batch_session, session_id, session)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -96,7 +148,7 @@ async def delete_batch_session(session_id: int):
     Delete a batch session by ID.
     """
     try:
-        result = BatchSessionCRUD.delete_batch_session(session_id)
+        result = await run_db(BatchSessionCRUD.delete_batch_session, session_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -0,0 +1,71 @@
+"""
+Benchmark: request latency percentiles for one endpoint under many concurrent
+clients, used to compare DB_BACKEND=sync against DB_BACKEND=async.
+
+Runs the application in-process against the database configured in .env, so run
+it once per backend and compare the output:
+
+    DB_BACKEND=sync  python -m benchmarks.bench_db_backend --path /attendance/session/1
+    DB_BACKEND=async python -m benchmarks.bench_db_backend --path /attendance/session/1
+
+Requires httpx (pip install httpx), and aioodbc for the async backend.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from main import app
+from utils.database import DB_BACKEND
+
+async def run(path: str, clients: int, requests_per_client: int, token: str):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    latencies = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        headers=headers,
+        timeout=None
+    ) as client:
+        async def one_client():
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_client() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, elapsed
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/attendance")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument("--token", default="", help="JWT for protected routes")
+    args = parser.parse_args()
+
+    # Run startup handlers so the pools are warmed exactly as under uvicorn
+    await app.router.startup()
+    try:
+        latencies, elapsed = await run(args.path, args.clients, args.requests_per_client, args.token)
+    finally:
+        await app.router.shutdown()
+
+    latencies.sort()
+    print(f"backend={DB_BACKEND} path={args.path} clients={args.clients} requests={len(latencies)}")
+    print(f"  throughput {len(latencies) / elapsed:8.1f} req/s")
+    print(f"  mean       {statistics.mean(latencies) * 1000:8.1f} ms")
+    for pct in (50, 95, 99):
+        print(f"  p{pct:<9} {percentile(latencies, pct) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
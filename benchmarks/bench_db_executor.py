@@ -0,0 +1,66 @@
+"""
+Benchmark: concurrent request throughput with blocking CRUD calls made directly
+on the event loop vs. dispatched through utils.executor.run_db.
+
+A simulated query (time.sleep) stands in for a pyodbc round trip so the
+benchmark runs without a database.
+
+Requires httpx (pip install httpx).
+
+Usage (from the project root):
+    python -m benchmarks.bench_db_executor --requests 200 --concurrency 50 --query-ms 20
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from utils.executor import run_db, DB_EXECUTOR_WORKERS
+
+def build_app(query_seconds: float) -> FastAPI:
+    app = FastAPI()
+
+    def blocking_query():
+        time.sleep(query_seconds)
+        return {"ok": True}
+
+    @app.get("/inline")
+    async def inline():
+        return blocking_query()
+
+    @app.get("/offloaded")
+    async def offloaded():
+        return await run_db(blocking_query)
+
+    return app
+
+async def measure(app: FastAPI, path: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--query-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    app = build_app(args.query_ms / 1000)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.query_ms:.0f} ms simulated query, {DB_EXECUTOR_WORKERS} db workers")
+    for label, path in (("inline (before)", "/inline"), ("run_db (after)", "/offloaded")):
+        rate = await measure(app, path, args.requests, args.concurrency)
+        print(f"  {label:<16} {rate:8.1f} req/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Benchmark: encoding typical API payloads with Starlette's stdlib JSONResponse vs.
+the orjson-backed FastJSONResponse in utils.responses (the application default).
+
+Each payload is measured as FastAPI hands it to the response class after
+response_model serialization (Decimal already a string, dates already ISO 8601
+strings), and as raw rows (Decimal, date, time and datetime objects, as returned
+by list_response). The stdlib path needs a default= hook for the raw rows, as the
+exports used. Both encodings must decode to the same data.
+
+Usage (from the project root):
+    python -m benchmarks.bench_json_response --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from model.batchsessionmodel import BatchSession
+from model.invoicemodel import Invoice
+from model.paymentmodel import Payment
+from utils.responses import FastJSONResponse
+
+def invoices(total: int):
+    return [
+        {"invoice_id": index, "org_id": 2, "enrollment_id": index % 300, "invoice_date": date(2024, 1, 1),
+         "due_date": date(2024, 1, 31), "total_amount": Decimal("1250.00") + index, "status": "open"}
+        for index in range(total)
+    ]
+
+def payments(total: int):
+    return [
+        {"payment_id": index, "org_id": 2, "invoice_id": index, "payment_date": date(2024, 1, 15),
+         "amount": Decimal("99.99"), "method": "card", "reference_no": f"REF-{index:06d}", "notes": None}
+        for index in range(total)
+    ]
+
+def sessions(total: int):
+    return [
+        {"session_id": index, "batch_id": index // 10, "session_name": f"Week {index}", "session_date": date(2024, 2, 1),
+         "start_time": time_of_day(16, 0), "end_time": time_of_day(17, 30), "status": "scheduled", "notes": None}
+        for index in range(total)
+    ]
+
+def stdlib_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time_of_day)):
+        return value.isoformat()
+    raise TypeError(type(value).__name__)
+
+class StdlibRawJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=stdlib_default).encode()
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = [
+        ("single payment", Payment, payments(1)[0]),
+        ("25 invoices", List[Invoice], invoices(25)),
+        ("1000 invoices", List[Invoice], invoices(1000)),
+        ("1000 payments", List[Payment], payments(1000)),
+        ("1000 batch sessions", List[BatchSession], sessions(1000)),
+    ]
+
+    print(f"best of {args.repeat}, microseconds per response")
+    print(f"  {'payload':<20} {'shape':<10} {'stdlib':>10} {'orjson':>10}")
+    for label, annotation, raw in payloads:
+        adapter = TypeAdapter(annotation)
+        validated = adapter.dump_python(adapter.validate_python(raw), mode="json")
+        for shape, content, stdlib_class in (("validated", validated, JSONResponse), ("raw rows", raw, StdlibRawJSONResponse)):
+            assert json.loads(stdlib_class(content).body) == json.loads(FastJSONResponse(content).body)
+            before = best_of(args.repeat, lambda: stdlib_class(content))
+            after = best_of(args.repeat, lambda: FastJSONResponse(content))
+            print(f"  {label:<20} {shape:<10} {before * 1e6:10.1f} {after * 1e6:10.1f}  ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    main()
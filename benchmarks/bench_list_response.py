@@ -0,0 +1,101 @@
+"""
+Benchmark: serialization cost of a large list response returned through
+response_model=List[Attendance] (FastAPI validates, copies and re-encodes every
+row) vs. utils.responses.list_response (rows rendered as-is with orjson).
+
+Both endpoints return the same in-memory rows shaped like ATTENDANCE_SELECT, so
+the database is not involved. "serialize" times the conversion alone; "request"
+times a full GET through the app with httpx's ASGI transport, and checks that both
+bodies decode to the same records.
+
+Requires httpx (pip install httpx).
+
+Usage (from the project root):
+    python -m benchmarks.bench_list_response --rows 50000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from model.attendancemodel import Attendance
+from utils.responses import list_response, FastJSONResponse
+
+def make_rows(total: int):
+    marked = datetime(2024, 1, 1, 9, 30)
+    return [
+        {"attendance_id": index, "session_id": index // 20, "session_name": f"Session {index // 20}",
+         "enrollment_id": index % 500, "status": "present", "marked_at": marked + timedelta(seconds=index),
+         "marked_by": 1}
+        for index in range(total)
+    ]
+
+def build_app(rows) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[Attendance])
+    async def validated():
+        return rows
+
+    @app.get("/fast", response_model=List[Attendance])
+    async def fast(response: Response):
+        return list_response(rows, Attendance, response)
+
+    return app
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+async def request_time(app: FastAPI, path: str, repeat: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        best, body = float("inf"), None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(path)
+            best = min(best, time.perf_counter() - start)
+            response.raise_for_status()
+            body = response.content
+        return best, body
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[Attendance])
+
+    def validated_path():
+        # What FastAPI does with a response_model: validate, dump to JSON-able data, encode
+        JSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json"))
+
+    def fast_path():
+        FastJSONResponse(rows)
+
+    print(f"{args.rows} attendance rows, best of {args.repeat}")
+    before = best_of(args.repeat, validated_path)
+    after = best_of(args.repeat, fast_path)
+    print(f"  serialize  response_model : {before * 1000:8.1f} ms")
+    print(f"  serialize  list_response  : {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+
+    app = build_app(rows)
+    before, validated_body = await request_time(app, "/validated", args.repeat)
+    after, fast_body = await request_time(app, "/fast", args.repeat)
+    assert json.loads(validated_body) == json.loads(fast_body)
+    print(f"  request    response_model : {before * 1000:8.1f} ms  ({len(validated_body) / 1024 / 1024:.1f} MiB)")
+    print(f"  request    list_response  : {after * 1000:8.1f} ms  ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
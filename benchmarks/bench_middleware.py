@@ -0,0 +1,107 @@
+"""
+Benchmark: requests/sec through the preflight + JWT middleware stack, comparing the
+previous BaseHTTPMiddleware implementation with the pure ASGI middleware in
+utils.auth.
+
+Both stacks wrap the same trivial endpoint, so the difference is middleware
+overhead. Requests carry the same valid bearer token on a protected path; the
+pure ASGI stack is measured with and without the verified-token cache.
+
+Requires httpx (pip install httpx).
+
+Usage (from the project root):
+    python -m benchmarks.bench_middleware --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+import httpx
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from utils.auth import JWTMiddleware, PreflightMiddleware, PUBLIC_ROUTES, SECRET_KEY, ALGORITHM, token_cache
+
+class BaseHTTPJWTMiddleware(BaseHTTPMiddleware):
+    """The previous JWTMiddleware, reduced to the path taken by a valid token"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS" or request.url.path in PUBLIC_ROUTES:
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(status_code=401, content={"detail": "Missing authorization header"})
+        try:
+            scheme, token = auth_header.split()
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except Exception as e:
+            return JSONResponse(status_code=401, content={"detail": str(e)})
+
+        request.state.user_id = payload.get("user_id")
+        request.state.email = payload.get("email")
+        request.state.payload = payload
+        return await call_next(request)
+
+def build_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/protected")
+    async def protected(request: Request):
+        return {"user_id": request.state.user_id}
+
+    if pure_asgi:
+        app.add_middleware(PreflightMiddleware)
+        app.add_middleware(JWTMiddleware)
+    else:
+        @app.middleware("http")
+        async def preflight_middleware(request: Request, call_next):
+            if request.method == "OPTIONS":
+                return Response(status_code=200)
+            return await call_next(request)
+
+        app.add_middleware(BaseHTTPJWTMiddleware)
+
+    return app
+
+async def measure(app: FastAPI, token: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/protected", headers=headers)
+                response.raise_for_status()
+
+        await one()  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    token = jwt.encode(
+        {"user_id": 1, "email": "bench@example.com", "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    before = await measure(build_app(pure_asgi=False), token, args.requests, args.concurrency)
+    print(f"  BaseHTTPMiddleware : {before:8.1f} req/s")
+    cache_size, token_cache.max_size = token_cache.max_size, 0
+    uncached = await measure(build_app(pure_asgi=True), token, args.requests, args.concurrency)
+    print(f"  pure ASGI          : {uncached:8.1f} req/s  ({uncached / before:.2f}x)")
+    token_cache.max_size = cache_size
+    cached = await measure(build_app(pure_asgi=True), token, args.requests, args.concurrency)
+    print(f"  pure ASGI + cache  : {cached:8.1f} req/s  ({cached / before:.2f}x, hit rate {token_cache.stats()['hit_rate']})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
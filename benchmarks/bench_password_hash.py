@@ -0,0 +1,52 @@
+"""
+Benchmark: password verifications (logins) per second on the password hashing pool,
+for a range of PASSWORD_HASH_WORKERS values, to size the pool for the host.
+
+Each login is one verify_password_async call against a hash made with the current
+PASSWORD_HASH_CONFIG; the database is not involved. The legacy unsalted SHA256 check
+is shown for reference.
+
+Usage (from the project root):
+    python -m benchmarks.bench_password_hash --logins 64 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import time
+import utils.password_helper as password_helper
+from utils.password_helper import PasswordHelper, PASSWORD_HASH_CONFIG
+
+async def measure(workers: int, hashed: str, total: int) -> float:
+    password_helper.shutdown_hash_executor()
+    password_helper.PASSWORD_HASH_WORKERS = workers
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(PasswordHelper.verify_password_async("correct horse", hashed) for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return total / elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    hashed = PasswordHelper.hash_password("correct horse")
+    legacy = "b1e2bcf1f0e4e4a5a9a2b7fd1b7ef6e0f5cde1a0d4b5cb0a5a1ec0a4ef6b3a6e"
+    print(f"{args.logins} logins, {os.cpu_count()} CPUs, hash {hashed.split('$')[0]} "
+          f"(scrypt N={PASSWORD_HASH_CONFIG['scrypt_n']}, r={PASSWORD_HASH_CONFIG['scrypt_r']})")
+
+    start = time.perf_counter()
+    for _ in range(args.logins):
+        password_helper._verify("correct horse", legacy)
+    print(f"  legacy SHA256      : {args.logins / (time.perf_counter() - start):10.1f} logins/s")
+
+    for workers in args.workers:
+        rate = await measure(workers, hashed, args.logins)
+        print(f"  {workers:>2} hash worker(s)  : {rate:10.1f} logins/s  ({rate / min(workers, os.cpu_count() or 1):.1f} per core)")
+
+    password_helper.shutdown_hash_executor()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark: converting result rows to dicts with the hand-written
+{"name": row[i], ...} loops the CRUD classes used, vs. the shared
+utils.database.rows_to_dicts (a dict display compiled once per column tuple
+from cursor.description).
+
+Rows are in-memory tuples shaped like STUDENT_SELECT (12 columns), so the
+database is not involved and the difference is the conversion alone. The
+dict(zip(columns, row)) and precompiled operator.itemgetter alternatives are shown
+for reference. Time is the best of --repeat runs; allocation is the tracemalloc
+peak while converting all rows.
+
+Usage (from the project root):
+    python -m benchmarks.bench_row_mapper --rows 100000 --repeat 5
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import date, datetime
+from operator import itemgetter
+from utils.database import rows_to_dicts
+
+COLUMNS = (
+    "student_id", "org_id", "first_name", "last_name", "dob", "guardian_name", "guardian_phone",
+    "guardian_email", "student_photo_path", "notes", "active", "created_at"
+)
+
+def make_rows(total: int):
+    created = datetime(2024, 1, 1, 9, 30)
+    return [
+        (index, 1, f"First{index}", f"Last{index}", date(2015, 1, 1), f"Guardian {index}", "555-0100",
+         f"guardian{index}@example.com", None, None, True, created)
+        for index in range(total)
+    ]
+
+def hand_written(rows):
+    """The previous per-method loop"""
+    students = []
+    for row in rows:
+        students.append({
+            "student_id": row[0],
+            "org_id": row[1],
+            "first_name": row[2],
+            "last_name": row[3],
+            "dob": row[4],
+            "guardian_name": row[5],
+            "guardian_phone": row[6],
+            "guardian_email": row[7],
+            "student_photo_path": row[8],
+            "notes": row[9],
+            "active": row[10],
+            "created_at": row[11]
+        })
+    return students
+
+def shared_mapper(rows):
+    return rows_to_dicts(COLUMNS, rows)
+
+def zip_per_row(rows):
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+def precompiled_itemgetter(rows):
+    getter = itemgetter(*range(len(COLUMNS)))
+    return [dict(zip(COLUMNS, getter(row))) for row in rows]
+
+def time_once(convert, rows) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    convert(rows)
+    return time.perf_counter() - start
+
+def peak_allocation(convert, rows) -> int:
+    tracemalloc.start()
+    result = convert(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result[-1]["created_at"] == rows[-1][11]
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    converters = (("hand-written loop", hand_written),
+                  ("rows_to_dicts", shared_mapper),
+                  ("dict(zip) per row", zip_per_row),
+                  ("itemgetter + zip", precompiled_itemgetter))
+
+    # Runs are interleaved, so drift in machine load affects every converter alike
+    best = {label: float("inf") for label, _ in converters}
+    for _ in range(args.repeat):
+        for label, convert in converters:
+            best[label] = min(best[label], time_once(convert, rows))
+
+    print(f"{args.rows} rows x {len(COLUMNS)} columns, best of {args.repeat}")
+    baseline = best[converters[0][0]]
+    for label, convert in converters:
+        elapsed, peak = best[label], peak_allocation(convert, rows)
+        print(f"  {label:<18}: {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.2f}x)  "
+              f"{args.rows / elapsed:12.0f} rows/s  peak {peak / 1024 / 1024:7.1f} MiB")
+
+if __name__ == "__main__":
+    main()
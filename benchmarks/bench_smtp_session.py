@@ -0,0 +1,123 @@
+"""
+Benchmark: email throughput with a new SMTP connection and login per message
+(the previous EmailHelper behaviour) vs. pooled sessions in utils.email_helper.
+
+A minimal local SMTP server stands in for the real one, so the benchmark needs no
+network access or credentials. --handshake-ms adds latency to the greeting and to
+AUTH to model the connection setup, STARTTLS and login round trips of a remote
+server. STARTTLS itself is skipped (SMTP_STARTTLS=false).
+
+Usage (from the project root):
+    python -m benchmarks.bench_smtp_session --messages 200 --handshake-ms 50
+"""
+import argparse
+import smtplib
+import socketserver
+import threading
+import time
+from utils.email_helper import EmailHelper, close_smtp_pools
+
+SENDER = "bench@example.com"
+PASSWORD = "bench-password"
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Accepts every message; only implements what smtplib needs"""
+
+    handshake_seconds = 0.0
+
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        time.sleep(self.handshake_seconds)
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-stub")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command.startswith("HELO"):
+                self.reply("250 stub")
+            elif command.startswith("AUTH"):
+                time.sleep(self.handshake_seconds)
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+def start_stub_server(handshake_seconds: float):
+    StubSMTPHandler.handshake_seconds = handshake_seconds
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StubSMTPHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def send_per_connection(port: int, total: int) -> float:
+    """Connect, log in, send and quit for every message"""
+    helper = EmailHelper(SENDER, PASSWORD)
+    start = time.perf_counter()
+    for index in range(total):
+        message, recipients = helper._build_message(f"user{index}@example.com", "Benchmark", "<p>Hello</p>", True)
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.login(SENDER, PASSWORD)
+            server.sendmail(SENDER, recipients, message)
+    return total / (time.perf_counter() - start)
+
+def pooled_helper(port: int) -> EmailHelper:
+    helper = EmailHelper(SENDER, PASSWORD)
+    helper.smtp_server, helper.smtp_port, helper.use_tls = "127.0.0.1", port, False
+    return helper
+
+def send_pooled(port: int, total: int) -> float:
+    """One send_email call per message, reusing pooled sessions"""
+    helper = pooled_helper(port)
+    start = time.perf_counter()
+    for index in range(total):
+        helper.send_html_email(f"user{index}@example.com", "Benchmark", "<p>Hello</p>")
+    return total / (time.perf_counter() - start)
+
+def send_batched(port: int, total: int, batch_size: int) -> float:
+    """send_batch calls of batch_size messages over one session each"""
+    helper = pooled_helper(port)
+    emails = [
+        {"recipient_email": f"user{index}@example.com", "subject": "Benchmark", "body": "<p>Hello</p>", "is_html": True}
+        for index in range(total)
+    ]
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        results = helper.send_batch(emails[offset:offset + batch_size])
+        assert all(result["status"] == "success" for result in results)
+    return total / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=50.0)
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.handshake_ms / 1000)
+    port = server.server_address[1]
+    print(f"{args.messages} messages, {args.handshake_ms:.0f} ms simulated handshake")
+    try:
+        print(f"  connection per message : {send_per_connection(port, args.messages):8.1f} msg/s")
+        print(f"  pooled send_email      : {send_pooled(port, args.messages):8.1f} msg/s")
+        close_smtp_pools()
+        label = f"send_batch ({args.batch_size}/batch)"
+        print(f"  {label:<23}: {send_batched(port, args.messages, args.batch_size):8.1f} msg/s")
+    finally:
+        close_smtp_pools()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.categorymodel import Category, CategoryCreate, CategoryUpdate
 from services.categorycrud import CategoryCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -15,19 +17,38 @@ async def create_category(category: CategoryCreate):
     - **active**: Active status (default: true)
     """
     try:
-        result = CategoryCRUD.create_category(category)
+        result = await run_db(CategoryCRUD.create_category, category)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 # ============== GET ENDPOINTS ==============
+@router.post("/by-ids", response_model=List[Category])
+async def get_categories_by_ids(request: IdList):
+    """
+    Retrieve many categories by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Category IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(CategoryCRUD.get_categories_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Category])
-async def get_all_categories():
+async def get_all_categories(multi: IdsParams = Depends()):
     """
     Retrieve all categories.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those categories, in that order.
     """
     try:
-        categories = CategoryCRUD.get_all_categories()
+        if multi.ids is not None:
+            records = await run_db(CategoryCRUD.get_categories_by_ids, multi.ids)
+            return records
+        
+        categories = await run_db(CategoryCRUD.get_all_categories)
         return categories
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -38,7 +59,7 @@ async def get_category(category_id: int):
     Retrieve a single category by ID.
     """
     try:
-        category = CategoryCRUD.get_category(category_id)
+        category = await run_db(CategoryCRUD.get_category, category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
         return category
@@ -57,7 +78,7 @@ async def update_category(category_id: int, category: CategoryUpdate):
     - All other fields are optional
     """
     try:
-        result = CategoryCRUD.update_category(category_id, category)
+        result = await run_db(CategoryCRUD.update_category, category_id, category)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -71,7 +92,7 @@ async def delete_category(category_id: int):
     Delete a category by ID.
     """
     try:
-        result = CategoryCRUD.delete_category(category_id)
+        result = await run_db(CategoryCRUD.delete_category, category_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
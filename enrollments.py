@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from model.enrollmentmodel import Enrollment, EnrollmentCreate, EnrollmentUpdate
-from services.enrollmentcrud import EnrollmentCRUD
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Header, Query
+from typing import List, Optional
+from model.enrollmentmodel import Enrollment, EnrollmentCreate, EnrollmentUpdate, EnrollmentBulkCreate, EnrollmentChanges, EnrollmentDetail
+from services.enrollmentcrud import EnrollmentCRUD, ENROLLMENT_INCLUDES, ENROLLMENT_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
+from utils.sync import SyncParams, SYNC_TOKEN_EXPIRED
+from utils.responses import list_response
+from utils.etag import collection_etag, etag_matches, set_etag, not_modified
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/enrollments", tags=["enrollments"])
 
+enrollment_filters = ListParams(ENROLLMENT_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_enrollment(enrollment: EnrollmentCreate):
@@ -18,7 +27,7 @@ async def create_enrollment(enrollment: EnrollmentCreate):
     - **status**: Enrollment status (required)
     """
     try:
-        result = EnrollmentCRUD.create_enrollment(enrollment)
+        result = await run_db(EnrollmentCRUD.create_enrollment, enrollment)
         return result
     except Exception as e:
         error_msg = str(e)
@@ -27,48 +36,131 @@ async def create_enrollment(enrollment: EnrollmentCreate):
             raise HTTPException(status_code=409, detail=error_msg)
         raise HTTPException(status_code=400, detail=error_msg)
 
+@router.post("/bulk", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def bulk_create_enrollments(bulk: EnrollmentBulkCreate):
+    """
+    Import many enrollments in one transaction.
+    
+    - **records**: List of enrollments, each with org_id, batch_id, student_id, enrolled_on and status (required)
+    
+    Each row gets a result of "created", "duplicate" (student already enrolled in the batch)
+    or "rejected" (batch or student not found). Guardian confirmation emails are queued
+    in the email outbox and delivered in the background.
+    """
+    try:
+        return await run_db(EnrollmentCRUD.bulk_create_enrollments, bulk)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ============== GET ENDPOINTS ==============
 @router.get("/student/{student_id}", response_model=List[Enrollment])
-async def get_enrollments_by_student(student_id: int):
+async def get_enrollments_by_student(student_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(enrollment_filters)):
     """
     Retrieve all enrollments for a specific student.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:active) and **sort** (e.g. ?sort=-enrolled_on) on: status, enrolled_on.
     """
     try:
-        enrollments = EnrollmentCRUD.get_enrollments_by_student(student_id)
-        return enrollments
+        enrollments = await run_db(EnrollmentCRUD.get_enrollments_by_student, student_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, enrollments, "enrollment_id", page.limit, filters)
+        return list_response(enrollments, Enrollment, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/batch/{batch_id}", response_model=List[Enrollment])
-async def get_enrollments_by_batch(batch_id: int):
+async def get_enrollments_by_batch(batch_id: int, response: Response, page: PageParams = Depends(),
+                                   filters: ListQuery = Depends(enrollment_filters), if_none_match: Optional[str] = Header(None)):
     """
     Retrieve all enrollments for a specific batch.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    The response carries an ETag; send it back in If-None-Match to get 304 Not Modified while the page is unchanged.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:active) and **sort** (e.g. ?sort=-enrolled_on) on: status, enrolled_on.
     """
     try:
-        enrollments = EnrollmentCRUD.get_enrollments_by_batch(batch_id)
-        return enrollments
+        version = await run_db(EnrollmentCRUD.get_enrollments_by_batch_version, batch_id, page.limit, page.after_id, filters)
+        etag = collection_etag(Enrollment, version, page.limit, page.after_id, filters.key)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+        enrollments = await run_db(EnrollmentCRUD.get_enrollments_by_batch, batch_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, enrollments, "enrollment_id", page.limit, filters)
+        return list_response(enrollments, Enrollment, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/organization/{org_id}", response_model=List[Enrollment])
-async def get_enrollments_by_org(org_id: int):
+async def get_enrollments_by_org(org_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(enrollment_filters)):
     """
     Retrieve all enrollments for a specific organization.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:active) and **sort** (e.g. ?sort=-enrolled_on) on: status, enrolled_on.
+    """
+    try:
+        enrollments = await run_db(EnrollmentCRUD.get_enrollments_by_org, org_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, enrollments, "enrollment_id", page.limit, filters)
+        return list_response(enrollments, Enrollment, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/changes", response_model=EnrollmentChanges)
+async def get_enrollment_changes(sync: SyncParams = Depends(), batch_id: Optional[int] = Query(None, description="Only sync the enrollments of this batch")):
+    """
+    Delta sync: enrollments inserted, updated or deleted since the last sync.
+    
+    - **since**: sync_token from the previous response (optional, omit for a full sync)
+    - **limit**: Maximum number of changes to return (optional, defaults to 500)
+    - **batch_id**: Only sync the enrollments of this batch (optional; use the same value on every sync)
+    
+    Apply **changes** (upserts) and **deleted** (ids), store **sync_token** and pass it back as
+    **since**; while **has_more** is true, sync again straight away.
+    A **410** means the token is older than the retained deletes; start over with a full sync.
     """
     try:
-        enrollments = EnrollmentCRUD.get_enrollments_by_org(org_id)
-        return enrollments
+        return await run_db(EnrollmentCRUD.get_enrollment_changes, sync.since_version, sync.limit, batch_id)
+    except Exception as e:
+        if SYNC_TOKEN_EXPIRED in str(e):
+            raise HTTPException(status_code=410, detail=SYNC_TOKEN_EXPIRED)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[Enrollment])
+async def get_enrollments_by_ids(request: IdList):
+    """
+    Retrieve many enrollments by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Enrollment IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(EnrollmentCRUD.get_enrollments_by_ids, request.ids)
+        return list_response(records, Enrollment)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[Enrollment])
-async def get_all_enrollments():
+async def get_all_enrollments(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(enrollment_filters), multi: IdsParams = Depends()):
     """
     Retrieve all enrollment records.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:eq:active) and **sort** (e.g. ?sort=-enrolled_on) on: status, enrolled_on.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those enrollments, in that order.
     """
     try:
-        enrollments = EnrollmentCRUD.get_all_enrollments()
-        return enrollments
+        if multi.ids is not None:
+            records = await run_db(EnrollmentCRUD.get_enrollments_by_ids, multi.ids)
+            return list_response(records, Enrollment)
+        
+        enrollments = await run_db(EnrollmentCRUD.get_all_enrollments, page.limit, page.after_id, filters)
+        set_next_cursor(response, enrollments, "enrollment_id", page.limit, filters)
+        return list_response(enrollments, Enrollment, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -78,7 +170,36 @@ async def get_enrollment(enrollment_id: int):
     Retrieve a single enrollment record by ID.
     """
     try:
-        enrollment = EnrollmentCRUD.get_enrollment(enrollment_id)
+        enrollment = await run_db(EnrollmentCRUD.get_enrollment, enrollment_id)
+        if not enrollment:
+            raise HTTPException(status_code=404, detail="Enrollment record not found")
+        return enrollment
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{enrollment_id}/detail", response_model=EnrollmentDetail)
+async def get_enrollment_detail(enrollment_id: int, include: str = Query(
+        ",".join(ENROLLMENT_INCLUDES), description="Comma-separated relations: student, batch, invoices, invoices.payments")):
+    """
+    Retrieve an enrollment with its student, batch, invoices and their payments in one request.
+    
+    - **include**: Comma-separated relations to load (optional, defaults to all of student, batch, invoices.payments)
+    
+    Replaces separate calls to /students/{id}, /batches/{id}, /invoices/enrollment/{id} and
+    /payments/invoice/{id} per invoice; relations that are not included are returned as null.
+    """
+    relations = {relation.strip() for relation in include.split(",") if relation.strip()}
+    unknown = relations - set(ENROLLMENT_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include '{', '.join(sorted(unknown))}' (expected {', '.join(ENROLLMENT_INCLUDES)})"
+        )
+    
+    try:
+        enrollment = await run_db(EnrollmentCRUD.get_enrollment_detail, enrollment_id, relations)
         if not enrollment:
             raise HTTPException(status_code=404, detail="Enrollment record not found")
         return enrollment
@@ -97,7 +218,7 @@ async def update_enrollment(enrollment_id: int, enrollment: EnrollmentUpdate):
     - All other fields are optional
     """
     try:
-        result = EnrollmentCRUD.update_enrollment(enrollment_id, enrollment)
+        result = await run_db(EnrollmentCRUD.update_enrollment, enrollment_id, enrollment)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -111,7 +232,7 @@ async def delete_enrollment(enrollment_id: int):
     Delete an enrollment record by ID.
     """
     try:
-        result = EnrollmentCRUD.delete_enrollment(enrollment_id)
+        result = await run_db(EnrollmentCRUD.delete_enrollment, enrollment_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
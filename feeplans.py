@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.feeplanmodel import FeePlan, FeePlanCreate, FeePlanUpdate
 from services.feeplancrud import FeePlanCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/feeplans", tags=["feeplans"])
 
@@ -19,7 +21,7 @@ async def create_fee_plan(fee_plan: FeePlanCreate):
     - **active**: Active status (default: true)
     """
     try:
-        result = FeePlanCRUD.create_fee_plan(fee_plan)
+        result = await run_db(FeePlanCRUD.create_fee_plan, fee_plan)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -31,18 +33,37 @@ async def get_fee_plans_by_organization(org_id: int):
     Retrieve all fee plans for a specific organization.
     """
     try:
-        fee_plans = FeePlanCRUD.get_fee_plans_by_org(org_id)
+        fee_plans = await run_db(FeePlanCRUD.get_fee_plans_by_org, org_id)
         return fee_plans
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[FeePlan])
+async def get_fee_plans_by_ids(request: IdList):
+    """
+    Retrieve many fee plans by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Fee plan IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(FeePlanCRUD.get_fee_plans_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[FeePlan])
-async def get_all_fee_plans():
+async def get_all_fee_plans(multi: IdsParams = Depends()):
     """
     Retrieve all fee plans.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those fee plans, in that order.
     """
     try:
-        fee_plans = FeePlanCRUD.get_all_fee_plans()
+        if multi.ids is not None:
+            records = await run_db(FeePlanCRUD.get_fee_plans_by_ids, multi.ids)
+            return records
+        
+        fee_plans = await run_db(FeePlanCRUD.get_all_fee_plans)
         return fee_plans
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,7 +74,7 @@ async def get_fee_plan(fee_plan_id: int):
     Retrieve a single fee plan by ID.
     """
     try:
-        fee_plan = FeePlanCRUD.get_fee_plan(fee_plan_id)
+        fee_plan = await run_db(FeePlanCRUD.get_fee_plan, fee_plan_id)
         if not fee_plan:
             raise HTTPException(status_code=404, detail="Fee plan not found")
         return fee_plan
@@ -72,7 +93,7 @@ async def update_fee_plan(fee_plan_id: int, fee_plan: FeePlanUpdate):
     - All other fields are optional
     """
     try:
-        result = FeePlanCRUD.update_fee_plan(fee_plan_id, fee_plan)
+        result = await run_db(FeePlanCRUD.update_fee_plan, fee_plan_id, fee_plan)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -86,7 +107,7 @@ async def delete_fee_plan(fee_plan_id: int):
     Delete a fee plan by ID.
     """
     try:
-        result = FeePlanCRUD.delete_fee_plan(fee_plan_id)
+        result = await run_db(FeePlanCRUD.delete_fee_plan, fee_plan_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from model.invoicemodel import Invoice, InvoiceCreate, InvoiceUpdate
-from services.invoicecrud import InvoiceCRUD
+from services.invoicecrud import InvoiceCRUD, INVOICE_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
+from utils.responses import list_response
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
+invoice_filters = ListParams(INVOICE_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_invoice(invoice: InvoiceCreate):
@@ -19,42 +26,76 @@ async def create_invoice(invoice: InvoiceCreate):
     - **status**: Invoice status (required)
     """
     try:
-        result = InvoiceCRUD.create_invoice(invoice)
+        result = await run_db(InvoiceCRUD.create_invoice, invoice)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 # ============== GET ENDPOINTS ==============
 @router.get("/organization/{org_id}", response_model=List[Invoice])
-async def get_invoices_by_organization(org_id: int):
+async def get_invoices_by_organization(org_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(invoice_filters)):
     """
     Retrieve all invoices for a specific organization.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:in:pending|overdue) and **sort** (e.g. ?sort=due_date) on: status, invoice_date, due_date.
     """
     try:
-        invoices = InvoiceCRUD.get_invoices_by_org(org_id)
-        return invoices
+        invoices = await run_db(InvoiceCRUD.get_invoices_by_org, org_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, invoices, "invoice_id", page.limit, filters)
+        return list_response(invoices, Invoice, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/enrollment/{enrollment_id}", response_model=List[Invoice])
-async def get_invoices_by_enrollment(enrollment_id: int):
+async def get_invoices_by_enrollment(enrollment_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(invoice_filters)):
     """
     Retrieve all invoices for a specific enrollment.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:in:pending|overdue) and **sort** (e.g. ?sort=due_date) on: status, invoice_date, due_date.
     """
     try:
-        invoices = InvoiceCRUD.get_invoices_by_enrollment(enrollment_id)
-        return invoices
+        invoices = await run_db(InvoiceCRUD.get_invoices_by_enrollment, enrollment_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, invoices, "invoice_id", page.limit, filters)
+        return list_response(invoices, Invoice, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[Invoice])
+async def get_invoices_by_ids(request: IdList):
+    """
+    Retrieve many invoices by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Invoice IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(InvoiceCRUD.get_invoices_by_ids, request.ids)
+        return list_response(records, Invoice)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[Invoice])
-async def get_all_invoices():
+async def get_all_invoices(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(invoice_filters), multi: IdsParams = Depends()):
     """
     Retrieve all invoices.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=status:in:pending|overdue) and **sort** (e.g. ?sort=due_date) on: status, invoice_date, due_date.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those invoices, in that order.
     """
     try:
-        invoices = InvoiceCRUD.get_all_invoices()
-        return invoices
+        if multi.ids is not None:
+            records = await run_db(InvoiceCRUD.get_invoices_by_ids, multi.ids)
+            return list_response(records, Invoice)
+        
+        invoices = await run_db(InvoiceCRUD.get_all_invoices, page.limit, page.after_id, filters)
+        set_next_cursor(response, invoices, "invoice_id", page.limit, filters)
+        return list_response(invoices, Invoice, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -64,7 +105,7 @@ async def get_invoice(invoice_id: int):
     Retrieve a single invoice by ID.
     """
     try:
-        invoice = InvoiceCRUD.get_invoice(invoice_id)
+        invoice = await run_db(InvoiceCRUD.get_invoice, invoice_id)
         if not invoice:
             raise HTTPException(status_code=404, detail="Invoice not found")
         return invoice
@@ -86,7 +127,7 @@ async def get_invoice_amount_by_enrollment(enrollment_id: int):
     - **amount**: The fee plan amount associated with the enrollment's batch
     """
     try:
-        result = InvoiceCRUD.get_invoice_amount_by_enrollment(enrollment_id)
+        result = await run_db(InvoiceCRUD.get_invoice_amount_by_enrollment, enrollment_id)
         if not result:
             raise HTTPException(status_code=404, detail=f"No invoice amount found for enrollment {enrollment_id}")
         return result
@@ -105,7 +146,7 @@ async def update_invoice(invoice_id: int, invoice: InvoiceUpdate):
     - All other fields are optional
     """
     try:
-        result = InvoiceCRUD.update_invoice(invoice_id, invoice)
+        result = await run_db(InvoiceCRUD.update_invoice, invoice_id, invoice)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -119,7 +160,7 @@ async def delete_invoice(invoice_id: int):
     Delete an invoice by ID.
     """
     try:
-        result = InvoiceCRUD.delete_invoice(invoice_id)
+        result = await run_db(InvoiceCRUD.delete_invoice, invoice_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
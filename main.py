@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from organizations import router as organizations_router
 from activities import router as activities_router
@@ -18,14 +18,26 @@ from invoices import router as invoices_router
 from payments import router as payments_router
 from roles import router as roles_router
 from users import router as users_router
-from utils.auth import JWTMiddleware
+from utils.auth import JWTMiddleware, PreflightMiddleware, token_cache, route_policies
+from utils.database import get_pool, get_pool_stats, close_pool, DB_BACKEND
+from utils.async_database import get_async_pool, get_async_pool_stats, close_async_pool
+from utils.executor import run_db, shutdown_db_executor
+from utils.email_outbox import start_outbox_workers, stop_outbox_workers, get_outbox_stats
+from utils.sync import start_tombstone_pruner, stop_tombstone_pruner
+from utils.email_helper import close_smtp_pools
+from utils.password_helper import shutdown_hash_executor
+from utils.responses import FastJSONResponse
+from utils.reference_cache import get_reference_cache_stats
+from utils.invalidation_bus import start_invalidation_bus, stop_invalidation_bus, get_invalidation_bus_stats
+from services.usercrud import last_login_writer
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Organization API", version="1.0.0")
+# Responses are encoded with orjson (Decimal as string, ISO 8601 dates and times)
+app = FastAPI(title="Organization API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # ============== OPENAPI SECURITY SCHEME ==============
 def custom_openapi():
@@ -64,15 +76,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ============== PREFLIGHT REQUESTS MIDDLEWARE ==============
-@app.middleware("http")
-async def preflight_middleware(request: Request, call_next):
-    """Handle CORS preflight requests (OPTIONS) - skip JWT verification"""
-    if request.method == "OPTIONS":
-        return Response(status_code=200)
-    return await call_next(request)
+app.add_middleware(PreflightMiddleware)
 
 # ============== JWT AUTHENTICATION MIDDLEWARE ==============
 app.add_middleware(JWTMiddleware)
@@ -119,12 +127,90 @@ app.include_router(payments_router)
 app.include_router(roles_router)
 app.include_router(users_router)
 
+# ============== ROUTE POLICIES ==============
+@app.on_event("startup")
+async def compile_route_policies():
+    """Resolve the public/protected/role policy of every route once"""
+    route_policies.compile(app.routes)
+
+# ============== DATABASE POOL LIFECYCLE ==============
+@app.on_event("startup")
+async def warm_db_pool():
+    """Open the minimum number of pooled database connections up front"""
+    try:
+        await run_db(get_pool().fill)
+    except Exception as e:
+        logger.warning(f"Could not warm database connection pool: {str(e)}")
+    if DB_BACKEND == "async":
+        try:
+            await get_async_pool()
+        except Exception as e:
+            logger.warning(f"Could not create async database connection pool: {str(e)}")
+
+@app.on_event("startup")
+async def start_email_outbox():
+    """Start the background workers that deliver queued emails"""
+    start_outbox_workers()
+
+@app.on_event("startup")
+async def start_sync_tombstone_pruner():
+    """Start the background thread that prunes tombstones past the sync retention window"""
+    start_tombstone_pruner()
+
+@app.on_event("startup")
+async def connect_invalidation_bus():
+    """Share reference-cache invalidations with the other workers"""
+    try:
+        start_invalidation_bus()
+    except Exception as e:
+        logger.warning(f"Could not connect to the cache invalidation bus, cached reads may be stale for up to REFERENCE_CACHE_TTL on other workers: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_db_pool():
+    """Stop background workers and thread pools, and close pooled SMTP and database connections"""
+    await run_db(stop_outbox_workers)
+    await run_db(stop_tombstone_pruner)
+    await run_db(last_login_writer.close)
+    await run_db(stop_invalidation_bus)
+    close_smtp_pools()
+    shutdown_hash_executor()
+    shutdown_db_executor()
+    close_pool()
+    await close_async_pool()
+
 # ============== HEALTH CHECK ==============
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def db_pool_health():
+    """Database connection pool statistics for monitoring"""
+    return {
+        "backend": DB_BACKEND,
+        "pool": get_pool_stats(),
+        "async_pool": get_async_pool_stats()
+    }
+
+@app.get("/health/auth")
+async def auth_cache_health():
+    """Verified-token cache size and hit rate"""
+    return token_cache.stats()
+
+@app.get("/health/email-outbox")
+async def email_outbox_health():
+    """Number of queued, in-flight, sent and dead-lettered emails"""
+    return await run_db(get_outbox_stats)
+
+@app.get("/health/reference-cache")
+async def reference_cache_health():
+    """Size, hits, misses and invalidations of the reference-data caches, and the invalidation bus"""
+    return {
+        "caches": get_reference_cache_stats(),
+        "invalidation_bus": get_invalidation_bus_stats()
+    }
+
 # ============== PROTECTED ENDPOINT (requires JWT token) ==============
 @app.get("/protected/profile")
 async def get_profile():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class AttendanceBase(BaseModel):
@@ -26,3 +26,19 @@ class Attendance(AttendanceBase):
     class Config:
         from_attributes = True
 
+class AttendanceBulkItem(BaseModel):
+    enrollment_id: int = Field(..., description="Enrollment ID")
+    status: str = Field(..., min_length=1, max_length=20, description="Attendance status")
+    marked_at: Optional[datetime] = Field(None, description="Marked timestamp (defaults to the roster's marked_at)")
+    marked_by: Optional[int] = Field(None, description="User ID who marked attendance (defaults to the roster's marked_by)")
+
+class AttendanceBulkCreate(BaseModel):
+    marked_at: Optional[datetime] = Field(None, description="Default marked timestamp for all records (defaults to now)")
+    marked_by: Optional[int] = Field(None, description="Default user ID who marked attendance")
+    records: List[AttendanceBulkItem] = Field(..., min_length=1, description="Attendance for each enrollment in the session")
+
+class AttendanceChanges(BaseModel):
+    changes: List[Attendance] = Field(..., description="Attendance records inserted or updated since the sync token")
+    deleted: List[int] = Field(..., description="IDs of attendance records deleted, or moved out of the synced scope, since the sync token")
+    sync_token: str = Field(..., description="Token to pass as since on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting; sync again straight away")
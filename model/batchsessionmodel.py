@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date, time
 
 class BatchSessionBase(BaseModel):
@@ -28,3 +28,9 @@ class BatchSession(BatchSessionBase):
 
     class Config:
         from_attributes = True
+
+class BatchSessionChanges(BaseModel):
+    changes: List[BatchSession] = Field(..., description="Batch sessions inserted or updated since the sync token")
+    deleted: List[int] = Field(..., description="IDs of batch sessions deleted, or moved out of the synced scope, since the sync token")
+    sync_token: str = Field(..., description="Token to pass as since on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting; sync again straight away")
@@ -1,6 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date
+from model.studentmodel import Student
+from model.batchmodel import Batch
+from model.invoicemodel import Invoice
+from model.paymentmodel import Payment
 
 class EnrollmentBase(BaseModel):
     org_id: int = Field(..., description="Organization ID")
@@ -24,3 +28,20 @@ class Enrollment(EnrollmentBase):
 
     class Config:
         from_attributes = True
+
+class EnrollmentBulkCreate(BaseModel):
+    records: List[EnrollmentCreate] = Field(..., min_length=1, description="Enrollments to create")
+
+class EnrollmentChanges(BaseModel):
+    changes: List[Enrollment] = Field(..., description="Enrollments inserted or updated since the sync token")
+    deleted: List[int] = Field(..., description="IDs of enrollments deleted, or moved out of the synced scope, since the sync token")
+    sync_token: str = Field(..., description="Token to pass as since on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting; sync again straight away")
+
+class EnrollmentInvoice(Invoice):
+    payments: Optional[List[Payment]] = Field(None, description="Payments against the invoice (with include=invoices.payments)")
+
+class EnrollmentDetail(Enrollment):
+    student: Optional[Student] = Field(None, description="Enrolled student (with include=student)")
+    batch: Optional[Batch] = Field(None, description="Batch enrolled in (with include=batch)")
+    invoices: Optional[List[EnrollmentInvoice]] = Field(None, description="Invoices of the enrollment (with include=invoices)")
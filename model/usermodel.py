@@ -13,7 +13,7 @@ class UserCreate(UserBase):
     """
     Create a new user.
     Note: password_hash is NOT required - a random password will be auto-generated,
-    hashed with SHA256, and sent to the user's email.
+    hashed with salted scrypt (or PBKDF2-SHA256), and sent to the user's email.
     """
     password_hash: Optional[str] = Field(None, max_length=500)
 
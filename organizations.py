@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.orgmodel import Organization, OrganizationCreate, OrganizationUpdate
 from services.orgcrud import OrganizationCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/organizations", tags=["organizations"])
 
@@ -21,7 +23,7 @@ async def create_organization(org: OrganizationCreate):
     - **active**: Active status (default: true)
     """
     try:
-        result = OrganizationCRUD.create_organization(org)
+        result = await run_db(OrganizationCRUD.create_organization, org)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -33,7 +35,7 @@ async def get_organization(org_id: int):
     Retrieve a single organization by ID. Requires JWT authentication.
     """
     try:
-        org = OrganizationCRUD.get_organization(org_id)
+        org = await run_db(OrganizationCRUD.get_organization, org_id)
         if not org:
             raise HTTPException(status_code=404, detail="Organization not found")
         return org
@@ -42,13 +44,32 @@ async def get_organization(org_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[Organization])
+async def get_organizations_by_ids(request: IdList):
+    """
+    Retrieve many organizations by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Organization IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(OrganizationCRUD.get_organizations_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Organization])
-async def get_all_organizations():
+async def get_all_organizations(multi: IdsParams = Depends()):
     """
     Retrieve all organizations. Requires JWT authentication.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those organizations, in that order.
     """
     try:
-        orgs = OrganizationCRUD.get_all_organizations()
+        if multi.ids is not None:
+            records = await run_db(OrganizationCRUD.get_organizations_by_ids, multi.ids)
+            return records
+        
+        orgs = await run_db(OrganizationCRUD.get_all_organizations)
         return orgs
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -60,7 +81,7 @@ async def update_organization(org_id: int, org: OrganizationUpdate):
     Update an existing organization. Only provided fields will be updated. Requires JWT authentication.
     """
     try:
-        updated_org = OrganizationCRUD.update_organization(org_id, org)
+        updated_org = await run_db(OrganizationCRUD.update_organization, org_id, org)
         if not updated_org:
             raise HTTPException(status_code=404, detail="Organization not found")
         return updated_org
@@ -76,7 +97,7 @@ async def delete_organization(org_id: int):
     Delete an organization by ID. Requires JWT authentication.
     """
     try:
-        success = OrganizationCRUD.delete_organization(org_id)
+        success = await run_db(OrganizationCRUD.delete_organization, org_id)
         if not success:
             raise HTTPException(status_code=404, detail="Organization not found")
     except HTTPException:
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query
 from typing import List
 from model.paymentmodel import Payment, PaymentCreate, PaymentUpdate
-from services.paymentcrud import PaymentCRUD
+from services.paymentcrud import PaymentCRUD, PAYMENT_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
+from utils.responses import list_response
+from utils.export import export_response, EXPORT_CHUNK_SIZE
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+payment_filters = ListParams(PAYMENT_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_payment(payment: PaymentCreate):
@@ -20,42 +28,92 @@ async def create_payment(payment: PaymentCreate):
     - **notes**: Payment notes (optional)
     """
     try:
-        result = PaymentCRUD.create_payment(payment)
+        result = await run_db(PaymentCRUD.create_payment, payment)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 # ============== GET ENDPOINTS ==============
 @router.get("/organization/{org_id}", response_model=List[Payment])
-async def get_payments_by_organization(org_id: int):
+async def get_payments_by_organization(org_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(payment_filters)):
     """
     Retrieve all payments for a specific organization.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=payment_date:gte:2024-01-01) and **sort** (e.g. ?sort=-payment_date) on: method, payment_date.
     """
     try:
-        payments = PaymentCRUD.get_payments_by_org(org_id)
-        return payments
+        payments = await run_db(PaymentCRUD.get_payments_by_org, org_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, payments, "payment_id", page.limit, filters)
+        return list_response(payments, Payment, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/invoice/{invoice_id}", response_model=List[Payment])
-async def get_payments_by_invoice(invoice_id: int):
+async def get_payments_by_invoice(invoice_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(payment_filters)):
     """
     Retrieve all payments for a specific invoice.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=payment_date:gte:2024-01-01) and **sort** (e.g. ?sort=-payment_date) on: method, payment_date.
     """
     try:
-        payments = PaymentCRUD.get_payments_by_invoice(invoice_id)
-        return payments
+        payments = await run_db(PaymentCRUD.get_payments_by_invoice, invoice_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, payments, "payment_id", page.limit, filters)
+        return list_response(payments, Payment, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_payments(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")):
+    """
+    Stream all payments as NDJSON (default) or CSV.
+    
+    - **format**: "ndjson" or "csv" (optional)
+    
+    Rows are read from the database in chunks and written as they arrive, so memory
+    use stays flat regardless of table size.
+    """
+    try:
+        chunks = PaymentCRUD.iter_payments_export(EXPORT_CHUNK_SIZE)
+        return await export_response(chunks, export_format, "payments")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[Payment])
+async def get_payments_by_ids(request: IdList):
+    """
+    Retrieve many payments by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Payment IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(PaymentCRUD.get_payments_by_ids, request.ids)
+        return list_response(records, Payment)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[Payment])
-async def get_all_payments():
+async def get_all_payments(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(payment_filters), multi: IdsParams = Depends()):
     """
     Retrieve all payments.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=payment_date:gte:2024-01-01) and **sort** (e.g. ?sort=-payment_date) on: method, payment_date.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those payments, in that order.
     """
     try:
-        payments = PaymentCRUD.get_all_payments()
-        return payments
+        if multi.ids is not None:
+            records = await run_db(PaymentCRUD.get_payments_by_ids, multi.ids)
+            return list_response(records, Payment)
+        
+        payments = await run_db(PaymentCRUD.get_all_payments, page.limit, page.after_id, filters)
+        set_next_cursor(response, payments, "payment_id", page.limit, filters)
+        return list_response(payments, Payment, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -65,7 +123,7 @@ async def get_payment(payment_id: int):
     Retrieve a single payment by ID.
     """
     try:
-        payment = PaymentCRUD.get_payment(payment_id)
+        payment = await run_db(PaymentCRUD.get_payment, payment_id)
         if not payment:
             raise HTTPException(status_code=404, detail="Payment not found")
         return payment
@@ -84,7 +142,7 @@ async def update_payment(payment_id: int, payment: PaymentUpdate):
     - All other fields are optional
     """
     try:
-        result = PaymentCRUD.update_payment(payment_id, payment)
+        result = await run_db(PaymentCRUD.update_payment, payment_id, payment)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -98,7 +156,7 @@ async def delete_payment(payment_id: int):
     Delete a payment by ID.
     """
     try:
-        result = PaymentCRUD.delete_payment(payment_id)
+        result = await run_db(PaymentCRUD.delete_payment, payment_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
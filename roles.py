@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.rolemodel import Role, RoleCreate, RoleUpdate
 from services.rolecrud import RoleCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
@@ -15,7 +17,7 @@ async def create_role(role: RoleCreate):
     - **name**: Role name (required)
     """
     try:
-        result = RoleCRUD.create_role(role)
+        result = await run_db(RoleCRUD.create_role, role)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -27,18 +29,37 @@ async def get_roles_by_organization(org_id: int):
     Retrieve all roles for a specific organization.
     """
     try:
-        roles = RoleCRUD.get_roles_by_org(org_id)
+        roles = await run_db(RoleCRUD.get_roles_by_org, org_id)
         return roles
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[Role])
+async def get_roles_by_ids(request: IdList):
+    """
+    Retrieve many roles by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Role IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(RoleCRUD.get_roles_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Role])
-async def get_all_roles():
+async def get_all_roles(multi: IdsParams = Depends()):
     """
     Retrieve all roles.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those roles, in that order.
     """
     try:
-        roles = RoleCRUD.get_all_roles()
+        if multi.ids is not None:
+            records = await run_db(RoleCRUD.get_roles_by_ids, multi.ids)
+            return records
+        
+        roles = await run_db(RoleCRUD.get_all_roles)
         return roles
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -49,7 +70,7 @@ async def get_role(role_id: int):
     Retrieve a single role by ID.
     """
     try:
-        role = RoleCRUD.get_role(role_id)
+        role = await run_db(RoleCRUD.get_role, role_id)
         if not role:
             raise HTTPException(status_code=404, detail="Role not found")
         return role
@@ -68,7 +89,7 @@ async def update_role(role_id: int, role: RoleUpdate):
     - All other fields are optional
     """
     try:
-        result = RoleCRUD.update_role(role_id, role)
+        result = await run_db(RoleCRUD.update_role, role_id, role)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -82,7 +103,7 @@ async def delete_role(role_id: int):
     Delete a role by ID.
     """
     try:
-        result = RoleCRUD.delete_role(role_id)
+        result = await run_db(RoleCRUD.delete_role, role_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
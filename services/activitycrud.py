@@ -1,6 +1,9 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.activitymodel import ActivityCreate, ActivityUpdate
 from datetime import datetime
+from utils.multiget import build_ids_query, order_by_ids
+
+ACTIVITY_SELECT = "SELECT activity_id, org_id, name, category_id, description, default_fee, active FROM [dbo].[Activities]"
 
 class ActivityCRUD:
     
@@ -16,7 +19,8 @@ class ActivityCRUD:
             (org_id, name, category_id, description, default_fee, active)
             VALUES (?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated activity_id in one round trip
+            activity_id = execute_insert(cursor, query, (
                 activity_data.org_id,
                 activity_data.name,
                 activity_data.category_id,
@@ -26,10 +30,6 @@ class ActivityCRUD:
             ))
             conn.commit()
             
-            # Get the inserted activity_id
-            cursor.execute("SELECT @@IDENTITY")
-            activity_id = cursor.fetchone()[0]
-            
             return {"activity_id": activity_id, **activity_data.dict()}
         
         except Exception as e:
@@ -46,22 +46,9 @@ class ActivityCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT activity_id, org_id, name, category_id, description, default_fee, active FROM [dbo].[Activities] WHERE activity_id = ?"
+            query = ACTIVITY_SELECT + " WHERE activity_id = ?"
             cursor.execute(query, (activity_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "activity_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "category_id": row[3],
-                    "description": row[4],
-                    "default_fee": row[5],
-                    "active": row[6],
-                   
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activity: {str(e)}")
@@ -69,6 +56,23 @@ class ActivityCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_activities_by_ids(ids: list):
+        """Retrieve the activities with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(ACTIVITY_SELECT, "activity_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "activity_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving activities: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def get_all_activities():
         """Retrieve all activities"""
@@ -76,22 +80,9 @@ class ActivityCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT activity_id, org_id, name, category_id, description, default_fee, active FROM [dbo].[Activities]"
+            query = ACTIVITY_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            activities = []
-            for row in rows:
-                activities.append({
-                    "activity_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "category_id": row[3],
-                    "description": row[4],
-                    "default_fee": row[5],
-                    "active": row[6]
-                })
-            return activities
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activities: {str(e)}")
@@ -106,22 +97,9 @@ class ActivityCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT activity_id, org_id, name, category_id, description, default_fee, active FROM [dbo].[Activities] WHERE org_id = ?"
+            query = ACTIVITY_SELECT + " WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            activities = []
-            for row in rows:
-                activities.append({
-                    "activity_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "category_id": row[3],
-                    "description": row[4],
-                    "default_fee": row[5],
-                    "active": row[6]
-                })
-            return activities
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activities: {str(e)}")
@@ -1,4 +1,4 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, fetch_dict, fetch_dicts
 from model.activitytrainermodel import ActivityTrainerCreate, ActivityTrainerUpdate
 
 class ActivityTrainerCRUD:
@@ -40,15 +40,7 @@ class ActivityTrainerCRUD:
         try:
             query = "SELECT activity_id, trainer_id, role FROM [dbo].[ActivityTrainers] WHERE activity_id = ? AND trainer_id = ?"
             cursor.execute(query, (activity_id, trainer_id))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "activity_id": row[0],
-                    "trainer_id": row[1],
-                    "role": row[2]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activity trainer: {str(e)}")
@@ -65,16 +57,7 @@ class ActivityTrainerCRUD:
         try:
             query = "SELECT activity_id, trainer_id, role FROM [dbo].[ActivityTrainers]"
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            activity_trainers = []
-            for row in rows:
-                activity_trainers.append({
-                    "activity_id": row[0],
-                    "trainer_id": row[1],
-                    "role": row[2]
-                })
-            return activity_trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activity trainers: {str(e)}")
@@ -91,16 +74,7 @@ class ActivityTrainerCRUD:
         try:
             query = "SELECT activity_id, trainer_id, role FROM [dbo].[ActivityTrainers] WHERE activity_id = ?"
             cursor.execute(query, (activity_id,))
-            rows = cursor.fetchall()
-            
-            activity_trainers = []
-            for row in rows:
-                activity_trainers.append({
-                    "activity_id": row[0],
-                    "trainer_id": row[1],
-                    "role": row[2]
-                })
-            return activity_trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving trainers for activity: {str(e)}")
@@ -117,16 +91,7 @@ class ActivityTrainerCRUD:
         try:
             query = "SELECT activity_id, trainer_id, role FROM [dbo].[ActivityTrainers] WHERE trainer_id = ?"
             cursor.execute(query, (trainer_id,))
-            rows = cursor.fetchall()
-            
-            activity_trainers = []
-            for row in rows:
-                activity_trainers.append({
-                    "activity_id": row[0],
-                    "trainer_id": row[1],
-                    "role": row[2]
-                })
-            return activity_trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activities for trainer: {str(e)}")
@@ -200,26 +165,14 @@ class ActivityTrainerCRUD:
         
         try:
             query = """
-            SELECT at.activity_id, at.trainer_id, at.role, t.first_name, t.last_name, a.name AS activity_name
+            SELECT at.activity_id, at.trainer_id, at.role, t.first_name AS trainer_first_name, t.last_name AS trainer_last_name, a.name AS activity_name
             FROM [dbo].[ActivityTrainers] at
             INNER JOIN [dbo].[Activities] a ON at.activity_id = a.activity_id
             INNER JOIN [dbo].[Trainers] t ON at.trainer_id = t.trainer_id
             WHERE a.org_id = ?
             """
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            activity_trainers = []
-            for row in rows:
-                activity_trainers.append({
-                    "activity_id": row[0],
-                    "trainer_id": row[1],
-                    "role": row[2],
-                    "trainer_first_name": row[3],
-                    "trainer_last_name": row[4],
-                    "activity_name": row[5]
-                })
-            return activity_trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving activity trainers for organization: {str(e)}")
@@ -1,5 +1,27 @@
-from utils.database import get_db_connection
-from model.attendancemodel import AttendanceCreate, AttendanceUpdate
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts, column_names, rows_to_dicts
+from utils.async_database import fetch_one, fetch_all, fetch_one_dict, fetch_all_dicts
+from utils.executor import async_counterpart
+from utils.pagination import build_page_query, build_version_query
+from utils.filtering import FilterField, ListQuery
+from utils.sync import SYNC_HORIZON_QUERY, SYNC_RETENTION_QUERY, build_changes_query, check_sync_retention, build_tombstones_query, merge_changes, tombstone_output
+from model.attendancemodel import AttendanceCreate, AttendanceUpdate, AttendanceBulkCreate
+from datetime import datetime
+from utils.multiget import build_ids_query, order_by_ids
+
+# Shared by the sync and async read paths so both run the same SQL
+ATTENDANCE_FROM = """FROM [dbo].[Attendance] a 
+            LEFT JOIN [dbo].[BatchSessions] bs ON a.session_id = bs.session_id"""
+ATTENDANCE_COLUMNS = "a.attendance_id, a.session_id, bs.session_name, a.enrollment_id, a.status, a.marked_at, a.marked_by"
+ATTENDANCE_SELECT = "SELECT " + ATTENDANCE_COLUMNS + " " + ATTENDANCE_FROM
+
+# session_name comes from BatchSessions, so a page's version covers both tables
+ATTENDANCE_VERSION_COLUMNS = ["a.row_version", "bs.row_version"]
+
+# Fields the attendance list endpoints can filter and sort on (each backed by an index)
+ATTENDANCE_FILTERS = {
+    "status": FilterField("a.status", str),
+    "marked_at": FilterField("a.marked_at", datetime, range=True, sortable=True, cast="DATETIME")
+}
 
 class AttendanceCRUD:
     
@@ -23,7 +45,8 @@ class AttendanceCRUD:
             (session_id, enrollment_id, status, marked_at, marked_by)
             VALUES (?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated attendance_id in one round trip
+            attendance_id = execute_insert(cursor, query, (
                 attendance_data.session_id,
                 attendance_data.enrollment_id,
                 attendance_data.status,
@@ -32,10 +55,6 @@ class AttendanceCRUD:
             ))
             conn.commit()
             
-            # Get the inserted attendance_id
-            cursor.execute("SELECT @@IDENTITY")
-            attendance_id = cursor.fetchone()[0]
-            
             return {"attendance_id": attendance_id, **attendance_data.dict()}
         
         except Exception as e:
@@ -45,6 +64,110 @@ class AttendanceCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def bulk_mark_attendance(session_id: int, bulk_data: AttendanceBulkCreate):
+        """
+        Mark attendance for a whole session roster in one transaction.
+
+        Records for enrollments that already have attendance in the session are
+        updated, new ones are inserted (uq_attendance_session_enrollment is never
+        violated), and records for enrollments outside the session's batch or
+        repeated in the request are rejected. Inserts and updates are sent with
+        fast_executemany.
+
+        Returns:
+            Dictionary with created/updated/rejected counts and a result per record
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Roster of the session's batch plus any attendance already marked; the
+            # locks keep concurrent bulk calls from inserting the same rows
+            roster_query = """
+            SELECT e.enrollment_id, a.attendance_id
+            FROM [dbo].[BatchSessions] bs
+            JOIN [dbo].[Enrollments] e ON e.batch_id = bs.batch_id
+            LEFT JOIN [dbo].[Attendance] a WITH (UPDLOCK, HOLDLOCK)
+                ON a.session_id = bs.session_id AND a.enrollment_id = e.enrollment_id
+            WHERE bs.session_id = ?
+            """
+            cursor.execute(roster_query, (session_id,))
+            roster = {row[0]: row[1] for row in cursor.fetchall()}
+            
+            if not roster:
+                cursor.execute("SELECT COUNT(*) FROM [dbo].[BatchSessions] WHERE session_id = ?", (session_id,))
+                if cursor.fetchone()[0] == 0:
+                    raise Exception(f"Session {session_id} not found")
+            
+            default_marked_at = bulk_data.marked_at or datetime.now()
+            results = []
+            inserts = []
+            updates = []
+            seen = set()
+            
+            for record in bulk_data.records:
+                marked_at = record.marked_at or default_marked_at
+                marked_by = record.marked_by if record.marked_by is not None else bulk_data.marked_by
+                
+                if record.enrollment_id in seen:
+                    results.append({"enrollment_id": record.enrollment_id, "result": "rejected",
+                                    "detail": "Duplicate enrollment in request"})
+                    continue
+                seen.add(record.enrollment_id)
+                
+                if record.enrollment_id not in roster:
+                    results.append({"enrollment_id": record.enrollment_id, "result": "rejected",
+                                    "detail": f"Enrollment is not part of session {session_id}'s batch"})
+                elif roster[record.enrollment_id] is None:
+                    inserts.append((session_id, record.enrollment_id, record.status, marked_at, marked_by))
+                    results.append({"enrollment_id": record.enrollment_id, "result": "created"})
+                else:
+                    updates.append((record.status, marked_at, marked_by, session_id, record.enrollment_id))
+                    results.append({"enrollment_id": record.enrollment_id, "result": "updated",
+                                    "attendance_id": roster[record.enrollment_id]})
+            
+            cursor.fast_executemany = True
+            if inserts:
+                cursor.executemany("""
+                INSERT INTO [dbo].[Attendance] 
+                (session_id, enrollment_id, status, marked_at, marked_by)
+                VALUES (?, ?, ?, ?, ?)
+                """, inserts)
+            if updates:
+                cursor.executemany("""
+                UPDATE [dbo].[Attendance] SET status = ?, marked_at = ?, marked_by = ?
+                WHERE session_id = ? AND enrollment_id = ?
+                """, updates)
+            
+            if inserts:
+                # fast_executemany does not return identities, so read them back in one query
+                cursor.execute(
+                    "SELECT enrollment_id, attendance_id FROM [dbo].[Attendance] WHERE session_id = ?",
+                    (session_id,)
+                )
+                attendance_ids = {row[0]: row[1] for row in cursor.fetchall()}
+                for result in results:
+                    if result["result"] == "created":
+                        result["attendance_id"] = attendance_ids.get(result["enrollment_id"])
+            
+            conn.commit()
+            
+            return {
+                "session_id": session_id,
+                "created": len(inserts),
+                "updated": len(updates),
+                "rejected": len(results) - len(inserts) - len(updates),
+                "results": results
+            }
+        
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error marking attendance: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def get_attendance(attendance_id: int):
         """Retrieve a single attendance record by ID"""
@@ -52,24 +175,9 @@ class AttendanceCRUD:
         cursor = conn.cursor()
         
         try:
-            query = """SELECT a.attendance_id, a.session_id, bs.session_name, a.enrollment_id, a.status, a.marked_at, a.marked_by 
-            FROM [dbo].[Attendance] a 
-            LEFT JOIN [dbo].[BatchSessions] bs ON a.session_id = bs.session_id 
-            WHERE a.attendance_id = ?"""
+            query = ATTENDANCE_SELECT + " WHERE a.attendance_id = ?"
             cursor.execute(query, (attendance_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "attendance_id": row[0],
-                    "session_id": row[1],
-                    "session_name": row[2],
-                    "enrollment_id": row[3],
-                    "status": row[4],
-                    "marked_at": row[5],
-                    "marked_by": row[6]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving attendance: {str(e)}")
@@ -78,30 +186,15 @@ class AttendanceCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_attendance():
-        """Retrieve all attendance records"""
+    def get_attendance_by_ids(ids: list):
+        """Retrieve the attendance records with the given IDs, in the order given (unknown IDs are skipped)"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = """SELECT a.attendance_id, a.session_id, bs.session_name, a.enrollment_id, a.status, a.marked_at, a.marked_by 
-            FROM [dbo].[Attendance] a 
-            LEFT JOIN [dbo].[BatchSessions] bs ON a.session_id = bs.session_id"""
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            attendance_records = []
-            for row in rows:
-                attendance_records.append({
-                    "attendance_id": row[0],
-                    "session_id": row[1],
-                    "session_name": row[2],
-                    "enrollment_id": row[3],
-                    "status": row[4],
-                    "marked_at": row[5],
-                    "marked_by": row[6]
-                })
-            return attendance_records
+            query, params = build_ids_query(ATTENDANCE_SELECT, "a.attendance_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "attendance_id", ids)
         
         except Exception as e:
             raise Exception(f"Error retrieving attendance records: {str(e)}")
@@ -110,31 +203,60 @@ class AttendanceCRUD:
             conn.close()
 
     @staticmethod
-    def get_attendance_by_session(session_id: int):
-        """Retrieve all attendance records for a specific session"""
+    def get_all_attendance(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve attendance records, optionally one keyset page at a time"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = """SELECT a.attendance_id, a.session_id, bs.session_name, a.enrollment_id, a.status, a.marked_at, a.marked_by 
-            FROM [dbo].[Attendance] a 
-            LEFT JOIN [dbo].[BatchSessions] bs ON a.session_id = bs.session_id 
-            WHERE a.session_id = ?"""
-            cursor.execute(query, (session_id,))
-            rows = cursor.fetchall()
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance records: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def iter_attendance_export(chunk_size: int = 1000):
+        """
+        Yield all attendance records in chunks of up to chunk_size dicts, for streaming exports.
+
+        Rows are pulled from the cursor with fetchmany so memory stays flat regardless
+        of table size; the connection is held until the generator is exhausted or closed.
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", [], [])
+            cursor.execute(query, params)
+            columns = column_names(cursor)
             
-            attendance_records = []
-            for row in rows:
-                attendance_records.append({
-                    "attendance_id": row[0],
-                    "session_id": row[1],
-                    "session_name": row[2],
-                    "enrollment_id": row[3],
-                    "status": row[4],
-                    "marked_at": row[5],
-                    "marked_by": row[6]
-                })
-            return attendance_records
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows_to_dicts(columns, rows)
+        
+        except Exception as e:
+            raise Exception(f"Error exporting attendance records: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_attendance_by_session(session_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve all attendance records for a specific session"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", ["a.session_id = ?"], [session_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving attendance records: {str(e)}")
@@ -143,31 +265,39 @@ class AttendanceCRUD:
             conn.close()
 
     @staticmethod
-    def get_attendance_by_enrollment(enrollment_id: int):
+    def get_attendance_by_session_version(session_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """
+        Summarise the page get_attendance_by_session would return, for its ETag.
+
+        Returns:
+            Tuple of (count, min attendance_id, max attendance_id, max attendance
+            rowversion, max session rowversion)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_version_query(ATTENDANCE_FROM, "a.attendance_id", ATTENDANCE_VERSION_COLUMNS,
+                                                ["a.session_id = ?"], [session_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return tuple(cursor.fetchone())
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance version: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_attendance_by_enrollment(enrollment_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all attendance records for a specific enrollment"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = """SELECT a.attendance_id, a.session_id, bs.session_name, a.enrollment_id, a.status, a.marked_at, a.marked_by 
-            FROM [dbo].[Attendance] a 
-            LEFT JOIN [dbo].[BatchSessions] bs ON a.session_id = bs.session_id 
-            WHERE a.enrollment_id = ?"""
-            cursor.execute(query, (enrollment_id,))
-            rows = cursor.fetchall()
-            
-            attendance_records = []
-            for row in rows:
-                attendance_records.append({
-                    "attendance_id": row[0],
-                    "session_id": row[1],
-                    "session_name": row[2],
-                    "enrollment_id": row[3],
-                    "status": row[4],
-                    "marked_at": row[5],
-                    "marked_by": row[6]
-                })
-            return attendance_records
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", ["a.enrollment_id = ?"], [enrollment_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving attendance records: {str(e)}")
@@ -175,6 +305,48 @@ class AttendanceCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_attendance_changes(since_version: int, limit: int, session_id: int = None):
+        """
+        Retrieve the attendance records inserted, updated or deleted after since_version, for delta sync.
+
+        Args:
+            since_version: Version decoded from the client's sync token (0 for a full sync)
+            limit: Maximum number of changes to return
+            session_id: Only sync the attendance records of this session (optional)
+
+        Returns:
+            Dictionary with changes, deleted ids, sync_token and has_more
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(SYNC_HORIZON_QUERY)
+            horizon = cursor.fetchone()[0]
+            
+            conditions, params = (["a.session_id = ?"], [session_id]) if session_id is not None else ([], [])
+            query, params = build_changes_query(ATTENDANCE_COLUMNS, ATTENDANCE_FROM, "a.row_version", conditions, params,
+                                                since_version, horizon, limit)
+            cursor.execute(query, params)
+            rows = fetch_dicts(cursor)
+            
+            query, params = build_tombstones_query("attendance", "[dbo].[Attendance]", "attendance_id", "session_id", session_id,
+                                                   since_version, horizon, limit)
+            cursor.execute(query, params)
+            tombstones = cursor.fetchall()
+            
+            cursor.execute(SYNC_RETENTION_QUERY)
+            check_sync_retention(cursor.fetchone()[0], since_version)
+            
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance changes: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def update_attendance(attendance_id: int, attendance_data: AttendanceUpdate):
         """Update an existing attendance record"""
@@ -207,7 +379,9 @@ class AttendanceCRUD:
             
             values.append(attendance_id)
             
-            query = f"UPDATE [dbo].[Attendance] SET {', '.join(update_fields)} WHERE attendance_id = ?"
+            # Moving the record to another session leaves a tombstone in the old one for delta sync
+            output = tombstone_output("attendance", "attendance_id", "session_id") if attendance_data.session_id is not None else ""
+            query = f"UPDATE [dbo].[Attendance] SET {', '.join(update_fields)} {output} WHERE attendance_id = ?"
             cursor.execute(query, values)
             conn.commit()
             
@@ -230,7 +404,8 @@ class AttendanceCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "DELETE FROM [dbo].[Attendance] WHERE attendance_id = ?"
+            # The tombstone tells delta sync clients about the delete
+            query = f"DELETE FROM [dbo].[Attendance] {tombstone_output('attendance', 'attendance_id', 'session_id')} WHERE attendance_id = ?"
             cursor.execute(query, (attendance_id,))
             conn.commit()
             
@@ -245,3 +420,82 @@ class AttendanceCRUD:
         finally:
             cursor.close()
             conn.close()
+
+    # ============== ASYNC BACKEND (DB_BACKEND=async) ==============
+    @staticmethod
+    @async_counterpart(get_attendance)
+    async def get_attendance_async(attendance_id: int):
+        """Async implementation of get_attendance"""
+        try:
+            return await fetch_one_dict(ATTENDANCE_SELECT + " WHERE a.attendance_id = ?", (attendance_id,))
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_all_attendance)
+    async def get_all_attendance_async(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_all_attendance"""
+        try:
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", [], [], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance records: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_attendance_by_session)
+    async def get_attendance_by_session_async(session_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_attendance_by_session"""
+        try:
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", ["a.session_id = ?"], [session_id], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance records: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_attendance_by_session_version)
+    async def get_attendance_by_session_version_async(session_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_attendance_by_session_version"""
+        try:
+            query, params = build_version_query(ATTENDANCE_FROM, "a.attendance_id", ATTENDANCE_VERSION_COLUMNS,
+                                                ["a.session_id = ?"], [session_id], limit, after_id, list_query)
+            return tuple(await fetch_one(query, params))
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance version: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_attendance_by_enrollment)
+    async def get_attendance_by_enrollment_async(enrollment_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_attendance_by_enrollment"""
+        try:
+            query, params = build_page_query(ATTENDANCE_SELECT, "a.attendance_id", ["a.enrollment_id = ?"], [enrollment_id], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance records: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_attendance_changes)
+    async def get_attendance_changes_async(since_version: int, limit: int, session_id: int = None):
+        """Async implementation of get_attendance_changes"""
+        try:
+            horizon = (await fetch_one(SYNC_HORIZON_QUERY))[0]
+            conditions, params = (["a.session_id = ?"], [session_id]) if session_id is not None else ([], [])
+            query, params = build_changes_query(ATTENDANCE_COLUMNS, ATTENDANCE_FROM, "a.row_version", conditions, params,
+                                                since_version, horizon, limit)
+            rows = await fetch_all_dicts(query, params)
+            query, params = build_tombstones_query("attendance", "[dbo].[Attendance]", "attendance_id", "session_id", session_id,
+                                                   since_version, horizon, limit)
+            tombstones = await fetch_all(query, params)
+            check_sync_retention((await fetch_one(SYNC_RETENTION_QUERY))[0], since_version)
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance changes: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_attendance_by_ids)
+    async def get_attendance_by_ids_async(ids: list):
+        """Async implementation of get_attendance_by_ids"""
+        try:
+            query, params = build_ids_query(ATTENDANCE_SELECT, "a.attendance_id", ids)
+            return order_by_ids(await fetch_all_dicts(query, params), "attendance_id", ids)
+        except Exception as e:
+            raise Exception(f"Error retrieving attendance records: {str(e)}")
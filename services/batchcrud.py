@@ -1,5 +1,8 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.batchmodel import BatchCreate, BatchUpdate
+from utils.multiget import build_ids_query, order_by_ids
+
+BATCH_SELECT = "SELECT batch_id, org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status FROM [dbo].[Batches]"
 
 class BatchCRUD:
     
@@ -15,7 +18,8 @@ class BatchCRUD:
             (org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated batch_id in one round trip
+            batch_id = execute_insert(cursor, query, (
                 batch_data.org_id,
                 batch_data.activity_id,
                 batch_data.fee_plan_id,
@@ -28,10 +32,6 @@ class BatchCRUD:
             ))
             conn.commit()
             
-            # Get the inserted batch_id
-            cursor.execute("SELECT @@IDENTITY")
-            batch_id = cursor.fetchone()[0]
-            
             return {"batch_id": batch_id, **batch_data.dict()}
         
         except Exception as e:
@@ -48,24 +48,9 @@ class BatchCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT batch_id, org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status FROM [dbo].[Batches] WHERE batch_id = ?"
+            query = BATCH_SELECT + " WHERE batch_id = ?"
             cursor.execute(query, (batch_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "batch_id": row[0],
-                    "org_id": row[1],
-                    "activity_id": row[2],
-                    "fee_plan_id": row[3],
-                    "name": row[4],
-                    "start_date": row[5],
-                    "end_date": row[6],
-                    "capacity": row[7],
-                    "location": row[8],
-                    "status": row[9]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batch: {str(e)}")
@@ -73,6 +58,23 @@ class BatchCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_batches_by_ids(ids: list):
+        """Retrieve the batches with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(BATCH_SELECT, "batch_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "batch_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving batches: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def get_all_batches():
         """Retrieve all batches"""
@@ -80,25 +82,9 @@ class BatchCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT batch_id, org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status FROM [dbo].[Batches]"
+            query = BATCH_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            batches = []
-            for row in rows:
-                batches.append({
-                    "batch_id": row[0],
-                    "org_id": row[1],
-                    "activity_id": row[2],
-                    "fee_plan_id": row[3],
-                    "name": row[4],
-                    "start_date": row[5],
-                    "end_date": row[6],
-                    "capacity": row[7],
-                    "location": row[8],
-                    "status": row[9]
-                })
-            return batches
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batches: {str(e)}")
@@ -113,25 +99,9 @@ class BatchCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT batch_id, org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status FROM [dbo].[Batches] WHERE org_id = ?"
+            query = BATCH_SELECT + " WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            batches = []
-            for row in rows:
-                batches.append({
-                    "batch_id": row[0],
-                    "org_id": row[1],
-                    "activity_id": row[2],
-                    "fee_plan_id": row[3],
-                    "name": row[4],
-                    "start_date": row[5],
-                    "end_date": row[6],
-                    "capacity": row[7],
-                    "location": row[8],
-                    "status": row[9]
-                })
-            return batches
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batches: {str(e)}")
@@ -146,25 +116,9 @@ class BatchCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT batch_id, org_id, activity_id, fee_plan_id, name, start_date, end_date, capacity, location, status FROM [dbo].[Batches] WHERE activity_id = ?"
+            query = BATCH_SELECT + " WHERE activity_id = ?"
             cursor.execute(query, (activity_id,))
-            rows = cursor.fetchall()
-            
-            batches = []
-            for row in rows:
-                batches.append({
-                    "batch_id": row[0],
-                    "org_id": row[1],
-                    "activity_id": row[2],
-                    "fee_plan_id": row[3],
-                    "name": row[4],
-                    "start_date": row[5],
-                    "end_date": row[6],
-                    "capacity": row[7],
-                    "location": row[8],
-                    "status": row[9]
-                })
-            return batches
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batches: {str(e)}")
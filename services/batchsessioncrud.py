@@ -1,5 +1,15 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.batchsessionmodel import BatchSessionCreate, BatchSessionUpdate
+from utils.async_database import fetch_one, fetch_all, fetch_one_dict, fetch_all_dicts
+from utils.executor import async_counterpart
+from utils.pagination import build_version_query
+from utils.sync import SYNC_HORIZON_QUERY, SYNC_RETENTION_QUERY, build_changes_query, check_sync_retention, build_tombstones_query, merge_changes, tombstone_output
+from utils.multiget import build_ids_query, order_by_ids
+
+# Shared by the sync and async read paths so both run the same SQL
+BATCH_SESSION_FROM = "FROM [dbo].[BatchSessions]"
+BATCH_SESSION_COLUMNS = "session_id, batch_id, session_name, session_date, start_time, end_time, status, notes"
+BATCH_SESSION_SELECT = "SELECT " + BATCH_SESSION_COLUMNS + " " + BATCH_SESSION_FROM
 
 class BatchSessionCRUD:
     
@@ -33,7 +43,8 @@ class BatchSessionCRUD:
             (batch_id, session_name, session_date, start_time, end_time, status, notes)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated session_id in one round trip
+            session_id = execute_insert(cursor, query, (
                 batch_session_data.batch_id,
                 batch_session_data.session_name,
                 batch_session_data.session_date,
@@ -44,10 +55,6 @@ class BatchSessionCRUD:
             ))
             conn.commit()
             
-            # Get the inserted session_id
-            cursor.execute("SELECT @@IDENTITY")
-            session_id = cursor.fetchone()[0]
-            
             return {"session_id": session_id, **batch_session_data.dict()}
         
         except Exception as e:
@@ -64,22 +71,9 @@ class BatchSessionCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT session_id, batch_id, session_name, session_date, start_time, end_time, status, notes FROM [dbo].[BatchSessions] WHERE session_id = ?"
+            query = BATCH_SESSION_SELECT + " WHERE session_id = ?"
             cursor.execute(query, (session_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "session_id": row[0],
-                    "batch_id": row[1],
-                    "session_name": row[2],
-                    "session_date": row[3],
-                    "start_time": row[4],
-                    "end_time": row[5],
-                    "status": row[6],
-                    "notes": row[7]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batch session: {str(e)}")
@@ -87,6 +81,23 @@ class BatchSessionCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_batch_sessions_by_ids(ids: list):
+        """Retrieve the batch sessions with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(BATCH_SESSION_SELECT, "session_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "session_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def get_all_batch_sessions():
         """Retrieve all batch sessions"""
@@ -94,23 +105,9 @@ class BatchSessionCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT session_id, batch_id, session_name, session_date, start_time, end_time, status, notes FROM [dbo].[BatchSessions]"
+            query = BATCH_SESSION_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            batch_sessions = []
-            for row in rows:
-                batch_sessions.append({
-                    "session_id": row[0],
-                    "batch_id": row[1],
-                    "session_name": row[2],
-                    "session_date": row[3],
-                    "start_time": row[4],
-                    "end_time": row[5],
-                    "status": row[6],
-                    "notes": row[7]
-                })
-            return batch_sessions
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batch sessions: {str(e)}")
@@ -125,23 +122,9 @@ class BatchSessionCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT session_id, batch_id, session_name, session_date, start_time, end_time, status, notes FROM [dbo].[BatchSessions] WHERE batch_id = ?"
+            query = BATCH_SESSION_SELECT + " WHERE batch_id = ?"
             cursor.execute(query, (batch_id,))
-            rows = cursor.fetchall()
-            
-            batch_sessions = []
-            for row in rows:
-                batch_sessions.append({
-                    "session_id": row[0],
-                    "batch_id": row[1],
-                    "session_name": row[2],
-                    "session_date": row[3],
-                    "start_time": row[4],
-                    "end_time": row[5],
-                    "status": row[6],
-                    "notes": row[7]
-                })
-            return batch_sessions
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving batch sessions: {str(e)}")
@@ -149,6 +132,70 @@ class BatchSessionCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_sessions_by_batch_version(batch_id: int):
+        """
+        Summarise the sessions get_sessions_by_batch would return, for its ETag.
+
+        Returns:
+            Tuple of (count, min session_id, max session_id, max rowversion)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_version_query(BATCH_SESSION_FROM, "session_id", ["row_version"], ["batch_id = ?"], [batch_id])
+            cursor.execute(query, params)
+            return tuple(cursor.fetchone())
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions version: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_batch_session_changes(since_version: int, limit: int, batch_id: int = None):
+        """
+        Retrieve the batch sessions inserted, updated or deleted after since_version, for delta sync.
+
+        Args:
+            since_version: Version decoded from the client's sync token (0 for a full sync)
+            limit: Maximum number of changes to return
+            batch_id: Only sync the batch sessions of this batch (optional)
+
+        Returns:
+            Dictionary with changes, deleted ids, sync_token and has_more
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(SYNC_HORIZON_QUERY)
+            horizon = cursor.fetchone()[0]
+            
+            conditions, params = (["batch_id = ?"], [batch_id]) if batch_id is not None else ([], [])
+            query, params = build_changes_query(BATCH_SESSION_COLUMNS, BATCH_SESSION_FROM, "row_version", conditions, params,
+                                                since_version, horizon, limit)
+            cursor.execute(query, params)
+            rows = fetch_dicts(cursor)
+            
+            query, params = build_tombstones_query("batch_sessions", "[dbo].[BatchSessions]", "session_id", "batch_id", batch_id,
+                                                   since_version, horizon, limit)
+            cursor.execute(query, params)
+            tombstones = cursor.fetchall()
+            
+            cursor.execute(SYNC_RETENTION_QUERY)
+            check_sync_retention(cursor.fetchone()[0], since_version)
+            
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving batch session changes: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def update_batch_session(session_id: int, batch_session_data: BatchSessionUpdate):
         """Update an existing batch session"""
@@ -187,7 +234,9 @@ class BatchSessionCRUD:
             
             values.append(session_id)
             
-            query = f"UPDATE [dbo].[BatchSessions] SET {', '.join(update_fields)} WHERE session_id = ?"
+            # Moving the session to another batch leaves a tombstone in the old one for delta sync
+            output = tombstone_output("batch_sessions", "session_id", "batch_id") if batch_session_data.batch_id is not None else ""
+            query = f"UPDATE [dbo].[BatchSessions] SET {', '.join(update_fields)} {output} WHERE session_id = ?"
             cursor.execute(query, values)
             conn.commit()
             
@@ -210,7 +259,8 @@ class BatchSessionCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "DELETE FROM [dbo].[BatchSessions] WHERE session_id = ?"
+            # The tombstone tells delta sync clients about the delete
+            query = f"DELETE FROM [dbo].[BatchSessions] {tombstone_output('batch_sessions', 'session_id', 'batch_id')} WHERE session_id = ?"
             cursor.execute(query, (session_id,))
             conn.commit()
             
@@ -225,3 +275,69 @@ class BatchSessionCRUD:
         finally:
             cursor.close()
             conn.close()
+
+    # ============== ASYNC BACKEND (DB_BACKEND=async) ==============
+    @staticmethod
+    @async_counterpart(get_batch_session)
+    async def get_batch_session_async(session_id: int):
+        """Async implementation of get_batch_session"""
+        try:
+            return await fetch_one_dict(BATCH_SESSION_SELECT + " WHERE session_id = ?", (session_id,))
+        except Exception as e:
+            raise Exception(f"Error retrieving batch session: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_all_batch_sessions)
+    async def get_all_batch_sessions_async():
+        """Async implementation of get_all_batch_sessions"""
+        try:
+            return await fetch_all_dicts(BATCH_SESSION_SELECT)
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_sessions_by_batch)
+    async def get_sessions_by_batch_async(batch_id: int):
+        """Async implementation of get_sessions_by_batch"""
+        try:
+            return await fetch_all_dicts(BATCH_SESSION_SELECT + " WHERE batch_id = ?", (batch_id,))
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_sessions_by_batch_version)
+    async def get_sessions_by_batch_version_async(batch_id: int):
+        """Async implementation of get_sessions_by_batch_version"""
+        try:
+            query, params = build_version_query(BATCH_SESSION_FROM, "session_id", ["row_version"], ["batch_id = ?"], [batch_id])
+            return tuple(await fetch_one(query, params))
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions version: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_batch_session_changes)
+    async def get_batch_session_changes_async(since_version: int, limit: int, batch_id: int = None):
+        """Async implementation of get_batch_session_changes"""
+        try:
+            horizon = (await fetch_one(SYNC_HORIZON_QUERY))[0]
+            conditions, params = (["batch_id = ?"], [batch_id]) if batch_id is not None else ([], [])
+            query, params = build_changes_query(BATCH_SESSION_COLUMNS, BATCH_SESSION_FROM, "row_version", conditions, params,
+                                                since_version, horizon, limit)
+            rows = await fetch_all_dicts(query, params)
+            query, params = build_tombstones_query("batch_sessions", "[dbo].[BatchSessions]", "session_id", "batch_id", batch_id,
+                                                   since_version, horizon, limit)
+            tombstones = await fetch_all(query, params)
+            check_sync_retention((await fetch_one(SYNC_RETENTION_QUERY))[0], since_version)
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        except Exception as e:
+            raise Exception(f"Error retrieving batch session changes: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_batch_sessions_by_ids)
+    async def get_batch_sessions_by_ids_async(ids: list):
+        """Async implementation of get_batch_sessions_by_ids"""
+        try:
+            query, params = build_ids_query(BATCH_SESSION_SELECT, "session_id", ids)
+            return order_by_ids(await fetch_all_dicts(query, params), "session_id", ids)
+        except Exception as e:
+            raise Exception(f"Error retrieving batch sessions: {str(e)}")
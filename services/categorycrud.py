@@ -1,9 +1,17 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.categorymodel import CategoryCreate, CategoryUpdate
+from utils.reference_cache import get_reference_cache, cached_read, invalidates
+from utils.multiget import build_ids_query, order_by_ids
+
+CATEGORY_SELECT = "SELECT category_id, name, active FROM [dbo].[Categories]"
+
+# Reads are cached per process and invalidated by the writes below
+category_cache = get_reference_cache("categories")
 
 class CategoryCRUD:
     
     @staticmethod
+    @invalidates(category_cache)
     def create_category(category_data: CategoryCreate):
         """Insert a new category into the database"""
         conn = get_db_connection()
@@ -15,16 +23,13 @@ class CategoryCRUD:
             (name, active)
             VALUES (?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated category_id in one round trip
+            category_id = execute_insert(cursor, query, (
                 category_data.name,
                 category_data.active if category_data.active is not None else True
             ))
             conn.commit()
             
-            # Get the inserted category_id
-            cursor.execute("SELECT @@IDENTITY")
-            category_id = cursor.fetchone()[0]
-            
             return {"category_id": category_id, **category_data.dict()}
         
         except Exception as e:
@@ -35,23 +40,16 @@ class CategoryCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(category_cache)
     def get_category(category_id: int):
         """Retrieve a single category by ID"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT category_id, name, active FROM [dbo].[Categories] WHERE category_id = ?"
+            query = CATEGORY_SELECT + " WHERE category_id = ?"
             cursor.execute(query, (category_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "category_id": row[0],
-                    "name": row[1],
-                    "active": row[2]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving category: {str(e)}")
@@ -60,24 +58,34 @@ class CategoryCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(category_cache)
+    def get_categories_by_ids(ids: list):
+        """Retrieve the categories with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(CATEGORY_SELECT, "category_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "category_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving categories: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    @cached_read(category_cache)
     def get_all_categories():
         """Retrieve all categories"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT category_id, name, active FROM [dbo].[Categories]"
+            query = CATEGORY_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            categories = []
-            for row in rows:
-                categories.append({
-                    "category_id": row[0],
-                    "name": row[1],
-                    "active": row[2]
-                })
-            return categories
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving categories: {str(e)}")
@@ -86,6 +94,7 @@ class CategoryCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(category_cache)
     def update_category(category_id: int, category_data: CategoryUpdate):
         """Update an existing category"""
         conn = get_db_connection()
@@ -125,6 +134,7 @@ class CategoryCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(category_cache)
     def delete_category(category_id: int):
         """Delete a category"""
         conn = get_db_connection()
@@ -1,8 +1,33 @@
-from utils.database import get_db_connection
-from model.enrollmentmodel import EnrollmentCreate, EnrollmentUpdate
-from utils.email_helper import EmailHelper
+from utils.database import get_db_connection, chunked, execute_insert, fetch_dict, fetch_dicts
+from model.enrollmentmodel import EnrollmentCreate, EnrollmentUpdate, EnrollmentBulkCreate
+from datetime import date
+from utils.async_database import fetch_one, fetch_all, fetch_one_dict, fetch_all_dicts
+from utils.executor import async_counterpart
+from utils.pagination import build_page_query, build_version_query
+from utils.filtering import FilterField, ListQuery
+from utils.sync import SYNC_HORIZON_QUERY, SYNC_RETENTION_QUERY, build_changes_query, check_sync_retention, build_tombstones_query, merge_changes, tombstone_output
+from utils.email_outbox import enqueue_email, wake_outbox_workers
+from services.studentcrud import STUDENT_SELECT
+from services.batchcrud import BATCH_SELECT
+from services.invoicecrud import INVOICE_SELECT
+from services.paymentcrud import PAYMENT_SELECT
+from utils.multiget import build_ids_query, order_by_ids
 import os
 
+# Shared by the sync and async read paths so both run the same SQL
+ENROLLMENT_FROM = "FROM [dbo].[Enrollments]"
+ENROLLMENT_COLUMNS = "enrollment_id, org_id, batch_id, student_id, enrolled_on, status"
+ENROLLMENT_SELECT = "SELECT " + ENROLLMENT_COLUMNS + " " + ENROLLMENT_FROM
+
+# Fields the enrollment list endpoints can filter and sort on (each backed by an index)
+ENROLLMENT_FILTERS = {
+    "status": FilterField("status", str),
+    "enrolled_on": FilterField("enrolled_on", date, range=True, sortable=True)
+}
+
+# Relations get_enrollment_detail can load; invoices.payments implies invoices
+ENROLLMENT_INCLUDES = ("student", "batch", "invoices", "invoices.payments")
+
 class EnrollmentCRUD:
     
     @staticmethod
@@ -17,18 +42,14 @@ class EnrollmentCRUD:
             (org_id, batch_id, student_id, enrolled_on, status)
             VALUES (?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated enrollment_id in one round trip
+            enrollment_id = execute_insert(cursor, query, (
                 enrollment_data.org_id,
                 enrollment_data.batch_id,
                 enrollment_data.student_id,
                 enrollment_data.enrolled_on,
                 enrollment_data.status
             ))
-            conn.commit()
-            
-            # Get the inserted enrollment_id
-            cursor.execute("SELECT @@IDENTITY")
-            enrollment_id = cursor.fetchone()[0]
             
             # Fetch student details including guardian email
             student_query = """
@@ -39,43 +60,19 @@ class EnrollmentCRUD:
             cursor.execute(student_query, (enrollment_data.student_id,))
             student_row = cursor.fetchone()
             
-            # Send email to guardian if guardian_email exists
+            # Queue email to guardian if guardian_email exists (committed with the enrollment)
             if student_row and student_row[3]:  # student_row[3] is guardian_email
-                try:
-                    student_first_name = student_row[0]
-                    student_last_name = student_row[1]
-                    guardian_name = student_row[2]
-                    guardian_email = student_row[3]
-                    
-                    email_helper = EmailHelper()
-                    
-                    html_body = f"""
-                    <html>
-                        <body style="font-family: Arial, sans-serif;">
-                            <h2>Enrollment Confirmation</h2>
-                            <p>Dear {guardian_name},</p>
-                            <p>We are pleased to confirm that your ward <strong>{student_first_name} {student_last_name}</strong> has been successfully enrolled in our program.</p>
-                            <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                                <p><strong>Enrollment Details:</strong></p>
-                                <p><strong>Enrollment ID:</strong> <code style="background-color: #e0e0e0; padding: 5px;">{enrollment_id}</code></p>
-                                <p><strong>Student Name:</strong> {student_first_name} {student_last_name}</p>
-                                <p><strong>Enrollment Date:</strong> {enrollment_data.enrolled_on}</p>
-                            </div>
-                            <p>Please keep this Enrollment ID for your records as it may be required for future reference.</p>
-                            <p>If you have any questions regarding the enrollment, please do not hesitate to contact us.</p>
-                            <p>Best regards,<br>System Administration Team</p>
-                        </body>
-                    </html>
-                    """
-                    
-                    email_helper.send_html_email(
-                        recipient_email=guardian_email,
-                        subject=f"Enrollment Confirmation - {student_first_name} {student_last_name}",
-                        html_body=html_body
-                    )
-                except Exception as email_error:
-                    # Log email error but don't fail enrollment creation
-                    print(f"Warning: Could not send enrollment email to {guardian_email}: {str(email_error)}")
+                EnrollmentCRUD.queue_enrollment_notifications(cursor, [{
+                    "enrollment_id": enrollment_id,
+                    "enrolled_on": enrollment_data.enrolled_on,
+                    "first_name": student_row[0],
+                    "last_name": student_row[1],
+                    "guardian_name": student_row[2],
+                    "guardian_email": student_row[3]
+                }])
+            
+            conn.commit()
+            wake_outbox_workers()
             
             return {"enrollment_id": enrollment_id, **enrollment_data.dict()}
         
@@ -92,6 +89,169 @@ class EnrollmentCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def bulk_create_enrollments(bulk_data: EnrollmentBulkCreate, batch_size: int = 500):
+        """
+        Insert many enrollments in one transaction.
+
+        Rows whose (batch_id, student_id) already exists, or repeats an earlier row in
+        the request, are reported as duplicates instead of violating
+        uq_enrollments_batch_student; rows referencing a missing batch or student are
+        rejected. New rows are inserted batch_size at a time with fast_executemany.
+
+        Guardian confirmation emails are queued in the email outbox as part of the
+        same transaction and delivered by the outbox workers.
+
+        Returns:
+            Dictionary with counts and a result per row (in request order)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            records = bulk_data.records
+            batch_ids = sorted({record.batch_id for record in records})
+            student_ids = sorted({record.student_id for record in records})
+            
+            # Existing enrollments for the affected batches, locked until commit so a
+            # concurrent import cannot insert the same pairs
+            existing = set()
+            known_batches = set()
+            for ids in chunked(batch_ids):
+                placeholders = ", ".join("?" * len(ids))
+                cursor.execute(
+                    f"SELECT batch_id FROM [dbo].[Batches] WHERE batch_id IN ({placeholders})", ids
+                )
+                known_batches.update(row[0] for row in cursor.fetchall())
+                cursor.execute(
+                    f"SELECT batch_id, student_id FROM [dbo].[Enrollments] WITH (UPDLOCK, HOLDLOCK) "
+                    f"WHERE batch_id IN ({placeholders})", ids
+                )
+                existing.update((row[0], row[1]) for row in cursor.fetchall())
+            
+            students = {}
+            for ids in chunked(student_ids):
+                placeholders = ", ".join("?" * len(ids))
+                cursor.execute(
+                    f"SELECT student_id, first_name, last_name, guardian_name, guardian_email "
+                    f"FROM [dbo].[Students] WHERE student_id IN ({placeholders})", ids
+                )
+                students.update({row[0]: row for row in cursor.fetchall()})
+            
+            results = []
+            inserts = []
+            for index, record in enumerate(records):
+                key = (record.batch_id, record.student_id)
+                result = {"row": index, "batch_id": record.batch_id, "student_id": record.student_id}
+                if record.batch_id not in known_batches:
+                    result.update(result="rejected", detail="Batch not found")
+                elif record.student_id not in students:
+                    result.update(result="rejected", detail="Student not found")
+                elif key in existing:
+                    result.update(result="duplicate", detail="Student is already enrolled in this batch")
+                else:
+                    existing.add(key)
+                    inserts.append(record)
+                    result.update(result="created")
+                results.append(result)
+            
+            cursor.fast_executemany = True
+            insert_query = """
+            INSERT INTO [dbo].[Enrollments] 
+            (org_id, batch_id, student_id, enrolled_on, status)
+            VALUES (?, ?, ?, ?, ?)
+            """
+            for batch in chunked(inserts, batch_size):
+                cursor.executemany(insert_query, [
+                    (record.org_id, record.batch_id, record.student_id, record.enrolled_on, record.status)
+                    for record in batch
+                ])
+            
+            # Read back the generated enrollment ids for the inserted pairs
+            enrollment_ids = {}
+            if inserts:
+                for ids in chunked(sorted({record.batch_id for record in inserts})):
+                    placeholders = ", ".join("?" * len(ids))
+                    cursor.execute(
+                        f"SELECT batch_id, student_id, enrollment_id FROM [dbo].[Enrollments] "
+                        f"WHERE batch_id IN ({placeholders})", ids
+                    )
+                    enrollment_ids.update({(row[0], row[1]): row[2] for row in cursor.fetchall()})
+            
+            notifications = []
+            for result, record in zip(results, records):
+                if result["result"] != "created":
+                    continue
+                enrollment_id = enrollment_ids.get((record.batch_id, record.student_id))
+                result["enrollment_id"] = enrollment_id
+                student_row = students[record.student_id]
+                if student_row[4]:  # guardian_email
+                    notifications.append({
+                        "enrollment_id": enrollment_id,
+                        "enrolled_on": record.enrolled_on,
+                        "first_name": student_row[1],
+                        "last_name": student_row[2],
+                        "guardian_name": student_row[3],
+                        "guardian_email": student_row[4]
+                    })
+            EnrollmentCRUD.queue_enrollment_notifications(cursor, notifications)
+            
+            conn.commit()
+            wake_outbox_workers()
+            
+            return {
+                "created": len(inserts),
+                "duplicates": sum(1 for result in results if result["result"] == "duplicate"),
+                "rejected": sum(1 for result in results if result["result"] == "rejected"),
+                "notifications_queued": len(notifications),
+                "results": results
+            }
+        
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error importing enrollments: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _build_enrollment_email(notification: dict):
+        """Build the (subject, html_body) of a guardian enrollment confirmation"""
+        html_body = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif;">
+                    <h2>Enrollment Confirmation</h2>
+                    <p>Dear {notification['guardian_name']},</p>
+                    <p>We are pleased to confirm that your ward <strong>{notification['first_name']} {notification['last_name']}</strong> has been successfully enrolled in our program.</p>
+                    <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                        <p><strong>Enrollment Details:</strong></p>
+                        <p><strong>Enrollment ID:</strong> <code style="background-color: #e0e0e0; padding: 5px;">{notification['enrollment_id']}</code></p>
+                        <p><strong>Student Name:</strong> {notification['first_name']} {notification['last_name']}</p>
+                        <p><strong>Enrollment Date:</strong> {notification['enrolled_on']}</p>
+                    </div>
+                    <p>Please keep this Enrollment ID for your records as it may be required for future reference.</p>
+                    <p>If you have any questions regarding the enrollment, please do not hesitate to contact us.</p>
+                    <p>Best regards,<br>System Administration Team</p>
+                </body>
+            </html>
+            """
+        subject = f"Enrollment Confirmation - {notification['first_name']} {notification['last_name']}"
+        return subject, html_body
+
+    @staticmethod
+    def queue_enrollment_notifications(cursor, notifications: list):
+        """
+        Queue guardian enrollment confirmations on the caller's transaction.
+
+        Args:
+            cursor: Cursor of the transaction that created the enrollments
+            notifications: List of dicts with enrollment_id, enrolled_on, first_name,
+                last_name, guardian_name and guardian_email
+        """
+        for notification in notifications:
+            subject, html_body = EnrollmentCRUD._build_enrollment_email(notification)
+            enqueue_email(cursor, notification["guardian_email"], subject, html_body)
+
     @staticmethod
     def get_enrollment(enrollment_id: int):
         """Retrieve a single enrollment record by ID"""
@@ -99,20 +259,9 @@ class EnrollmentCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT enrollment_id, org_id, batch_id, student_id, enrolled_on, status FROM [dbo].[Enrollments] WHERE enrollment_id = ?"
+            query = ENROLLMENT_SELECT + " WHERE enrollment_id = ?"
             cursor.execute(query, (enrollment_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "enrollment_id": row[0],
-                    "org_id": row[1],
-                    "batch_id": row[2],
-                    "student_id": row[3],
-                    "enrolled_on": row[4],
-                    "status": row[5]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving enrollment: {str(e)}")
@@ -121,27 +270,91 @@ class EnrollmentCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_enrollments():
-        """Retrieve all enrollment records"""
+    def get_enrollment_detail(enrollment_id: int, include):
+        """
+        Retrieve an enrollment together with its student, batch, invoices and payments.
+
+        Each included relation is one set-based SELECT keyed on the enrollment (all
+        payments of all its invoices in one query), and all of them are sent as a
+        single batch, so the whole graph costs one round trip on one connection
+        however many invoices and payments there are.
+
+        Args:
+            enrollment_id: Enrollment ID
+            include: Relations to load, from ENROLLMENT_INCLUDES
+
+        Returns:
+            Enrollment dictionary with student, batch and invoices (each with its
+            payments) for the included relations, or None if not found
+        """
+        include = set(include)
+        if "invoices.payments" in include:
+            include.add("invoices")
+
+        statements = [ENROLLMENT_SELECT + " WHERE enrollment_id = ?"]
+        relations = []
+        if "student" in include:
+            statements.append(STUDENT_SELECT + " WHERE student_id IN (SELECT student_id FROM [dbo].[Enrollments] WHERE enrollment_id = ?)")
+            relations.append("student")
+        if "batch" in include:
+            statements.append(BATCH_SELECT + " WHERE batch_id IN (SELECT batch_id FROM [dbo].[Enrollments] WHERE enrollment_id = ?)")
+            relations.append("batch")
+        if "invoices" in include:
+            statements.append(INVOICE_SELECT + " WHERE enrollment_id = ? ORDER BY invoice_id")
+            relations.append("invoices")
+        if "invoices.payments" in include:
+            statements.append(PAYMENT_SELECT + " WHERE invoice_id IN (SELECT invoice_id FROM [dbo].[Invoices] WHERE enrollment_id = ?) ORDER BY payment_id")
+            relations.append("payments")
+
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT enrollment_id, org_id, batch_id, student_id, enrolled_on, status FROM [dbo].[Enrollments]"
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            # NOCOUNT keeps row counts out of the result sets, so each nextset() is the next SELECT
+            cursor.execute("SET NOCOUNT ON; " + "; ".join(statements), [enrollment_id] * len(statements))
+            enrollment = fetch_dict(cursor)
+            if enrollment is None:
+                return None
             
-            enrollments = []
-            for row in rows:
-                enrollments.append({
-                    "enrollment_id": row[0],
-                    "org_id": row[1],
-                    "batch_id": row[2],
-                    "student_id": row[3],
-                    "enrolled_on": row[4],
-                    "status": row[5]
-                })
-            return enrollments
+            loaded = {}
+            for relation in relations:
+                cursor.nextset()
+                loaded[relation] = fetch_dicts(cursor)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollment detail: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+        
+        if "student" in loaded:
+            enrollment["student"] = loaded["student"][0] if loaded["student"] else None
+        if "batch" in loaded:
+            enrollment["batch"] = loaded["batch"][0] if loaded["batch"] else None
+        if "invoices" in loaded:
+            enrollment["invoices"] = loaded["invoices"]
+        if "payments" in loaded:
+            payments_by_invoice = {invoice["invoice_id"]: [] for invoice in loaded["invoices"]}
+            # The SELECTs are separate statements under READ COMMITTED, so the payments one
+            # can see an invoice inserted after the invoices one ran; skip its payments
+            for payment in loaded["payments"]:
+                invoice_payments = payments_by_invoice.get(payment["invoice_id"])
+                if invoice_payments is not None:
+                    invoice_payments.append(payment)
+            for invoice in loaded["invoices"]:
+                invoice["payments"] = payments_by_invoice[invoice["invoice_id"]]
+        return enrollment
+
+    @staticmethod
+    def get_enrollments_by_ids(ids: list):
+        """Retrieve the enrollments with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(ENROLLMENT_SELECT, "enrollment_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "enrollment_id", ids)
         
         except Exception as e:
             raise Exception(f"Error retrieving enrollments: {str(e)}")
@@ -150,27 +363,32 @@ class EnrollmentCRUD:
             conn.close()
 
     @staticmethod
-    def get_enrollments_by_student(student_id: int):
+    def get_all_enrollments(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve enrollment records, optionally one keyset page at a time"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_enrollments_by_student(student_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all enrollments for a specific student"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT enrollment_id, org_id, batch_id, student_id, enrolled_on, status FROM [dbo].[Enrollments] WHERE student_id = ?"
-            cursor.execute(query, (student_id,))
-            rows = cursor.fetchall()
-            
-            enrollments = []
-            for row in rows:
-                enrollments.append({
-                    "enrollment_id": row[0],
-                    "org_id": row[1],
-                    "batch_id": row[2],
-                    "student_id": row[3],
-                    "enrolled_on": row[4],
-                    "status": row[5]
-                })
-            return enrollments
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["student_id = ?"], [student_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving enrollments: {str(e)}")
@@ -179,27 +397,15 @@ class EnrollmentCRUD:
             conn.close()
 
     @staticmethod
-    def get_enrollments_by_batch(batch_id: int):
+    def get_enrollments_by_batch(batch_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all enrollments for a specific batch"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT enrollment_id, org_id, batch_id, student_id, enrolled_on, status FROM [dbo].[Enrollments] WHERE batch_id = ?"
-            cursor.execute(query, (batch_id,))
-            rows = cursor.fetchall()
-            
-            enrollments = []
-            for row in rows:
-                enrollments.append({
-                    "enrollment_id": row[0],
-                    "org_id": row[1],
-                    "batch_id": row[2],
-                    "student_id": row[3],
-                    "enrolled_on": row[4],
-                    "status": row[5]
-                })
-            return enrollments
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["batch_id = ?"], [batch_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving enrollments: {str(e)}")
@@ -208,27 +414,38 @@ class EnrollmentCRUD:
             conn.close()
 
     @staticmethod
-    def get_enrollments_by_org(org_id: int):
+    def get_enrollments_by_batch_version(batch_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """
+        Summarise the page get_enrollments_by_batch would return, for its ETag.
+
+        Returns:
+            Tuple of (count, min enrollment_id, max enrollment_id, max rowversion)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_version_query(ENROLLMENT_FROM, "enrollment_id", ["row_version"],
+                                                ["batch_id = ?"], [batch_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return tuple(cursor.fetchone())
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments version: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_enrollments_by_org(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all enrollments for a specific organization"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT enrollment_id, org_id, batch_id, student_id, enrolled_on, status FROM [dbo].[Enrollments] WHERE org_id = ?"
-            cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            enrollments = []
-            for row in rows:
-                enrollments.append({
-                    "enrollment_id": row[0],
-                    "org_id": row[1],
-                    "batch_id": row[2],
-                    "student_id": row[3],
-                    "enrolled_on": row[4],
-                    "status": row[5]
-                })
-            return enrollments
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["org_id = ?"], [org_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving enrollments: {str(e)}")
@@ -236,6 +453,48 @@ class EnrollmentCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_enrollment_changes(since_version: int, limit: int, batch_id: int = None):
+        """
+        Retrieve the enrollments inserted, updated or deleted after since_version, for delta sync.
+
+        Args:
+            since_version: Version decoded from the client's sync token (0 for a full sync)
+            limit: Maximum number of changes to return
+            batch_id: Only sync the enrollments of this batch (optional)
+
+        Returns:
+            Dictionary with changes, deleted ids, sync_token and has_more
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(SYNC_HORIZON_QUERY)
+            horizon = cursor.fetchone()[0]
+            
+            conditions, params = (["batch_id = ?"], [batch_id]) if batch_id is not None else ([], [])
+            query, params = build_changes_query(ENROLLMENT_COLUMNS, ENROLLMENT_FROM, "row_version", conditions, params,
+                                                since_version, horizon, limit)
+            cursor.execute(query, params)
+            rows = fetch_dicts(cursor)
+            
+            query, params = build_tombstones_query("enrollments", "[dbo].[Enrollments]", "enrollment_id", "batch_id", batch_id,
+                                                   since_version, horizon, limit)
+            cursor.execute(query, params)
+            tombstones = cursor.fetchall()
+            
+            cursor.execute(SYNC_RETENTION_QUERY)
+            check_sync_retention(cursor.fetchone()[0], since_version)
+            
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollment changes: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def update_enrollment(enrollment_id: int, enrollment_data: EnrollmentUpdate):
         """Update an existing enrollment record"""
@@ -272,7 +531,9 @@ class EnrollmentCRUD:
             
             values.append(enrollment_id)
             
-            query = f"UPDATE [dbo].[Enrollments] SET {', '.join(update_fields)} WHERE enrollment_id = ?"
+            # Moving the enrollment to another batch leaves a tombstone in the old one for delta sync
+            output = tombstone_output("enrollments", "enrollment_id", "batch_id") if enrollment_data.batch_id is not None else ""
+            query = f"UPDATE [dbo].[Enrollments] SET {', '.join(update_fields)} {output} WHERE enrollment_id = ?"
             cursor.execute(query, values)
             
             if cursor.rowcount == 0:
@@ -296,7 +557,8 @@ class EnrollmentCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "DELETE FROM [dbo].[Enrollments] WHERE enrollment_id = ?"
+            # The tombstone tells delta sync clients about the delete
+            query = f"DELETE FROM [dbo].[Enrollments] {tombstone_output('enrollments', 'enrollment_id', 'batch_id')} WHERE enrollment_id = ?"
             cursor.execute(query, (enrollment_id,))
             
             if cursor.rowcount == 0:
@@ -312,3 +574,92 @@ class EnrollmentCRUD:
         finally:
             cursor.close()
             conn.close()
+
+    # ============== ASYNC BACKEND (DB_BACKEND=async) ==============
+    @staticmethod
+    @async_counterpart(get_enrollment)
+    async def get_enrollment_async(enrollment_id: int):
+        """Async implementation of get_enrollment"""
+        try:
+            return await fetch_one_dict(ENROLLMENT_SELECT + " WHERE enrollment_id = ?", (enrollment_id,))
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollment: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_all_enrollments)
+    async def get_all_enrollments_async(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_all_enrollments"""
+        try:
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", [], [], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollments_by_student)
+    async def get_enrollments_by_student_async(student_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_enrollments_by_student"""
+        try:
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["student_id = ?"], [student_id], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollments_by_batch)
+    async def get_enrollments_by_batch_async(batch_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_enrollments_by_batch"""
+        try:
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["batch_id = ?"], [batch_id], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollments_by_batch_version)
+    async def get_enrollments_by_batch_version_async(batch_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_enrollments_by_batch_version"""
+        try:
+            query, params = build_version_query(ENROLLMENT_FROM, "enrollment_id", ["row_version"],
+                                                ["batch_id = ?"], [batch_id], limit, after_id, list_query)
+            return tuple(await fetch_one(query, params))
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments version: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollments_by_org)
+    async def get_enrollments_by_org_async(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Async implementation of get_enrollments_by_org"""
+        try:
+            query, params = build_page_query(ENROLLMENT_SELECT, "enrollment_id", ["org_id = ?"], [org_id], limit, after_id, list_query)
+            return await fetch_all_dicts(query, params)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollment_changes)
+    async def get_enrollment_changes_async(since_version: int, limit: int, batch_id: int = None):
+        """Async implementation of get_enrollment_changes"""
+        try:
+            horizon = (await fetch_one(SYNC_HORIZON_QUERY))[0]
+            conditions, params = (["batch_id = ?"], [batch_id]) if batch_id is not None else ([], [])
+            query, params = build_changes_query(ENROLLMENT_COLUMNS, ENROLLMENT_FROM, "row_version", conditions, params,
+                                                since_version, horizon, limit)
+            rows = await fetch_all_dicts(query, params)
+            query, params = build_tombstones_query("enrollments", "[dbo].[Enrollments]", "enrollment_id", "batch_id", batch_id,
+                                                   since_version, horizon, limit)
+            tombstones = await fetch_all(query, params)
+            check_sync_retention((await fetch_one(SYNC_RETENTION_QUERY))[0], since_version)
+            return merge_changes(rows, tombstones, since_version, horizon, limit)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollment changes: {str(e)}")
+
+    @staticmethod
+    @async_counterpart(get_enrollments_by_ids)
+    async def get_enrollments_by_ids_async(ids: list):
+        """Async implementation of get_enrollments_by_ids"""
+        try:
+            query, params = build_ids_query(ENROLLMENT_SELECT, "enrollment_id", ids)
+            return order_by_ids(await fetch_all_dicts(query, params), "enrollment_id", ids)
+        except Exception as e:
+            raise Exception(f"Error retrieving enrollments: {str(e)}")
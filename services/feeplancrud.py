@@ -1,9 +1,17 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.feeplanmodel import FeePlanCreate, FeePlanUpdate
+from utils.reference_cache import get_reference_cache, cached_read, invalidates
+from utils.multiget import build_ids_query, order_by_ids
+
+FEE_PLAN_SELECT = "SELECT fee_plan_id, org_id, name, billing_type_id, amount, currency, active FROM [dbo].[FeePlans]"
+
+# Reads are cached per process and invalidated by the writes below
+fee_plan_cache = get_reference_cache("fee_plans")
 
 class FeePlanCRUD:
     
     @staticmethod
+    @invalidates(fee_plan_cache)
     def create_fee_plan(fee_plan_data: FeePlanCreate):
         """Insert a new fee plan into the database"""
         conn = get_db_connection()
@@ -15,7 +23,8 @@ class FeePlanCRUD:
             (org_id, name, billing_type_id, amount, currency, active)
             VALUES (?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated fee_plan_id in one round trip
+            fee_plan_id = execute_insert(cursor, query, (
                 fee_plan_data.org_id,
                 fee_plan_data.name,
                 fee_plan_data.billing_type_id,
@@ -25,10 +34,6 @@ class FeePlanCRUD:
             ))
             conn.commit()
             
-            # Get the inserted fee_plan_id
-            cursor.execute("SELECT @@IDENTITY")
-            fee_plan_id = cursor.fetchone()[0]
-            
             return {"fee_plan_id": fee_plan_id, **fee_plan_data.dict()}
         
         except Exception as e:
@@ -39,27 +44,16 @@ class FeePlanCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(fee_plan_cache)
     def get_fee_plan(fee_plan_id: int):
         """Retrieve a single fee plan by ID"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT fee_plan_id, org_id, name, billing_type_id, amount, currency, active FROM [dbo].[FeePlans] WHERE fee_plan_id = ?"
+            query = FEE_PLAN_SELECT + " WHERE fee_plan_id = ?"
             cursor.execute(query, (fee_plan_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "fee_plan_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "billing_type_id": row[3],
-                    "amount": row[4],
-                    "currency": row[5],
-                    "active": row[6]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving fee plan: {str(e)}")
@@ -68,28 +62,34 @@ class FeePlanCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(fee_plan_cache)
+    def get_fee_plans_by_ids(ids: list):
+        """Retrieve the fee plans with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(FEE_PLAN_SELECT, "fee_plan_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "fee_plan_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving fee plans: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    @cached_read(fee_plan_cache)
     def get_all_fee_plans():
         """Retrieve all fee plans"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT fee_plan_id, org_id, name, billing_type_id, amount, currency, active FROM [dbo].[FeePlans]"
+            query = FEE_PLAN_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            fee_plans = []
-            for row in rows:
-                fee_plans.append({
-                    "fee_plan_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "billing_type_id": row[3],
-                    "amount": row[4],
-                    "currency": row[5],
-                    "active": row[6]
-                })
-            return fee_plans
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving fee plans: {str(e)}")
@@ -98,28 +98,16 @@ class FeePlanCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(fee_plan_cache)
     def get_fee_plans_by_org(org_id: int):
         """Retrieve all fee plans for a specific organization"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT fee_plan_id, org_id, name, billing_type_id, amount, currency, active FROM [dbo].[FeePlans] WHERE org_id = ?"
+            query = FEE_PLAN_SELECT + " WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            fee_plans = []
-            for row in rows:
-                fee_plans.append({
-                    "fee_plan_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2],
-                    "billing_type_id": row[3],
-                    "amount": row[4],
-                    "currency": row[5],
-                    "active": row[6]
-                })
-            return fee_plans
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving fee plans: {str(e)}")
@@ -128,6 +116,7 @@ class FeePlanCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(fee_plan_cache)
     def update_fee_plan(fee_plan_id: int, fee_plan_data: FeePlanUpdate):
         """Update an existing fee plan"""
         conn = get_db_connection()
@@ -179,6 +168,7 @@ class FeePlanCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(fee_plan_cache)
     def delete_fee_plan(fee_plan_id: int):
         """Delete a fee plan"""
         conn = get_db_connection()
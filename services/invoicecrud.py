@@ -1,5 +1,18 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.invoicemodel import InvoiceCreate, InvoiceUpdate
+from datetime import date
+from utils.pagination import build_page_query
+from utils.filtering import FilterField, ListQuery
+from utils.multiget import build_ids_query, order_by_ids
+
+INVOICE_SELECT = "SELECT invoice_id, org_id, enrollment_id, invoice_date, due_date, total_amount, status FROM [dbo].[Invoices]"
+
+# Fields the invoice list endpoints can filter and sort on (each backed by an index)
+INVOICE_FILTERS = {
+    "status": FilterField("status", str),
+    "invoice_date": FilterField("invoice_date", date, range=True, sortable=True),
+    "due_date": FilterField("due_date", date, range=True, sortable=True)
+}
 
 class InvoiceCRUD:
     
@@ -15,7 +28,8 @@ class InvoiceCRUD:
             (org_id, enrollment_id, invoice_date, due_date, total_amount, status)
             VALUES (?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated invoice_id in one round trip
+            invoice_id = execute_insert(cursor, query, (
                 invoice_data.org_id,
                 invoice_data.enrollment_id,
                 invoice_data.invoice_date,
@@ -25,10 +39,6 @@ class InvoiceCRUD:
             ))
             conn.commit()
             
-            # Get the inserted invoice_id
-            cursor.execute("SELECT @@IDENTITY")
-            invoice_id = cursor.fetchone()[0]
-            
             return {"invoice_id": invoice_id, **invoice_data.dict()}
         
         except Exception as e:
@@ -45,21 +55,9 @@ class InvoiceCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT invoice_id, org_id, enrollment_id, invoice_date, due_date, total_amount, status FROM [dbo].[Invoices] WHERE invoice_id = ?"
+            query = INVOICE_SELECT + " WHERE invoice_id = ?"
             cursor.execute(query, (invoice_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "invoice_id": row[0],
-                    "org_id": row[1],
-                    "enrollment_id": row[2],
-                    "invoice_date": row[3],
-                    "due_date": row[4],
-                    "total_amount": row[5],
-                    "status": row[6]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving invoice: {str(e)}")
@@ -68,28 +66,15 @@ class InvoiceCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_invoices():
-        """Retrieve all invoices"""
+    def get_invoices_by_ids(ids: list):
+        """Retrieve the invoices with the given IDs, in the order given (unknown IDs are skipped)"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT invoice_id, org_id, enrollment_id, invoice_date, due_date, total_amount, status FROM [dbo].[Invoices]"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            invoices = []
-            for row in rows:
-                invoices.append({
-                    "invoice_id": row[0],
-                    "org_id": row[1],
-                    "enrollment_id": row[2],
-                    "invoice_date": row[3],
-                    "due_date": row[4],
-                    "total_amount": row[5],
-                    "status": row[6]
-                })
-            return invoices
+            query, params = build_ids_query(INVOICE_SELECT, "invoice_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "invoice_id", ids)
         
         except Exception as e:
             raise Exception(f"Error retrieving invoices: {str(e)}")
@@ -98,28 +83,32 @@ class InvoiceCRUD:
             conn.close()
 
     @staticmethod
-    def get_invoices_by_org(org_id: int):
+    def get_all_invoices(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve invoices, optionally one keyset page at a time"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(INVOICE_SELECT, "invoice_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving invoices: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_invoices_by_org(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all invoices for a specific organization"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT invoice_id, org_id, enrollment_id, invoice_date, due_date, total_amount, status FROM [dbo].[Invoices] WHERE org_id = ?"
-            cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            invoices = []
-            for row in rows:
-                invoices.append({
-                    "invoice_id": row[0],
-                    "org_id": row[1],
-                    "enrollment_id": row[2],
-                    "invoice_date": row[3],
-                    "due_date": row[4],
-                    "total_amount": row[5],
-                    "status": row[6]
-                })
-            return invoices
+            query, params = build_page_query(INVOICE_SELECT, "invoice_id", ["org_id = ?"], [org_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving invoices: {str(e)}")
@@ -128,28 +117,15 @@ class InvoiceCRUD:
             conn.close()
 
     @staticmethod
-    def get_invoices_by_enrollment(enrollment_id: int):
+    def get_invoices_by_enrollment(enrollment_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all invoices for a specific enrollment"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT invoice_id, org_id, enrollment_id, invoice_date, due_date, total_amount, status FROM [dbo].[Invoices] WHERE enrollment_id = ?"
-            cursor.execute(query, (enrollment_id,))
-            rows = cursor.fetchall()
-            
-            invoices = []
-            for row in rows:
-                invoices.append({
-                    "invoice_id": row[0],
-                    "org_id": row[1],
-                    "enrollment_id": row[2],
-                    "invoice_date": row[3],
-                    "due_date": row[4],
-                    "total_amount": row[5],
-                    "status": row[6]
-                })
-            return invoices
+            query, params = build_page_query(INVOICE_SELECT, "invoice_id", ["enrollment_id = ?"], [enrollment_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving invoices: {str(e)}")
@@ -1,10 +1,18 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.orgmodel import OrganizationCreate, OrganizationUpdate
 from datetime import datetime
+from utils.reference_cache import get_reference_cache, cached_read, invalidates
+from utils.multiget import build_ids_query, order_by_ids
+
+ORGANIZATION_SELECT = "SELECT [org_id],[name],[address],[city],[zip],[state],[phone],[email],[active], [created_date] FROM [dbo].[Organizations]"
+
+# Reads are cached per process and invalidated by the writes below
+organization_cache = get_reference_cache("organizations")
 
 class OrganizationCRUD:
     
     @staticmethod
+    @invalidates(organization_cache)
     def create_organization(org_data: OrganizationCreate):
         """Insert a new organization into the database"""
         conn = get_db_connection()
@@ -16,7 +24,8 @@ class OrganizationCRUD:
             (name, address, city, zip, state, phone, email, active, created_date)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated org_id in one round trip
+            org_id = execute_insert(cursor, query, (
                 org_data.name,
                 org_data.address,
                 org_data.city,
@@ -29,10 +38,6 @@ class OrganizationCRUD:
             ))
             conn.commit()
             
-            # Get the inserted org_id
-            cursor.execute("SELECT @@IDENTITY")
-            org_id = cursor.fetchone()[0]
-            
             return {"org_id": org_id, **org_data.dict()}
         
         except Exception as e:
@@ -43,6 +48,7 @@ class OrganizationCRUD:
             conn.close()
     
     @staticmethod
+    @cached_read(organization_cache)
     def get_organization(org_id: int):
         """Retrieve a single organization by ID"""
         conn = get_db_connection()
@@ -51,16 +57,7 @@ class OrganizationCRUD:
         try:
             query = "SELECT * FROM [dbo].[Organizations] WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            if cursor.description is None:
-                return None
-            
-            columns = [description[0] for description in cursor.description]
-            return dict(zip(columns, row))
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving organization: {str(e)}")
@@ -69,29 +66,34 @@ class OrganizationCRUD:
             conn.close()
     
     @staticmethod
+    @cached_read(organization_cache)
+    def get_organizations_by_ids(ids: list):
+        """Retrieve the organizations with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(ORGANIZATION_SELECT, "org_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "org_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving organizations: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    @cached_read(organization_cache)
     def get_all_organizations():
         """Retrieve all organizations"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT [org_id],[name],[address],[city],[zip],[state],[phone],[email],[active], [created_date] FROM [dbo].[Organizations] WHERE org_id != 1 ORDER BY org_id"
+            query = ORGANIZATION_SELECT + " WHERE org_id != 1 ORDER BY org_id"
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            if not rows:
-                return []
-            
-            if cursor.description is None:
-                return []
-            
-            columns = [description[0] for description in cursor.description]
-            orgs = []
-            for row in rows:
-                org_dict = dict(zip(columns, row))
-               
-                orgs.append(org_dict)
-            return orgs
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving organizations: {str(e)}")
@@ -100,6 +102,7 @@ class OrganizationCRUD:
             conn.close()
     
     @staticmethod
+    @invalidates(organization_cache)
     def update_organization(org_id: int, org_data: OrganizationUpdate):
         """Update an existing organization"""
         conn = get_db_connection()
@@ -158,6 +161,7 @@ class OrganizationCRUD:
             conn.close()
     
     @staticmethod
+    @invalidates(organization_cache)
     def delete_organization(org_id: int):
         """Delete an organization"""
         conn = get_db_connection()
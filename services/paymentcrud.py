@@ -1,5 +1,17 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts, column_names, rows_to_dicts
 from model.paymentmodel import PaymentCreate, PaymentUpdate
+from datetime import date
+from utils.pagination import build_page_query
+from utils.filtering import FilterField, ListQuery
+from utils.multiget import build_ids_query, order_by_ids
+
+PAYMENT_SELECT = "SELECT payment_id, org_id, invoice_id, payment_date, amount, method, reference_no, notes FROM [dbo].[Payments]"
+
+# Fields the payment list endpoints can filter and sort on (each backed by an index)
+PAYMENT_FILTERS = {
+    "method": FilterField("method", str),
+    "payment_date": FilterField("payment_date", date, range=True, sortable=True)
+}
 
 class PaymentCRUD:
     
@@ -15,7 +27,8 @@ class PaymentCRUD:
             (org_id, invoice_id, payment_date, amount, method, reference_no, notes)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated payment_id in one round trip
+            payment_id = execute_insert(cursor, query, (
                 payment_data.org_id,
                 payment_data.invoice_id,
                 payment_data.payment_date,
@@ -26,10 +39,6 @@ class PaymentCRUD:
             ))
             conn.commit()
             
-            # Get the inserted payment_id
-            cursor.execute("SELECT @@IDENTITY")
-            payment_id = cursor.fetchone()[0]
-            
             return {"payment_id": payment_id, **payment_data.dict()}
         
         except Exception as e:
@@ -46,22 +55,9 @@ class PaymentCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT payment_id, org_id, invoice_id, payment_date, amount, method, reference_no, notes FROM [dbo].[Payments] WHERE payment_id = ?"
+            query = PAYMENT_SELECT + " WHERE payment_id = ?"
             cursor.execute(query, (payment_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "payment_id": row[0],
-                    "org_id": row[1],
-                    "invoice_id": row[2],
-                    "payment_date": row[3],
-                    "amount": row[4],
-                    "method": row[5],
-                    "reference_no": row[6],
-                    "notes": row[7]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving payment: {str(e)}")
@@ -70,29 +66,15 @@ class PaymentCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_payments():
-        """Retrieve all payments"""
+    def get_payments_by_ids(ids: list):
+        """Retrieve the payments with the given IDs, in the order given (unknown IDs are skipped)"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT payment_id, org_id, invoice_id, payment_date, amount, method, reference_no, notes FROM [dbo].[Payments]"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            payments = []
-            for row in rows:
-                payments.append({
-                    "payment_id": row[0],
-                    "org_id": row[1],
-                    "invoice_id": row[2],
-                    "payment_date": row[3],
-                    "amount": row[4],
-                    "method": row[5],
-                    "reference_no": row[6],
-                    "notes": row[7]
-                })
-            return payments
+            query, params = build_ids_query(PAYMENT_SELECT, "payment_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "payment_id", ids)
         
         except Exception as e:
             raise Exception(f"Error retrieving payments: {str(e)}")
@@ -101,29 +83,60 @@ class PaymentCRUD:
             conn.close()
 
     @staticmethod
-    def get_payments_by_org(org_id: int):
-        """Retrieve all payments for a specific organization"""
+    def get_all_payments(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve payments, optionally one keyset page at a time"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(PAYMENT_SELECT, "payment_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving payments: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def iter_payments_export(chunk_size: int = 1000):
+        """
+        Yield all payments in chunks of up to chunk_size dicts, for streaming exports.
+
+        Rows are pulled from the cursor with fetchmany so memory stays flat regardless
+        of table size; the connection is held until the generator is exhausted or closed.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT payment_id, org_id, invoice_id, payment_date, amount, method, reference_no, notes FROM [dbo].[Payments] WHERE org_id = ?"
-            cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
+            query, params = build_page_query(PAYMENT_SELECT, "payment_id", [], [])
+            cursor.execute(query, params)
+            columns = column_names(cursor)
             
-            payments = []
-            for row in rows:
-                payments.append({
-                    "payment_id": row[0],
-                    "org_id": row[1],
-                    "invoice_id": row[2],
-                    "payment_date": row[3],
-                    "amount": row[4],
-                    "method": row[5],
-                    "reference_no": row[6],
-                    "notes": row[7]
-                })
-            return payments
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows_to_dicts(columns, rows)
+        
+        except Exception as e:
+            raise Exception(f"Error exporting payments: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_payments_by_org(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve all payments for a specific organization"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(PAYMENT_SELECT, "payment_id", ["org_id = ?"], [org_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving payments: {str(e)}")
@@ -132,29 +145,15 @@ class PaymentCRUD:
             conn.close()
 
     @staticmethod
-    def get_payments_by_invoice(invoice_id: int):
+    def get_payments_by_invoice(invoice_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all payments for a specific invoice"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT payment_id, org_id, invoice_id, payment_date, amount, method, reference_no, notes FROM [dbo].[Payments] WHERE invoice_id = ?"
-            cursor.execute(query, (invoice_id,))
-            rows = cursor.fetchall()
-            
-            payments = []
-            for row in rows:
-                payments.append({
-                    "payment_id": row[0],
-                    "org_id": row[1],
-                    "invoice_id": row[2],
-                    "payment_date": row[3],
-                    "amount": row[4],
-                    "method": row[5],
-                    "reference_no": row[6],
-                    "notes": row[7]
-                })
-            return payments
+            query, params = build_page_query(PAYMENT_SELECT, "payment_id", ["invoice_id = ?"], [invoice_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving payments: {str(e)}")
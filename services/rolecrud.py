@@ -1,9 +1,17 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.rolemodel import RoleCreate, RoleUpdate
+from utils.reference_cache import get_reference_cache, cached_read, invalidates
+from utils.multiget import build_ids_query, order_by_ids
+
+ROLE_SELECT = "SELECT role_id, org_id, name FROM [dbo].[Roles]"
+
+# Reads are cached per process and invalidated by the writes below
+role_cache = get_reference_cache("roles")
 
 class RoleCRUD:
     
     @staticmethod
+    @invalidates(role_cache)
     def create_role(role_data: RoleCreate):
         """Insert a new role into the database"""
         conn = get_db_connection()
@@ -21,16 +29,13 @@ class RoleCRUD:
             (org_id, name)
             VALUES (?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated role_id in one round trip
+            role_id = execute_insert(cursor, query, (
                 role_data.org_id,
                 role_data.name
             ))
             conn.commit()
             
-            # Get the inserted role_id
-            cursor.execute("SELECT @@IDENTITY")
-            role_id = cursor.fetchone()[0]
-            
             return {"role_id": role_id, **role_data.dict()}
         
         except Exception as e:
@@ -41,23 +46,16 @@ class RoleCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(role_cache)
     def get_role(role_id: int):
         """Retrieve a single role by ID"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT role_id, org_id, name FROM [dbo].[Roles] WHERE role_id = ?"
+            query = ROLE_SELECT + " WHERE role_id = ?"
             cursor.execute(query, (role_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "role_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving role: {str(e)}")
@@ -66,24 +64,34 @@ class RoleCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(role_cache)
+    def get_roles_by_ids(ids: list):
+        """Retrieve the roles with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(ROLE_SELECT, "role_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "role_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving roles: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    @cached_read(role_cache)
     def get_all_roles():
         """Retrieve all roles"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT role_id, org_id, name FROM [dbo].[Roles] WHERE role_id != 1"
+            query = ROLE_SELECT + " WHERE role_id != 1"
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            roles = []
-            for row in rows:
-                roles.append({
-                    "role_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2]
-                })
-            return roles
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving roles: {str(e)}")
@@ -92,24 +100,16 @@ class RoleCRUD:
             conn.close()
 
     @staticmethod
+    @cached_read(role_cache)
     def get_roles_by_org(org_id: int):
         """Retrieve all roles for a specific organization"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT role_id, org_id, name FROM [dbo].[Roles] WHERE org_id = ?"
+            query = ROLE_SELECT + " WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            roles = []
-            for row in rows:
-                roles.append({
-                    "role_id": row[0],
-                    "org_id": row[1],
-                    "name": row[2]
-                })
-            return roles
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving roles: {str(e)}")
@@ -118,6 +118,7 @@ class RoleCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(role_cache)
     def update_role(role_id: int, role_data: RoleUpdate):
         """Update an existing role"""
         conn = get_db_connection()
@@ -179,6 +180,7 @@ class RoleCRUD:
             conn.close()
 
     @staticmethod
+    @invalidates(role_cache)
     def delete_role(role_id: int):
         """Delete a role"""
         conn = get_db_connection()
@@ -1,10 +1,22 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.studentmodel import StudentCreate, StudentUpdate
+from utils.pagination import build_page_query
+from utils.filtering import FilterField, ListQuery
+from utils.multiget import build_ids_query, order_by_ids
 from datetime import datetime
 import os
 import shutil
 from pathlib import Path
 
+STUDENT_SELECT = "SELECT student_id, org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at FROM [dbo].[Students]"
+
+# Fields the student list endpoints can filter and sort on (each backed by an index)
+STUDENT_FILTERS = {
+    "active": FilterField("active", bool),
+    "last_name": FilterField("last_name", str, sortable=True),
+    "created_at": FilterField("created_at", datetime, range=True, sortable=True, cast="DATETIME")
+}
+
 class StudentCRUD:
     
     @staticmethod
@@ -19,7 +31,8 @@ class StudentCRUD:
             (org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and read back the stored row (including created_at) in one round trip
+            student = execute_insert(cursor, query, (
                 student_data.org_id,
                 student_data.first_name,
                 student_data.last_name,
@@ -31,14 +44,10 @@ class StudentCRUD:
                 student_data.notes,
                 student_data.active if student_data.active is not None else True,
                 datetime.now()
-            ))
+            ), select=STUDENT_SELECT + " WHERE student_id = ?")
             conn.commit()
             
-            # Get the inserted student_id
-            cursor.execute("SELECT @@IDENTITY")
-            student_id = cursor.fetchone()[0]
-            
-            return {"student_id": student_id, **student_data.dict(), "created_at": datetime.now()}
+            return student
         
         except Exception as e:
             conn.rollback()
@@ -85,7 +94,8 @@ class StudentCRUD:
             (org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated student_id in one round trip
+            student_id = execute_insert(cursor, query, (
                 org_id,
                 first_name,
                 last_name,
@@ -100,10 +110,6 @@ class StudentCRUD:
             ))
             conn.commit()
             
-            # Get the inserted student_id
-            cursor.execute("SELECT @@IDENTITY")
-            student_id = cursor.fetchone()[0]
-            
             return {
                 "student_id": student_id,
                 "org_id": org_id,
@@ -142,26 +148,9 @@ class StudentCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT student_id, org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at FROM [dbo].[Students] WHERE student_id = ?"
+            query = STUDENT_SELECT + " WHERE student_id = ?"
             cursor.execute(query, (student_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "student_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "dob": row[4],
-                    "guardian_name": row[5],
-                    "guardian_phone": row[6],
-                    "guardian_email": row[7],
-                    "student_photo_path": row[8],
-                    "notes": row[9],
-                    "active": row[10],
-                    "created_at": row[11]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving student: {str(e)}")
@@ -170,33 +159,32 @@ class StudentCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_students():
-        """Retrieve all students"""
+    def get_students_by_ids(ids: list):
+        """Retrieve the students with the given IDs, in the order given (unknown IDs are skipped)"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT student_id, org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at FROM [dbo].[Students]"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            students = []
-            for row in rows:
-                students.append({
-                    "student_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "dob": row[4],
-                    "guardian_name": row[5],
-                    "guardian_phone": row[6],
-                    "guardian_email": row[7],
-                    "student_photo_path": row[8],
-                    "notes": row[9],
-                    "active": row[10],
-                    "created_at": row[11]
-                })
-            return students
+            query, params = build_ids_query(STUDENT_SELECT, "student_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "student_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving students: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_all_students(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve students, optionally one keyset page at a time"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_page_query(STUDENT_SELECT, "student_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving students: {str(e)}")
@@ -205,33 +193,15 @@ class StudentCRUD:
             conn.close()
 
     @staticmethod
-    def get_students_by_org(org_id: int):
+    def get_students_by_org(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all students for a specific organization"""
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            query = "SELECT student_id, org_id, first_name, last_name, dob, guardian_name, guardian_phone, guardian_email, student_photo_path, notes, active, created_at FROM [dbo].[Students] WHERE org_id = ?"
-            cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            students = []
-            for row in rows:
-                students.append({
-                    "student_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "dob": row[4],
-                    "guardian_name": row[5],
-                    "guardian_phone": row[6],
-                    "guardian_email": row[7],
-                    "student_photo_path": row[8],
-                    "notes": row[9],
-                    "active": row[10],
-                    "created_at": row[11]
-                })
-            return students
+            query, params = build_page_query(STUDENT_SELECT, "student_id", ["org_id = ?"], [org_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving students: {str(e)}")
@@ -1,5 +1,8 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.trainermodel import TrainerCreate, TrainerUpdate
+from utils.multiget import build_ids_query, order_by_ids
+
+TRAINER_SELECT = "SELECT trainer_id, org_id, first_name, last_name, phone, email, hire_date, active FROM [dbo].[Trainers]"
 
 class TrainerCRUD:
     
@@ -15,7 +18,8 @@ class TrainerCRUD:
             (org_id, first_name, last_name, phone, email, hire_date, active)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated trainer_id in one round trip
+            trainer_id = execute_insert(cursor, query, (
                 trainer_data.org_id,
                 trainer_data.first_name,
                 trainer_data.last_name,
@@ -26,10 +30,6 @@ class TrainerCRUD:
             ))
             conn.commit()
             
-            # Get the inserted trainer_id
-            cursor.execute("SELECT @@IDENTITY")
-            trainer_id = cursor.fetchone()[0]
-            
             return {"trainer_id": trainer_id, **trainer_data.dict()}
         
         except Exception as e:
@@ -46,22 +46,9 @@ class TrainerCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT trainer_id, org_id, first_name, last_name, phone, email, hire_date, active FROM [dbo].[Trainers] WHERE trainer_id = ?"
+            query = TRAINER_SELECT + " WHERE trainer_id = ?"
             cursor.execute(query, (trainer_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "trainer_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "phone": row[4],
-                    "email": row[5],
-                    "hire_date": row[6],
-                    "active": row[7]
-                }
-            return None
+            return fetch_dict(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving trainer: {str(e)}")
@@ -69,6 +56,23 @@ class TrainerCRUD:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def get_trainers_by_ids(ids: list):
+        """Retrieve the trainers with the given IDs, in the order given (unknown IDs are skipped)"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query, params = build_ids_query(TRAINER_SELECT, "trainer_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "trainer_id", ids)
+        
+        except Exception as e:
+            raise Exception(f"Error retrieving trainers: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def get_all_trainers():
         """Retrieve all trainers"""
@@ -76,23 +80,9 @@ class TrainerCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT trainer_id, org_id, first_name, last_name, phone, email, hire_date, active FROM [dbo].[Trainers]"
+            query = TRAINER_SELECT
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            trainers = []
-            for row in rows:
-                trainers.append({
-                    "trainer_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "phone": row[4],
-                    "email": row[5],
-                    "hire_date": row[6],
-                    "active": row[7]
-                })
-            return trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving trainers: {str(e)}")
@@ -107,23 +97,9 @@ class TrainerCRUD:
         cursor = conn.cursor()
         
         try:
-            query = "SELECT trainer_id, org_id, first_name, last_name, phone, email, hire_date, active FROM [dbo].[Trainers] WHERE org_id = ?"
+            query = TRAINER_SELECT + " WHERE org_id = ?"
             cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            trainers = []
-            for row in rows:
-                trainers.append({
-                    "trainer_id": row[0],
-                    "org_id": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "phone": row[4],
-                    "email": row[5],
-                    "hire_date": row[6],
-                    "active": row[7]
-                })
-            return trainers
+            return fetch_dicts(cursor)
         
         except Exception as e:
             raise Exception(f"Error retrieving trainers: {str(e)}")
@@ -1,16 +1,42 @@
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_insert, fetch_dict, fetch_dicts
 from model.usermodel import UserCreate, UserUpdate
 from datetime import datetime
 from utils.password_helper import PasswordHelper
-from utils.email_helper import EmailHelper
+from utils.email_outbox import enqueue_email, wake_outbox_workers
+from utils.pagination import build_page_query
+from utils.filtering import FilterField, ListQuery
+from utils.batched_writer import CoalescingWriter
+from utils.multiget import build_ids_query, order_by_ids
 import os
 
+# Users with their organization and role names, as returned by the list endpoints
+USER_LIST_SELECT = """
+            SELECT u.user_id, u.org_id, u.role_id, u.email, u.phone, u.password_hash, u.active, u.created_at, u.last_login_at,
+                   o.name as organization_name, r.name as role_name
+            FROM [dbo].[Users] u
+            LEFT JOIN [dbo].[Organizations] o ON u.org_id = o.org_id
+            LEFT JOIN [dbo].[Roles] r ON u.role_id = r.role_id
+            """
+
+# Fields the user list endpoints can filter and sort on (each backed by an index);
+# both list queries alias Users as u
+USER_FILTERS = {
+    "active": FilterField("u.active", bool),
+    "role_id": FilterField("u.role_id", int),
+    "email": FilterField("u.email", str, sortable=True),
+    "created_at": FilterField("u.created_at", datetime, range=True, sortable=True, cast="DATETIME")
+}
+
 class UserCRUD:
     """CRUD operations for Users table"""
 
     @staticmethod
     def create_user(user_data: UserCreate):
         """Create a new user with auto-generated password"""
+        # Generate random password and hash it before taking a connection, so the
+        # connection is not held for the duration of the hash
+        plain_password, hashed_password = PasswordHelper.generate_and_hash_password()
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -21,15 +47,13 @@ class UserCRUD:
             if cursor.fetchone():
                 raise Exception(f"Email '{user_data.email}' is already registered")
             
-            # Generate random password and hash it
-            plain_password, hashed_password = PasswordHelper.generate_and_hash_password()
-            
             # Insert the user
             query = """
             INSERT INTO [dbo].[Users] (org_id, role_id, email, phone, password_hash, active, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """
-            cursor.execute(query, (
+            # Insert and get the generated user_id in one round trip
+            user_id = execute_insert(cursor, query, (
                 user_data.org_id,
                 user_data.role_id,
                 user_data.email,
@@ -38,55 +62,43 @@ class UserCRUD:
                 user_data.active,
                 datetime.now()
             ))
-            conn.commit()
             
-            user_id = None
-            # Get the newly inserted user_id
-            cursor.execute("SELECT @@IDENTITY")
-            user_id = cursor.fetchone()[0]
-            
-            # Send welcome email with password
-            try:
-                email_helper = EmailHelper()
-                base_app_url = os.getenv("BASE_APP_URL", "http://localhost:3000")
-                change_password_link = f"{base_app_url}/users/change-password?email={user_data.email}"
-                
-                html_body = f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif;">
-                        <h2>Welcome to Our System!</h2>
-                        <p>Dear User,</p>
-                        <p>Your account has been successfully created. Here are your login credentials:</p>
-                        <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                            <p><strong>Email:</strong> {user_data.email}</p>
-                            <p><strong>Temporary Password:</strong> <code style="background-color: #e0e0e0; padding: 5px;">{plain_password}</code></p>
-                        </div>
-                        <p style="color: #d9534f; font-weight: bold;">⚠️ IMPORTANT: Please change this password immediately after your first login for security purposes.</p>
-                        <p>You can change your password using the link below:</p>
-                        <div style="text-align: center; margin: 20px 0;">
-                            <a href="{change_password_link}" style="display: inline-block; background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">Change Password</a>
-                        </div>
-                        <p>Or follow these steps:</p>
-                        <ol>
-                            <li>Log in with the credentials above</li>
-                            <li>Go to <code>{change_password_link}</code></li>
-                            <li>Enter your old password and new password</li>
-                            <li>Click "Update Password"</li>
-                        </ol>
-                        <p>If you did not create this account or have any questions, please contact our support team.</p>
-                        <p>Best regards,<br>System Administration Team</p>
-                    </body>
-                </html>
-                """
-                
-                email_helper.send_html_email(
-                    recipient_email=user_data.email,
-                    subject="Welcome! Your Account Credentials",
-                    html_body=html_body
-                )
-            except Exception as email_error:
-                # Log email error but don't fail user creation
-                print(f"Warning: Could not send welcome email to {user_data.email}: {str(email_error)}")
+            # Queue welcome email with password (committed together with the user)
+            base_app_url = os.getenv("BASE_APP_URL", "http://localhost:3000")
+            change_password_link = f"{base_app_url}/users/change-password?email={user_data.email}"
+            
+            html_body = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif;">
+                    <h2>Welcome to Our System!</h2>
+                    <p>Dear User,</p>
+                    <p>Your account has been successfully created. Here are your login credentials:</p>
+                    <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                        <p><strong>Email:</strong> {user_data.email}</p>
+                        <p><strong>Temporary Password:</strong> <code style="background-color: #e0e0e0; padding: 5px;">{plain_password}</code></p>
+                    </div>
+                    <p style="color: #d9534f; font-weight: bold;">⚠️ IMPORTANT: Please change this password immediately after your first login for security purposes.</p>
+                    <p>You can change your password using the link below:</p>
+                    <div style="text-align: center; margin: 20px 0;">
+                        <a href="{change_password_link}" style="display: inline-block; background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">Change Password</a>
+                    </div>
+                    <p>Or follow these steps:</p>
+                    <ol>
+                        <li>Log in with the credentials above</li>
+                        <li>Go to <code>{change_password_link}</code></li>
+                        <li>Enter your old password and new password</li>
+                        <li>Click "Update Password"</li>
+                    </ol>
+                    <p>If you did not create this account or have any questions, please contact our support team.</p>
+                    <p>Best regards,<br>System Administration Team</p>
+                </body>
+            </html>
+            """
+            
+            enqueue_email(cursor, user_data.email, "Welcome! Your Account Credentials", html_body)
+            
+            conn.commit()
+            wake_outbox_workers()
             
             return {
                 "message": "User created successfully. Welcome email sent with temporary password.",
@@ -114,21 +126,7 @@ class UserCRUD:
             WHERE user_id = ?
             """
             cursor.execute(query, (user_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "user_id": row[0],
-                    "org_id": row[1],
-                    "role_id": row[2],
-                    "email": row[3],
-                    "phone": row[4],
-                    "password_hash": row[5],
-                    "active": row[6],
-                    "created_at": row[7],
-                    "last_login_at": row[8]
-                }
-            return None
+            return fetch_dict(cursor)
         except Exception as e:
             raise Exception(f"Error retrieving user: {str(e)}")
         finally:
@@ -136,38 +134,15 @@ class UserCRUD:
             conn.close()
 
     @staticmethod
-    def get_all_users():
-        """Retrieve all users with organization and role names"""
+    def get_users_by_ids(ids: list):
+        """Retrieve the users with the given IDs, in the order given (unknown IDs are skipped)"""
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            query = """
-            SELECT u.user_id, u.org_id, u.role_id, u.email, u.phone, u.password_hash, u.active, u.created_at, u.last_login_at,
-                   o.name as organization_name, r.name as role_name
-            FROM [dbo].[Users] u
-            LEFT JOIN [dbo].[Organizations] o ON u.org_id = o.org_id
-            LEFT JOIN [dbo].[Roles] r ON u.role_id = r.role_id
-            """
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            users = []
-            for row in rows:
-                users.append({
-                    "user_id": row[0],
-                    "org_id": row[1],
-                    "role_id": row[2],
-                    "email": row[3],
-                    "phone": row[4],
-                    "password_hash": row[5],
-                    "active": row[6],
-                    "created_at": row[7],
-                    "last_login_at": row[8],
-                    "organization_name": row[9],
-                    "role_name": row[10]
-                })
-            return users
+            query, params = build_ids_query(USER_LIST_SELECT, "u.user_id", ids)
+            cursor.execute(query, params)
+            return order_by_ids(fetch_dicts(cursor), "user_id", ids)
         except Exception as e:
             raise Exception(f"Error retrieving users: {str(e)}")
         finally:
@@ -175,34 +150,35 @@ class UserCRUD:
             conn.close()
 
     @staticmethod
-    def get_users_by_org(org_id: int):
+    def get_all_users(limit: int = None, after_id: int = None, list_query: ListQuery = None):
+        """Retrieve users with organization and role names, optionally one keyset page at a time"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            query, params = build_page_query(USER_LIST_SELECT, "u.user_id", [], [], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
+        except Exception as e:
+            raise Exception(f"Error retrieving users: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_users_by_org(org_id: int, limit: int = None, after_id: int = None, list_query: ListQuery = None):
         """Retrieve all users for a specific organization"""
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            query = """
-            SELECT user_id, org_id, role_id, email, phone, password_hash, active, created_at, last_login_at
-            FROM [dbo].[Users]
-            WHERE org_id = ?
+            select = """
+            SELECT u.user_id, u.org_id, u.role_id, u.email, u.phone, u.password_hash, u.active, u.created_at, u.last_login_at
+            FROM [dbo].[Users] u
             """
-            cursor.execute(query, (org_id,))
-            rows = cursor.fetchall()
-            
-            users = []
-            for row in rows:
-                users.append({
-                    "user_id": row[0],
-                    "org_id": row[1],
-                    "role_id": row[2],
-                    "email": row[3],
-                    "phone": row[4],
-                    "password_hash": row[5],
-                    "active": row[6],
-                    "created_at": row[7],
-                    "last_login_at": row[8]
-                })
-            return users
+            query, params = build_page_query(select, "u.user_id", ["u.org_id = ?"], [org_id], limit, after_id, list_query)
+            cursor.execute(query, params)
+            return fetch_dicts(cursor)
         except Exception as e:
             raise Exception(f"Error retrieving users by organization: {str(e)}")
         finally:
@@ -222,21 +198,7 @@ class UserCRUD:
             WHERE email = ?
             """
             cursor.execute(query, (email,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "user_id": row[0],
-                    "org_id": row[1],
-                    "role_id": row[2],
-                    "email": row[3],
-                    "phone": row[4],
-                    "password_hash": row[5],
-                    "active": row[6],
-                    "created_at": row[7],
-                    "last_login_at": row[8]
-                }
-            return None
+            return fetch_dict(cursor)
         except Exception as e:
             raise Exception(f"Error retrieving user by email: {str(e)}")
         finally:
@@ -361,48 +323,85 @@ class UserCRUD:
             conn.close()
 
     @staticmethod
-    def verify_user_credentials(email: str, password: str):
-        """Verify user email and password. Returns user data if valid, None otherwise."""
+    def update_last_login_batch(last_logins: dict):
+        """
+        Write last_login_at for many users in one round trip (flushed by last_login_writer).
+        
+        Args:
+            last_logins: Dictionary mapping user_id to login timestamp
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.fast_executemany = True
+            cursor.executemany(
+                "UPDATE [dbo].[Users] SET last_login_at = ? WHERE user_id = ?",
+                [(logged_in_at, user_id) for user_id, logged_in_at in last_logins.items()]
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error updating last logins: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_login_record(email: str):
+        """
+        Fetch the user data needed to log in, including password_hash and role_name.
+        
+        Password verification is left to the caller so that it runs on the password
+        hashing pool instead of holding a database connection.
+        
+        Returns:
+            Dictionary with user data and password_hash, or None if the email is unknown
+        """
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
+            # One round trip: the role name is joined in
             query = """
-            SELECT user_id, org_id, role_id, email, phone, password_hash, active, created_at, last_login_at
-            FROM [dbo].[Users]
-            WHERE email = ?
+            SELECT u.user_id, u.org_id, u.role_id, r.name AS role_name, u.email, u.phone, u.password_hash,
+                   u.active, u.created_at, u.last_login_at
+            FROM [dbo].[Users] u
+            LEFT JOIN [dbo].[Roles] r ON r.role_id = u.role_id
+            WHERE u.email = ?
             """
             cursor.execute(query, (email,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            # Verify password using PasswordHelper
-            if PasswordHelper.verify_password(password, row[5]):  # row[5] is password_hash
-                # Fetch role name
-                role_query = "SELECT name FROM [dbo].[Roles] WHERE role_id = ?"
-                cursor.execute(role_query, (row[2],))  # row[2] is role_id
-                role_row = cursor.fetchone()
-                role_name = role_row[0] if role_row else None
-                
-                return {
-                    "user_id": row[0],
-                    "org_id": row[1],
-                    "role_id": row[2],
-                    "role_name": role_name,
-                    "email": row[3],
-                    "phone": row[4],
-                    "active": row[6],
-                    "created_at": row[7],
-                    "last_login_at": row[8]
-                }
-            return None
+            return fetch_dict(cursor)
         except Exception as e:
             raise Exception(f"Error verifying user credentials: {str(e)}")
         finally:
             cursor.close()
             conn.close()
+
+    @staticmethod
+    def update_password_hash(user_id: int, old_hash: str, new_hash: str):
+        """
+        Replace a password hash with one using the current algorithm (rehash on login).
+        
+        Only updates if the stored hash is still old_hash, so a password changed in
+        the meantime is never overwritten. Returns True if the hash was replaced.
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query = "UPDATE [dbo].[Users] SET password_hash = ? WHERE user_id = ? AND password_hash = ?"
+            cursor.execute(query, (new_hash, user_id, old_hash))
+            updated = cursor.rowcount > 0
+            conn.commit()
+            return updated
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error updating password hash: {str(e)}")
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def change_password(email: str, old_password: str, new_password: str):
         """
@@ -419,63 +418,66 @@ class UserCRUD:
         Raises:
             Exception: If user not found or old password is incorrect
         """
+        # Get current password hash and user_id
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            # Get current password hash and user_id
             query = "SELECT user_id, password_hash FROM [dbo].[Users] WHERE email = ?"
             cursor.execute(query, (email,))
             row = cursor.fetchone()
+        except Exception as e:
+            raise Exception(str(e))
+        finally:
+            cursor.close()
+            conn.close()
+        
+        if not row:
+            raise Exception("User not found")
+        
+        user_id = row[0]
+        current_hash = row[1]
+        
+        # Verify old password and hash the new one without holding a connection
+        if not PasswordHelper.verify_password(old_password, current_hash):
+            raise Exception("Old password is incorrect")
+        
+        # Validate new password length
+        if len(new_password) < 8:
+            raise Exception("New password must be at least 8 characters long")
+        
+        new_hash = PasswordHelper.hash_password(new_password)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Update password, unless it was changed since it was verified above
+            update_query = "UPDATE [dbo].[Users] SET password_hash = ? WHERE user_id = ? AND password_hash = ?"
+            cursor.execute(update_query, (new_hash, user_id, current_hash))
+            if cursor.rowcount == 0:
+                raise Exception("Password was changed by another request, please try again")
+            
+            # Queue password change notification email (committed together with the password change)
+            html_body = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif;">
+                    <h2>Password Changed Successfully</h2>
+                    <p>Dear User,</p>
+                    <p>Your password has been successfully changed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}.</p>
+                    <div style="background-color: #d4edda; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #28a745;">
+                        <p><strong style="color: #155724;">✓ Password changed successfully</strong></p>
+                    </div>
+                    <p>If you did not make this change, please <strong>contact our support team immediately</strong>.</p>
+                    <p>Best regards,<br>System Administration Team</p>
+                </body>
+            </html>
+            """
             
-            if not row:
-                raise Exception("User not found")
-            
-            user_id = row[0]
-            current_hash = row[1]
-            
-            # Verify old password
-            if not PasswordHelper.verify_password(old_password, current_hash):
-                raise Exception("Old password is incorrect")
-            
-            # Validate new password length
-            if len(new_password) < 8:
-                raise Exception("New password must be at least 8 characters long")
-            
-            # Hash new password
-            new_hash = PasswordHelper.hash_password(new_password)
+            enqueue_email(cursor, email, "Your Password Has Been Changed", html_body)
             
-            # Update password
-            update_query = "UPDATE [dbo].[Users] SET password_hash = ? WHERE email = ?"
-            cursor.execute(update_query, (new_hash, email))
             conn.commit()
-            
-            # Send password change notification email
-            try:
-                email_helper = EmailHelper()
-                html_body = f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif;">
-                        <h2>Password Changed Successfully</h2>
-                        <p>Dear User,</p>
-                        <p>Your password has been successfully changed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}.</p>
-                        <div style="background-color: #d4edda; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #28a745;">
-                            <p><strong style="color: #155724;">✓ Password changed successfully</strong></p>
-                        </div>
-                        <p>If you did not make this change, please <strong>contact our support team immediately</strong>.</p>
-                        <p>Best regards,<br>System Administration Team</p>
-                    </body>
-                </html>
-                """
-                
-                email_helper.send_html_email(
-                    recipient_email=email,
-                    subject="Your Password Has Been Changed",
-                    html_body=html_body
-                )
-            except Exception as email_error:
-                # Log email error but don't fail password change
-                print(f"Warning: Could not send password change notification to {email}: {str(email_error)}")
+            wake_outbox_workers()
             
             return {
                 "message": "Password changed successfully",
@@ -504,6 +506,10 @@ class UserCRUD:
         Raises:
             Exception: If user not found
         """
+        # Generate temporary password before taking a connection, so the
+        # connection is not held for the duration of the hash
+        temp_password, hashed_password = PasswordHelper.generate_and_hash_password()
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -516,63 +522,53 @@ class UserCRUD:
             if not row:
                 raise Exception("User with this email address not found")
             
-            # Generate temporary password
-            temp_password, hashed_password = PasswordHelper.generate_and_hash_password()
-            
             # Update password in database
             update_query = "UPDATE [dbo].[Users] SET password_hash = ? WHERE email = ?"
             cursor.execute(update_query, (hashed_password, email))
-            conn.commit()
             
-            # Send password reset email
-            try:
-                email_helper = EmailHelper()
-                base_app_url = os.getenv("BASE_APP_URL", "http://localhost:3000")
-                change_password_link = f"{base_app_url}/users/change-password?email={email}"
-                
-                html_body = f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif;">
-                        <h2>Password Reset Request</h2>
-                        <p>Dear User,</p>
-                        <p>We received a request to reset your password. Your temporary password is provided below:</p>
-                        <div style="background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #ffc107;">
-                            <p><strong>Temporary Password:</strong></p>
-                            <p style="font-size: 16px; font-family: monospace; background-color: #fffacd; padding: 10px; border-radius: 3px;">{temp_password}</p>
-                        </div>
-                        <p style="color: #d9534f; font-weight: bold;">⚠️ IMPORTANT SECURITY NOTICE:</p>
-                        <ul>
-                            <li>This temporary password is valid for one-time login only</li>
-                            <li>You must change this password immediately after logging in</li>
-                            <li>If you did not request this password reset, please ignore this email</li>
-                        </ul>
-                        <p>To reset your password, follow these steps:</p>
-                        <ol>
-                            <li>Log in using the temporary password above</li>
-                            <li>Click the link below to change your password</li>
-                            <li>Enter your new secure password</li>
-                        </ol>
-                        <div style="text-align: center; margin: 20px 0;">
-                            <a href="{change_password_link}" style="display: inline-block; background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">Change Password</a>
-                        </div>
-                        <p>Or visit: <code>{change_password_link}</code></p>
-                        <p>If you have any questions or did not request this reset, please contact our support team immediately.</p>
-                        <p style="color: #666; font-size: 12px; margin-top: 30px;">
-                            This is an automated email. Please do not reply to this message.
-                        </p>
-                        <p>Best regards,<br>System Administration Team</p>
-                    </body>
-                </html>
-                """
-                
-                email_helper.send_html_email(
-                    recipient_email=email,
-                    subject="Password Reset - Temporary Password Provided",
-                    html_body=html_body
-                )
-            except Exception as email_error:
-                # Log email error but don't fail password reset
-                print(f"Warning: Could not send password reset email to {email}: {str(email_error)}")
+            # Queue password reset email (committed together with the password change)
+            base_app_url = os.getenv("BASE_APP_URL", "http://localhost:3000")
+            change_password_link = f"{base_app_url}/users/change-password?email={email}"
+            
+            html_body = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif;">
+                    <h2>Password Reset Request</h2>
+                    <p>Dear User,</p>
+                    <p>We received a request to reset your password. Your temporary password is provided below:</p>
+                    <div style="background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #ffc107;">
+                        <p><strong>Temporary Password:</strong></p>
+                        <p style="font-size: 16px; font-family: monospace; background-color: #fffacd; padding: 10px; border-radius: 3px;">{temp_password}</p>
+                    </div>
+                    <p style="color: #d9534f; font-weight: bold;">⚠️ IMPORTANT SECURITY NOTICE:</p>
+                    <ul>
+                        <li>This temporary password is valid for one-time login only</li>
+                        <li>You must change this password immediately after logging in</li>
+                        <li>If you did not request this password reset, please ignore this email</li>
+                    </ul>
+                    <p>To reset your password, follow these steps:</p>
+                    <ol>
+                        <li>Log in using the temporary password above</li>
+                        <li>Click the link below to change your password</li>
+                        <li>Enter your new secure password</li>
+                    </ol>
+                    <div style="text-align: center; margin: 20px 0;">
+                        <a href="{change_password_link}" style="display: inline-block; background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; font-weight: bold;">Change Password</a>
+                    </div>
+                    <p>Or visit: <code>{change_password_link}</code></p>
+                    <p>If you have any questions or did not request this reset, please contact our support team immediately.</p>
+                    <p style="color: #666; font-size: 12px; margin-top: 30px;">
+                        This is an automated email. Please do not reply to this message.
+                    </p>
+                    <p>Best regards,<br>System Administration Team</p>
+                </body>
+            </html>
+            """
+            
+            enqueue_email(cursor, email, "Password Reset - Temporary Password Provided", html_body)
+            
+            conn.commit()
+            wake_outbox_workers()
             
             return {
                 "message": "Password reset email sent successfully",
@@ -586,3 +582,10 @@ class UserCRUD:
         finally:
             cursor.close()
             conn.close()
+
+# Login records last_login_at here instead of writing it on the request path
+last_login_writer = CoalescingWriter(
+    UserCRUD.update_last_login_batch,
+    interval=float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', '2')),
+    name="last-login-writer"
+)
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, status, Depends, Response, File, UploadFile, Form
 from typing import List, Optional
 from model.studentmodel import Student, StudentCreate, StudentUpdate
-from services.studentcrud import StudentCRUD
+from services.studentcrud import StudentCRUD, STUDENT_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
+from utils.responses import list_response
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+student_filters = ListParams(STUDENT_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_student(
@@ -34,7 +41,8 @@ async def create_student(
     - **student_photo**: Student photo file (optional)
     """
     try:
-        result = StudentCRUD.create_student_with_photo(
+        result = await run_db(
+            StudentCRUD.create_student_with_photo,
             org_id=org_id,
             first_name=first_name,
             last_name=last_name,
@@ -52,24 +60,53 @@ async def create_student(
 
 # ============== GET ENDPOINTS ==============
 @router.get("/organization/{org_id}", response_model=List[Student])
-async def get_students_by_organization(org_id: int):
+async def get_students_by_organization(org_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(student_filters)):
     """
     Retrieve all students for a specific organization.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=active:eq:true) and **sort** (e.g. ?sort=last_name) on: active, last_name, created_at.
     """
     try:
-        students = StudentCRUD.get_students_by_org(org_id)
-        return students
+        students = await run_db(StudentCRUD.get_students_by_org, org_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, students, "student_id", page.limit, filters)
+        return list_response(students, Student, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/by-ids", response_model=List[Student])
+async def get_students_by_ids(request: IdList):
+    """
+    Retrieve many students by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Student IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(StudentCRUD.get_students_by_ids, request.ids)
+        return list_response(records, Student)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[Student])
-async def get_all_students():
+async def get_all_students(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(student_filters), multi: IdsParams = Depends()):
     """
     Retrieve all students.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=active:eq:true) and **sort** (e.g. ?sort=last_name) on: active, last_name, created_at.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those students, in that order.
     """
     try:
-        students = StudentCRUD.get_all_students()
-        return students
+        if multi.ids is not None:
+            records = await run_db(StudentCRUD.get_students_by_ids, multi.ids)
+            return list_response(records, Student)
+        
+        students = await run_db(StudentCRUD.get_all_students, page.limit, page.after_id, filters)
+        set_next_cursor(response, students, "student_id", page.limit, filters)
+        return list_response(students, Student, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -79,7 +116,7 @@ async def get_student(student_id: int):
     Retrieve a single student by ID.
     """
     try:
-        student = StudentCRUD.get_student(student_id)
+        student = await run_db(StudentCRUD.get_student, student_id)
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
         return student
@@ -98,7 +135,7 @@ async def update_student(student_id: int, student: StudentUpdate):
     - All other fields are optional
     """
     try:
-        result = StudentCRUD.update_student(student_id, student)
+        result = await run_db(StudentCRUD.update_student, student_id, student)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -112,7 +149,7 @@ async def delete_student(student_id: int):
     Delete a student by ID.
     """
     try:
-        result = StudentCRUD.delete_student(student_id)
+        result = await run_db(StudentCRUD.delete_student, student_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
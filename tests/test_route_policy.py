@@ -0,0 +1,120 @@
+"""
+Allow/deny matrix for JWTMiddleware's route policy table.
+
+Every method of every application route (with its path parameters filled in) is
+resolved through the compiled table and compared with the original middleware's
+rules: exact PUBLIC_ROUTES for any method, the /api/docs prefix, and PUT under
+/users/change-password/. Everything else must require a token.
+"""
+import re
+import pytest
+
+pytest.importorskip("pyodbc")
+
+from main import app  # noqa: E402
+from utils.auth import route_policies  # noqa: E402
+from utils.route_policy import PUBLIC  # noqa: E402
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+# Public paths of the original middleware, before the policy table
+BASELINE_PUBLIC_ROUTES = {
+    "/health",
+    "/users/authenticate/login",
+    "/users/forgot-password",
+    "/docs",
+    "/openapi.json",
+    "/redoc",
+    "/organizations",
+    "/activities",
+    "/trainers",
+    "/activitytrainers",
+    "/attendance",
+    "/enrollments",
+    "/students",
+    "/batches",
+    "/batchsessions",
+    "/categories",
+    "/feeplans",
+    "/invoices",
+    "/payments",
+    "/roles"
+}
+
+def baseline_is_public(method: str, path: str) -> bool:
+    if path in BASELINE_PUBLIC_ROUTES or path.startswith("/api/docs"):
+        return True
+    return path.startswith("/users/change-password/") and method == "PUT"
+
+def _concrete_path(template: str) -> str:
+    path = re.sub(r"\{[^}]+:path\}", "a/b", template)
+    return re.sub(r"\{[^}]+\}", "1", path)
+
+def _route_cases():
+    cases = set()
+    for route in app.routes:
+        template = getattr(route, "path", None)
+        if template is None:
+            continue
+        path = _concrete_path(template)
+        # Every method, so the methods a route doesn't serve are covered too
+        for method in METHODS:
+            cases.add((method, path))
+    return sorted(cases, key=lambda case: (case[1], case[0]))
+
+ROUTE_CASES = _route_cases()
+
+# Paths that match no route, or only differ from a public one by a suffix
+UNMATCHED_CASES = [
+    ("GET", "/students/"),
+    ("DELETE", "/students/"),
+    ("GET", "/studentsx"),
+    ("GET", "/health/"),
+    ("GET", "/no-such-route"),
+    ("GET", "/api/docs/index.html"),
+    ("PUT", "/users/change-password/a/b"),
+    ("POST", "/users/change-password/a"),
+]
+
+@pytest.fixture(scope="module", autouse=True)
+def compiled_policies():
+    route_policies.compile(app.routes)
+
+def test_matrix_covers_the_application():
+    assert len(ROUTE_CASES) >= 90 * 2
+
+@pytest.mark.parametrize("method,path", ROUTE_CASES + UNMATCHED_CASES,
+                         ids=[f"{method} {path}" for method, path in ROUTE_CASES + UNMATCHED_CASES])
+def test_policy_matches_baseline(method, path):
+    assert (route_policies.resolve(method, path).access == PUBLIC) == baseline_is_public(method, path)
+
+@pytest.mark.parametrize("method,path", [
+    ("DELETE", "/students/1"),
+    ("PUT", "/students/1"),
+    ("GET", "/students/1"),
+    ("PUT", "/payments/1"),
+    ("POST", "/enrollments/bulk"),
+    ("POST", "/attendance/session/1/bulk"),
+    ("GET", "/payments/export"),
+    ("GET", "/attendance/export"),
+    ("GET", "/attendance/changes"),
+    ("GET", "/enrollments/changes"),
+    ("GET", "/students/by-ids"),
+    ("GET", "/health/db"),
+    ("GET", "/users"),
+])
+def test_protected(method, path):
+    assert route_policies.resolve(method, path).access != PUBLIC
+
+@pytest.mark.parametrize("method,path", [
+    ("GET", "/health"),
+    ("POST", "/users/authenticate/login"),
+    ("POST", "/users/forgot-password"),
+    ("PUT", "/users/change-password/someone@example.com"),
+    ("GET", "/students"),
+    ("POST", "/students"),
+    ("GET", "/docs"),
+    ("GET", "/openapi.json"),
+])
+def test_public(method, path):
+    assert route_policies.resolve(method, path).access == PUBLIC
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from model.trainermodel import Trainer, TrainerCreate, TrainerUpdate
 from services.trainercrud import TrainerCRUD
+from utils.executor import run_db
+from utils.multiget import IdList, IdsParams
 
 router = APIRouter(prefix="/trainers", tags=["trainers"])
 
@@ -20,7 +22,7 @@ async def create_trainer(trainer: TrainerCreate):
     - **active**: Active status (default: true)
     """
     try:
-        result = TrainerCRUD.create_trainer(trainer)
+        result = await run_db(TrainerCRUD.create_trainer, trainer)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -32,7 +34,7 @@ async def get_trainer(trainer_id: int):
     Retrieve a single trainer by ID.
     """
     try:
-        trainer = TrainerCRUD.get_trainer(trainer_id)
+        trainer = await run_db(TrainerCRUD.get_trainer, trainer_id)
         if not trainer:
             raise HTTPException(status_code=404, detail="Trainer not found")
         return trainer
@@ -41,13 +43,32 @@ async def get_trainer(trainer_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[Trainer])
+async def get_trainers_by_ids(request: IdList):
+    """
+    Retrieve many trainers by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: Trainer IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(TrainerCRUD.get_trainers_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[Trainer])
-async def get_all_trainers():
+async def get_all_trainers(multi: IdsParams = Depends()):
     """
     Retrieve all trainers.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those trainers, in that order.
     """
     try:
-        trainers = TrainerCRUD.get_all_trainers()
+        if multi.ids is not None:
+            records = await run_db(TrainerCRUD.get_trainers_by_ids, multi.ids)
+            return records
+        
+        trainers = await run_db(TrainerCRUD.get_all_trainers)
         return trainers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -58,7 +79,7 @@ async def get_trainers_by_organization(org_id: int):
     Retrieve all trainers for a specific organization.
     """
     try:
-        trainers = TrainerCRUD.get_trainers_by_org(org_id)
+        trainers = await run_db(TrainerCRUD.get_trainers_by_org, org_id)
         return trainers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,7 +94,7 @@ async def update_trainer(trainer_id: int, trainer: TrainerUpdate):
     - All other fields are optional
     """
     try:
-        result = TrainerCRUD.update_trainer(trainer_id, trainer)
+        result = await run_db(TrainerCRUD.update_trainer, trainer_id, trainer)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -87,7 +108,7 @@ async def delete_trainer(trainer_id: int):
     Delete a trainer by ID.
     """
     try:
-        result = TrainerCRUD.delete_trainer(trainer_id)
+        result = await run_db(TrainerCRUD.delete_trainer, trainer_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from pydantic import BaseModel, Field, field_validator
 from model.usermodel import User, UserCreate, UserUpdate
-from services.usercrud import UserCRUD
+from services.usercrud import UserCRUD, last_login_writer, USER_FILTERS
+from utils.executor import run_db
+from utils.pagination import PageParams, set_next_cursor
+from utils.filtering import ListParams, ListQuery
 from utils.validation_helper import ValidationHelper
+from utils.password_helper import PasswordHelper
 import jwt
 from datetime import datetime, timedelta
 from typing import Optional
+from utils.multiget import IdList, IdsParams
 
 # Configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"
@@ -52,6 +57,8 @@ class TokenResponse(BaseModel):
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+user_filters = ListParams(USER_FILTERS)
+
 # ============== CREATE ENDPOINT ==============
 @router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserCreate):
@@ -64,11 +71,12 @@ async def create_user(user: UserCreate):
     - **phone**: Phone number (optional)
     - **active**: User status (required)
     
-    A random 12-character password will be generated, hashed with SHA256, 
-    and sent to the user's email. User must change password on first login.
+    A random 12-character password will be generated, hashed with salted scrypt
+    (PBKDF2-SHA256 where scrypt is unavailable), and sent to the user's email.
+    User must change password on first login.
     """
     try:
-        result = UserCRUD.create_user(user)
+        result = await run_db(UserCRUD.create_user, user)
         return result
     except Exception as e:
         error_msg = str(e)
@@ -79,12 +87,17 @@ async def create_user(user: UserCreate):
 
 # ============== GET ENDPOINTS ==============
 @router.get("/organization/{org_id}", response_model=List[User])
-async def get_users_by_organization(org_id: int):
+async def get_users_by_organization(org_id: int, response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(user_filters)):
     """
     Retrieve all users for a specific organization.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=role_id:eq:2) and **sort** (e.g. ?sort=email) on: active, role_id, email, created_at.
     """
     try:
-        users = UserCRUD.get_users_by_org(org_id)
+        users = await run_db(UserCRUD.get_users_by_org, org_id, page.limit, page.after_id, filters)
+        set_next_cursor(response, users, "user_id", page.limit, filters)
         return users
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -95,7 +108,7 @@ async def get_user_by_email(email: str):
     Retrieve a user by email address.
     """
     try:
-        user = UserCRUD.get_user_by_email(email)
+        user = await run_db(UserCRUD.get_user_by_email, email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
@@ -104,13 +117,37 @@ async def get_user_by_email(email: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/by-ids", response_model=List[User])
+async def get_users_by_ids(request: IdList):
+    """
+    Retrieve many users by ID in one request (for ID lists too long for ?ids=).
+    
+    - **ids**: User IDs (required); results follow this order, with duplicates and unknown IDs dropped
+    """
+    try:
+        records = await run_db(UserCRUD.get_users_by_ids, request.ids)
+        return records
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("", response_model=List[User])
-async def get_all_users():
+async def get_all_users(response: Response, page: PageParams = Depends(), filters: ListQuery = Depends(user_filters), multi: IdsParams = Depends()):
     """
     Retrieve all users.
+    
+    Supports keyset pagination via **limit** and **after**; the next page's cursor is returned in the X-Next-Cursor header.
+    
+    Filter and sort with **filter** (e.g. ?filter=role_id:eq:2) and **sort** (e.g. ?sort=email) on: active, role_id, email, created_at.
+    
+    Pass **ids** (e.g. ?ids=3,1,2) to fetch only those users, in that order.
     """
     try:
-        users = UserCRUD.get_all_users()
+        if multi.ids is not None:
+            records = await run_db(UserCRUD.get_users_by_ids, multi.ids)
+            return records
+        
+        users = await run_db(UserCRUD.get_all_users, page.limit, page.after_id, filters)
+        set_next_cursor(response, users, "user_id", page.limit, filters)
         return users
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -121,7 +158,7 @@ async def get_user(user_id: int):
     Retrieve a single user by ID.
     """
     try:
-        user = UserCRUD.get_user(user_id)
+        user = await run_db(UserCRUD.get_user, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
@@ -140,7 +177,7 @@ async def update_user(user_id: int, user: UserUpdate):
     - All other fields are optional
     """
     try:
-        result = UserCRUD.update_user(user_id, user)
+        result = await run_db(UserCRUD.update_user, user_id, user)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -154,7 +191,7 @@ async def update_last_login(user_id: int):
     Update the last login timestamp for a user.
     """
     try:
-        result = UserCRUD.update_last_login(user_id)
+        result = await run_db(UserCRUD.update_last_login, user_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -168,7 +205,7 @@ async def delete_user(user_id: int):
     Delete a user by ID.
     """
     try:
-        result = UserCRUD.delete_user(user_id)
+        result = await run_db(UserCRUD.delete_user, user_id)
         return result
     except Exception as e:
         if "not found" in str(e).lower():
@@ -190,13 +227,13 @@ async def forgot_password(request: ForgotPasswordRequest):
     """
     try:
         # Check if email exists in the user table
-        if not UserCRUD.email_exists(request.email):
+        if not await run_db(UserCRUD.email_exists, request.email):
             raise HTTPException(
                 status_code=404,
                 detail="User with this email address not found"
             )
         
-        result = UserCRUD.forgot_password(request.email)
+        result = await run_db(UserCRUD.forgot_password, request.email)
         return result
     except HTTPException:
         raise
@@ -214,7 +251,7 @@ async def change_password(email: str, change_password_data: ChangePasswordReques
     - **new_password**: New password in plain text (minimum 8 characters) (required)
     """
     try:
-        result = UserCRUD.change_password(email, change_password_data.old_password, change_password_data.new_password)
+        result = await run_db(UserCRUD.change_password, email, change_password_data.old_password, change_password_data.new_password)
         return result
     except HTTPException:
         raise
@@ -232,18 +269,27 @@ async def authenticate_user(login_data: LoginRequest):
     Authenticate user with email and password. Returns JWT token if credentials are valid.
     
     - **email**: User email address (required)
-    - **password**: User password in plain text (will be hashed and compared with SHA256) (required)
+    - **password**: User password in plain text (verified against the stored salted hash) (required)
     """
     try:
-        # Verify credentials
-        user = UserCRUD.verify_user_credentials(login_data.email, login_data.password)
+        # Verify credentials (hashing runs on the password hashing pool, not a database thread)
+        user = await run_db(UserCRUD.get_login_record, login_data.email)
         
         if not user:
+            await PasswordHelper.verify_unknown_user_async(login_data.password)
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        
+        if not await PasswordHelper.verify_password_async(login_data.password, user['password_hash']):
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
         if not user['active']:
             raise HTTPException(status_code=403, detail="User account is inactive")
         
+        # Transparently upgrade legacy SHA256 (or outdated KDF) hashes
+        if PasswordHelper.needs_rehash(user['password_hash']):
+            new_hash = await PasswordHelper.hash_password_async(login_data.password)
+            await run_db(UserCRUD.update_password_hash, user['user_id'], user['password_hash'], new_hash)
+        
         # Create JWT token
         expiration_time = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         payload = {
@@ -258,8 +304,8 @@ async def authenticate_user(login_data: LoginRequest):
         
         access_token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
         
-        # Update last login timestamp
-        UserCRUD.update_last_login(user['user_id'])
+        # Record last login timestamp (written in the background, coalesced per user)
+        last_login_writer.write(user['user_id'], datetime.now())
         
         return {
             "access_token": access_token,
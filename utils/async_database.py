@@ -0,0 +1,83 @@
+import asyncio
+from utils.database import POOL_CONFIG, validate_database_config, build_connection_string, column_names, row_mapper, rows_to_dicts
+
+try:
+    import aioodbc
+except ImportError:  # optional dependency, only needed when DB_BACKEND=async
+    aioodbc = None
+
+_async_pool = None
+_async_pool_lock = asyncio.Lock()
+
+async def get_async_pool():
+    """Return the process-wide async connection pool, creating it on first use"""
+    global _async_pool
+    if _async_pool is None:
+        async with _async_pool_lock:
+            if _async_pool is None:
+                if aioodbc is None:
+                    raise Exception(
+                        "DB_BACKEND=async requires the aioodbc package. "
+                        "Install it with 'pip install aioodbc' or set DB_BACKEND=sync."
+                    )
+                validate_database_config()
+                _async_pool = await aioodbc.create_pool(
+                    dsn=build_connection_string(),
+                    minsize=POOL_CONFIG['min_size'],
+                    maxsize=POOL_CONFIG['max_size'],
+                    pool_recycle=POOL_CONFIG['max_lifetime']
+                )
+    return _async_pool
+
+async def fetch_one(query: str, params: tuple = ()):
+    """Execute a query on a pooled async connection and return the first row (or None)"""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+async def fetch_all(query: str, params: tuple = ()):
+    """Execute a query on a pooled async connection and return all rows"""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+async def fetch_one_dict(query: str, params: tuple = ()):
+    """Like fetch_one, but return the row as a dict keyed by column name (or None)"""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            row = await cursor.fetchone()
+            return row_mapper(column_names(cursor))(row) if row is not None else None
+
+async def fetch_all_dicts(query: str, params: tuple = ()):
+    """Like fetch_all, but return the rows as dicts keyed by column name"""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return rows_to_dicts(column_names(cursor), await cursor.fetchall())
+
+def get_async_pool_stats():
+    """Return async pool statistics, or None if the async backend is not in use"""
+    if _async_pool is None:
+        return None
+    return {
+        "size": _async_pool.size,
+        "idle": _async_pool.freesize,
+        "in_use": _async_pool.size - _async_pool.freesize,
+        "min_size": _async_pool.minsize,
+        "max_size": _async_pool.maxsize
+    }
+
+async def close_async_pool():
+    """Close the async connection pool (called on application shutdown)"""
+    global _async_pool
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
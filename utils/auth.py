@@ -1,9 +1,14 @@
+import hashlib
+import os
+import threading
+import time
 import jwt
+from collections import OrderedDict
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.route_policy import RoutePolicyTable, RoutePolicy, PUBLIC, PROTECTED, ROLE_REQUIRED
 from datetime import datetime
 
 # Configuration - should match users.py
@@ -12,7 +17,10 @@ ALGORITHM = "HS256"
 
 security = HTTPBearer()
 
-# Routes that don't require JWT authentication
+# Maximum number of verified tokens kept in memory (0 disables the cache)
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '1024'))
+
+# Routes that don't require JWT authentication (exact paths, any method)
 PUBLIC_ROUTES = {
     "/health",
     "/users/authenticate/login",
@@ -38,78 +46,243 @@ PUBLIC_ROUTES = {
     "/roles"
 }
 
-class JWTMiddleware(BaseHTTPMiddleware):
-    """Middleware to verify JWT token for all protected routes"""
+# Public path prefixes (plain string prefixes, any method)
+PUBLIC_PREFIXES = (
+    "/api/docs",
+)
+
+# Public path prefixes for a single method, as (method, path prefix)
+PUBLIC_METHOD_PREFIXES = {
+    ("PUT", "/users/change-password/")
+}
+
+# Routes restricted to roles, as (method or None for any, route path template) -> role names.
+# Checked against the role_name claim of the token; takes precedence over the public rules.
+ROLE_REQUIRED_ROUTES = {}
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of decoded JWT payloads, keyed by the SHA-256 digest of the token.
+
+    Only tokens that passed signature and claim verification are stored, and each
+    entry is dropped once the token's exp has passed, so a hit returns exactly what
+    jwt.decode would have returned.
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str):
+        """Return the cached payload for a token, or None on a miss"""
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            payload, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return payload
+    
+    def put(self, token: str, payload: dict) -> None:
+        """Store a verified payload until its exp claim"""
+        if self.max_size <= 0:
+            return
+        expires_at = payload.get("exp")
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of cache size, counters and hit rate for monitoring"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None
+            }
+
+token_cache = VerifiedTokenCache(JWT_CACHE_SIZE)
+
+def decode_token(token: str) -> dict:
+    """
+    Verify a JWT and return its payload, using the verified-token cache.
+    
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid or expired
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("user_id") is not None and payload.get("email") is not None:
+            token_cache.put(token, payload)
+    return payload
+
+def _is_public(method: str, path: str) -> bool:
+    """Whether a request path is public under the rule tables above"""
+    if path in PUBLIC_ROUTES or path.startswith(PUBLIC_PREFIXES):
+        return True
+    return any(method == public_method and path.startswith(prefix) for public_method, prefix in PUBLIC_METHOD_PREFIXES)
+
+def resolve_route_template(method: str, template: str) -> RoutePolicy:
+    """
+    Decide the policy of one route (method + path template) from the rule tables above.
+
+    A template is public only when every path it matches is: it is one of the exact
+    PUBLIC_ROUTES (which have no {param} segments) or falls under a public prefix.
+    """
+    roles = ROLE_REQUIRED_ROUTES.get((method, template), ROLE_REQUIRED_ROUTES.get((None, template)))
+    if roles:
+        return RoutePolicy(ROLE_REQUIRED, frozenset(roles))
+    if _is_public(method, template):
+        return RoutePolicy(PUBLIC)
+    return RoutePolicy(PROTECTED)
+
+def resolve_unmatched_path(method: str, path: str) -> RoutePolicy:
+    """Policy for paths that match no route, or no method of their route (they 404 / 405 once authenticated)"""
+    if _is_public(method, path):
+        return RoutePolicy(PUBLIC)
+    return RoutePolicy(PROTECTED)
+
+# Compiled from app.routes on startup (see main.py), or lazily on the first request
+route_policies = RoutePolicyTable(resolve_route_template, resolve_unmatched_path)
+
+def _unauthorized(detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": detail}
+    )
+
+class PreflightMiddleware:
+    """Answer CORS preflight requests (OPTIONS) with an empty 200 - skip JWT verification"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            await Response(status_code=200)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+class JWTMiddleware:
+    """
+    Middleware to verify JWT token for all protected routes.
+    
+    Implemented as plain ASGI (not BaseHTTPMiddleware) so authenticated requests
+    pass straight through to the app, without an extra task and response stream
+    per request.
+    """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        path = scope["path"]
+        
         # Skip authentication for preflight requests (CORS)
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if method == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        if not route_policies.compiled:
+            route_policies.compile(scope["app"].routes)
         
         # Skip authentication for public routes
-        if request.url.path in PUBLIC_ROUTES or request.url.path.startswith("/api/docs"):
-            return await call_next(request)
+        policy = route_policies.resolve(method, path)
+        if policy.access == PUBLIC:
+            await self.app(scope, receive, send)
+            return
+        
+        payload, error = self.authenticate(scope)
+        if error is not None:
+            await _unauthorized(error)(scope, receive, send)
+            return
+        
+        if policy.access == ROLE_REQUIRED and payload.get("role_name") not in policy.roles:
+            await JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"detail": "Insufficient role for this endpoint"}
+            )(scope, receive, send)
+            return
+        
+        # Store user info in request state for later use in routes
+        state = scope.setdefault("state", {})
+        state["user_id"] = payload["user_id"]
+        state["email"] = payload["email"]
+        state["payload"] = payload
         
-        # Allow change-password endpoint without authentication
-        if request.url.path.startswith("/users/change-password/") and request.method == "PUT":
-            return await call_next(request)
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    def authenticate(scope: Scope):
+        """
+        Verify the bearer token of a request.
         
+        Returns:
+            Tuple of (payload, None) for a valid token, or (None, error detail)
+        """
         # Get the authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
         
         if not auth_header:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Missing authorization header"}
-            )
+            return None, "Missing authorization header"
         
         try:
             # Extract the token from "Bearer <token>"
             scheme, token = auth_header.split()
             if scheme.lower() != "bearer":
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid authentication scheme"}
-                )
-            
-            # Verify the JWT token
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("user_id")
-            email = payload.get("email")
+                return None, "Invalid authentication scheme"
             
-            if user_id is None or email is None:
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid token payload"}
-                )
+            # Verify the JWT token (repeat requests with the same token hit the cache)
+            payload = decode_token(token)
+            if payload.get("user_id") is None or payload.get("email") is None:
+                return None, "Invalid token payload"
             
-            # Store user info in request state for later use in routes
-            request.state.user_id = user_id
-            request.state.email = email
-            request.state.payload = payload
-            
-            return await call_next(request)
+            return payload, None
         
         except jwt.ExpiredSignatureError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token has expired"}
-            )
+            return None, "Token has expired"
         except jwt.InvalidTokenError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid token"}
-            )
+            return None, "Invalid token"
         except ValueError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid authorization header format"}
-            )
+            return None, "Invalid authorization header format"
         except Exception as e:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": f"Token verification failed: {str(e)}"}
-            )
+            return None, f"Token verification failed: {str(e)}"
 
 def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
@@ -119,7 +292,7 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(securit
     token = credentials.credentials
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id: int = payload.get("user_id")
         email: str = payload.get("email")
         
@@ -0,0 +1,81 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class CoalescingWriter:
+    """
+    Collects key -> value writes and flushes them in one batch from a background thread.
+
+    Repeated writes for the same key within one flush interval are coalesced (the
+    latest value wins), so a burst of updates to one row costs a single UPDATE. Used
+    for writes the caller does not need to wait for, such as last-login timestamps.
+
+    Args:
+        flush: Called with a dict of pending writes on the writer thread
+        interval: Seconds between flushes
+        name: Thread name, used in logs
+    """
+
+    def __init__(self, flush, interval: float = 2.0, name: str = "batched-writer"):
+        self._flush = flush
+        self.interval = interval
+        self.name = name
+        self._pending = {}
+        self._lock = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._counters = {"writes": 0, "flushed": 0, "flushes": 0, "failures": 0}
+
+    def write(self, key, value) -> None:
+        """Queue a write; returns immediately (writes after close() are dropped)"""
+        with self._lock:
+            if self._closed:
+                logger.warning(f"{self.name} is closed, dropping write for {key}")
+                return
+            self._pending[key] = value
+            self._counters["writes"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._closed:
+                    self._lock.wait(self.interval)
+                pending, self._pending = self._pending, {}
+                closed = self._closed
+            if pending:
+                self._flush_pending(pending)
+            if closed:
+                return
+
+    def _flush_pending(self, pending: dict):
+        try:
+            self._flush(pending)
+        except Exception as e:
+            logger.warning(f"{self.name} could not flush {len(pending)} writes, retrying next interval: {str(e)}")
+            with self._lock:
+                self._counters["failures"] += 1
+                if not self._closed:
+                    # Keep newer values written since the batch was taken
+                    self._pending = {**pending, **self._pending}
+            return
+        with self._lock:
+            self._counters["flushes"] += 1
+            self._counters["flushed"] += len(pending)
+
+    def stats(self):
+        """Snapshot of pending writes and counters for monitoring"""
+        with self._lock:
+            return {"pending": len(self._pending), **self._counters}
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush pending writes and stop the writer thread (called on application shutdown)"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            self._lock.notify_all()
+        if thread is not None:
+            thread.join(timeout)
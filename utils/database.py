@@ -1,5 +1,12 @@
+import ast
 import pyodbc
 import os
+import threading
+import time
+import types
+from collections import deque
+from functools import lru_cache
+from operator import itemgetter
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,22 +19,433 @@ DATABASE_CONFIG = {
     'password': os.getenv('DATABASE_PASSWORD', 'your_password')
 }
 
-def get_db_connection():
-    """Create and return a database connection using pyodbc"""
-    # Validate that credentials are set
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+    'idle_timeout': float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+    'checkout_timeout': float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30')),
+    'ping_after': float(os.getenv('DB_POOL_PING_AFTER', '5'))
+}
+
+# "sync" runs pyodbc calls on the database thread pool; "async" awaits CRUD methods
+# that have a native async implementation (see utils/async_database.py)
+DB_BACKEND = os.getenv('DB_BACKEND', 'sync').lower()
+
+# SQL Server accepts at most 2100 parameters per statement; IN lists are chunked below this
+MAX_IN_LIST_SIZE = 1000
+
+def chunked(items, size=MAX_IN_LIST_SIZE):
+    """Split a sequence into lists of at most size items (e.g. for IN (...) lists)"""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def execute_insert(cursor, query: str, params=(), select: str = None):
+    """
+    Run a single-row INSERT and return the generated IDENTITY key from the same batch.
+
+    The key is read with SCOPE_IDENTITY() in the same round trip as the INSERT, so
+    unlike a follow-up SELECT @@IDENTITY it costs no extra round trip and never returns
+    a key generated by a trigger. (OUTPUT INSERTED is not used because SQL Server
+    rejects it without INTO on tables that have triggers.)
+
+    Args:
+        cursor: Cursor of the caller's transaction
+        query: INSERT ... VALUES (...) statement
+        params: Parameters for the INSERT
+        select: Optional SELECT whose only ? placeholder is the new key
+            (e.g. STUDENT_SELECT + " WHERE student_id = ?"); when given, the inserted
+            row is returned as a dict keyed by column name instead of the key
+
+    Returns:
+        The new key (int), or the inserted row as a dict when select is given
+    """
+    if select is None:
+        batch = f"{query.rstrip()};\nSELECT CAST(SCOPE_IDENTITY() AS BIGINT)"
+    else:
+        head, _, tail = select.rpartition("?")
+        batch = f"{query.rstrip()};\nDECLARE @inserted_id BIGINT = SCOPE_IDENTITY();\n{head}@inserted_id{tail}"
+
+    cursor.execute(batch, params)
+    # Skip the INSERT's row count to reach the SELECT's result set
+    while cursor.description is None:
+        if not cursor.nextset():
+            raise Exception("INSERT did not return the generated key")
+    row = cursor.fetchone()
+
+    if select is None:
+        return row[0]
+    return row_mapper(column_names(cursor))(row)
+
+_column_name = itemgetter(0)
+
+def column_names(cursor) -> tuple:
+    """Column names of the cursor's current result set, in SELECT order"""
+    return tuple(map(_column_name, cursor.description))
+
+def _row_display(columns: tuple):
+    """Syntax tree of the dict display {"name": row[0], ...} for the given column names"""
+    row = ast.Name("row", ast.Load())
+    return ast.Dict(
+        keys=[ast.Constant(str(name)) for name in columns],
+        values=[ast.Subscript(row, ast.Constant(index), ast.Load()) for index in range(len(columns))]
+    )
+
+def _compile_lambda(argument: str, body):
+    """Compile a one-argument lambda from its syntax tree, without generating or evaluating source text"""
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(argument)], kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, body)))
+    code = next(const for const in compile(tree, "<row_mapper>", "eval").co_consts if isinstance(const, types.CodeType))
+    return types.FunctionType(code, {})
+
+@lru_cache(maxsize=256)
+def row_mapper(columns: tuple):
+    """
+    Return a function that converts one row to a dict keyed by the given column names.
+
+    The function body is the same dict display a hand-written {"name": row[i], ...}
+    mapping uses, so converting a row costs no per-row zip or key building. It is
+    built as a syntax tree with the column names as constant keys and compiled
+    directly. Dict keys are the SELECT's column names or AS aliases; mappers are
+    cached by column tuple, so each query shape compiles once.
+    """
+    return _compile_lambda("row", _row_display(columns))
+
+@lru_cache(maxsize=256)
+def rows_mapper(columns: tuple):
+    """Like row_mapper, but the function converts a list of rows in one list comprehension"""
+    loop = ast.comprehension(target=ast.Name("row", ast.Store()), iter=ast.Name("rows", ast.Load()), ifs=[], is_async=0)
+    return _compile_lambda("rows", ast.ListComp(_row_display(columns), [loop]))
+
+def rows_to_dicts(columns: tuple, rows) -> list:
+    """Convert rows to dicts keyed by column name (see row_mapper)"""
+    return rows_mapper(tuple(columns))(rows)
+
+def fetch_dict(cursor):
+    """Fetch the next row of the cursor as a dict keyed by column name (or None)"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return row_mapper(column_names(cursor))(row)
+
+def fetch_dicts(cursor) -> list:
+    """Fetch all remaining rows of the cursor as dicts keyed by column name"""
+    return rows_to_dicts(column_names(cursor), cursor.fetchall())
+
+def validate_database_config():
+    """Raise if the database environment variables have not been configured"""
     if DATABASE_CONFIG['server'] in ['localhost', None] or DATABASE_CONFIG['database'] == 'your_database':
         raise Exception(
             "Database configuration not set. Please set the following environment variables:\n"
             "DATABASE_SERVER, DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD\n"
             "Or create a .env file with these variables."
         )
-    
-    connection_string = (
+
+def build_connection_string():
+    """Build the ODBC connection string from DATABASE_CONFIG"""
+    return (
         f'DRIVER={{ODBC Driver 17 for SQL Server}};'
         f'SERVER={DATABASE_CONFIG["server"]};'
         f'DATABASE={DATABASE_CONFIG["database"]};'
         f'UID={DATABASE_CONFIG["user"]};'
         f'PWD={DATABASE_CONFIG["password"]}'
     )
-    conn = pyodbc.connect(connection_string)
-    return conn
+
+class _PoolEntry:
+    """A raw pyodbc connection plus the bookkeeping the pool needs for it"""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+class PooledConnection:
+    """
+    Connection handed out by the pool.
+
+    Behaves like a pyodbc connection (attribute access is delegated), except that
+    close() returns the connection to the pool instead of closing the socket.
+    Can also be used as a context manager: uncommitted work is rolled back when
+    the block raises, and the connection is released on exit.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._broken = False
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise Exception("Connection has already been returned to the pool")
+        return getattr(self._entry.raw, name)
+
+    def invalidate(self):
+        """Mark the connection as unusable so it is discarded instead of reused"""
+        self._broken = True
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, discard=self._broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._entry is not None:
+            try:
+                self._entry.raw.rollback()
+            except pyodbc.Error:
+                self._broken = True
+        self.close()
+        return False
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pyodbc connections.
+
+    - min_size: idle connections kept open even past idle_timeout
+    - max_size: hard cap on open connections (checked out + idle)
+    - idle_timeout: seconds an idle connection above min_size may stay open
+    - max_lifetime: seconds after which a connection is recycled
+    - checkout_timeout: seconds to wait for a free connection before failing
+    - ping_after: connections idle at least this long are checked with SELECT 1
+      on checkout (0 checks on every checkout)
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300.0,
+                 max_lifetime=1800.0, checkout_timeout=30.0, ping_after=5.0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+
+        self._idle = deque()
+        self._lock = threading.Condition()
+        self._size = 0
+        self._closed = False
+        self._counters = {
+            "checkouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "failed_pings": 0,
+            "waits": 0,
+            "timeouts": 0
+        }
+
+    def acquire(self):
+        """Check out a live connection, opening a new one if the pool has room"""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            entry, expired = self._checkout(deadline)
+            self._close_entries(expired)
+
+            if entry is None:
+                try:
+                    entry = _PoolEntry(self._connect())
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._counters["created"] += 1
+                return PooledConnection(self, entry)
+
+            if self._is_alive(entry):
+                return PooledConnection(self, entry)
+
+            with self._lock:
+                self._counters["failed_pings"] += 1
+            self._release(entry, discard=True)
+
+    def _checkout(self, deadline):
+        """
+        Reserve a connection slot under the lock.
+
+        Returns (entry, expired) where entry is an idle connection to reuse, or None
+        when the caller should open a new connection in the reserved slot.
+        """
+        expired = []
+        with self._lock:
+            if self._closed:
+                raise Exception("Database connection pool is closed")
+            self._counters["checkouts"] += 1
+            waited = False
+            while True:
+                expired.extend(self._evict_locked(time.monotonic()))
+                if self._idle:
+                    return self._idle.pop(), expired
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, expired
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise Exception(
+                        f"Timed out after {self.checkout_timeout}s waiting for a database connection "
+                        f"(pool max_size={self.max_size})"
+                    )
+                if not waited:
+                    self._counters["waits"] += 1
+                    waited = True
+                self._lock.wait(remaining)
+
+    def _evict_locked(self, now):
+        """Pop idle connections past their idle timeout (above min_size) or max lifetime"""
+        evicted = []
+        kept = deque()
+        while self._idle:
+            entry = self._idle.popleft()
+            too_old = self.max_lifetime and now - entry.created_at >= self.max_lifetime
+            too_idle = (
+                self.idle_timeout
+                and now - entry.last_used >= self.idle_timeout
+                and self._size - len(evicted) > self.min_size
+            )
+            if too_old or too_idle:
+                evicted.append(entry)
+            else:
+                kept.append(entry)
+        self._idle = kept
+        self._size -= len(evicted)
+        self._counters["discarded"] += len(evicted)
+        return evicted
+
+    def _is_alive(self, entry):
+        """Liveness check for connections that have been idle for a while"""
+        if time.monotonic() - entry.last_used < self.ping_after:
+            return True
+        try:
+            cursor = entry.raw.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _release(self, entry, discard=False):
+        """Return a checked-out connection, discarding it if broken or expired"""
+        now = time.monotonic()
+        if not discard and self.max_lifetime and now - entry.created_at >= self.max_lifetime:
+            discard = True
+
+        if not discard:
+            try:
+                # Never hand the next caller an open transaction
+                entry.raw.rollback()
+            except pyodbc.Error:
+                discard = True
+
+        with self._lock:
+            if discard or self._closed:
+                self._size -= 1
+                self._counters["discarded"] += 1
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                entry = None
+            self._lock.notify()
+
+        if entry is not None:
+            self._close_entries([entry])
+
+    def fill(self):
+        """Open connections until min_size are available (used to warm the pool on startup)"""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = _PoolEntry(self._connect())
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self._counters["created"] += 1
+                self._idle.append(entry)
+                self._lock.notify()
+
+    def close(self):
+        """Close all idle connections; checked-out ones are closed when released"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        self._close_entries(idle)
+
+    def stats(self):
+        """Snapshot of pool sizing and counters for monitoring"""
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "closed": self._closed,
+                **self._counters
+            }
+
+    @staticmethod
+    def _close_entries(entries):
+        for entry in entries:
+            try:
+                entry.raw.close()
+            except pyodbc.Error:
+                pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                validate_database_config()
+                connection_string = build_connection_string()
+                _pool = ConnectionPool(
+                    connect=lambda: pyodbc.connect(connection_string),
+                    **POOL_CONFIG
+                )
+    return _pool
+
+def get_db_connection():
+    """
+    Check out a pooled database connection.
+
+    Calling close() on the returned connection releases it back to the pool, and
+    it can be used as a context manager: `with get_db_connection() as conn: ...`
+    """
+    return get_pool().acquire()
+
+def get_pool_stats():
+    """Return connection pool statistics, or None if the pool has not been created yet"""
+    return _pool.stats() if _pool is not None else None
+
+def close_pool():
+    """Close the connection pool (called on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,4 +1,8 @@
 import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Optional
@@ -7,6 +11,184 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+SMTP_SESSION_CONFIG = {
+    'max_sessions': int(os.getenv('SMTP_POOL_MAX_SESSIONS', '2')),
+    'idle_timeout': float(os.getenv('SMTP_SESSION_IDLE_TIMEOUT', '60')),
+    'max_messages': int(os.getenv('SMTP_SESSION_MAX_MESSAGES', '100')),
+    'timeout': float(os.getenv('SMTP_TIMEOUT', '30'))
+}
+
+class SMTPSession:
+    """
+    An authenticated SMTP connection that reconnects itself when the server drops it.
+
+    Servers close idle connections without warning, so a send that fails because the
+    connection is gone is retried once on a fresh connection.
+    """
+
+    def __init__(self, connect):
+        self._connect = connect
+        self.server = connect()
+        self.connected_at = time.monotonic()
+        self.last_used = self.connected_at
+        self.messages = 0
+        self.sent_before_checkout = 0
+
+    def sendmail(self, sender: str, recipients: List[str], message: str) -> None:
+        try:
+            self.server.sendmail(sender, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            self.reconnect()
+            self.server.sendmail(sender, recipients, message)
+        except smtplib.SMTPException:
+            raise
+        except OSError:
+            # Socket-level failure (reset, timeout) rather than an SMTP reply
+            self.reconnect()
+            self.server.sendmail(sender, recipients, message)
+        self.messages += 1
+        self.last_used = time.monotonic()
+
+    def reconnect(self) -> None:
+        self.close()
+        self.server = self._connect()
+        self.connected_at = time.monotonic()
+        self.messages = 0
+
+    def close(self) -> None:
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self.server.close()
+            except OSError:
+                pass
+
+class SMTPSessionPool:
+    """
+    Bounded, thread-safe pool of authenticated SMTP sessions for one server and account.
+
+    - max_sessions: hard cap on concurrently open sessions
+    - idle_timeout: seconds an idle session may be kept before it is closed
+    - max_messages: messages sent over one session before it is replaced
+    """
+
+    def __init__(self, connect, max_sessions=2, idle_timeout=60.0, max_messages=100):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self._connect = connect
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._counters = {"sessions_opened": 0, "messages_sent": 0}
+
+    @contextmanager
+    def session(self):
+        """Check out a session for one or more sends: `with pool.session() as session: ...`"""
+        self._slots.acquire()
+        session = None
+        try:
+            session = self._checkout()
+            yield session
+        except Exception:
+            if session is not None and not self._is_usable(session):
+                session.close()
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+
+    def _checkout(self):
+        expired = []
+        session = None
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if now - candidate.last_used < self.idle_timeout:
+                    session = candidate
+                    break
+                expired.append(candidate)
+        for stale in expired:
+            stale.close()
+
+        if session is None:
+            session = SMTPSession(self._connect)
+            with self._lock:
+                self._counters["sessions_opened"] += 1
+        session.sent_before_checkout = session.messages
+        return session
+
+    def _checkin(self, session):
+        with self._lock:
+            self._counters["messages_sent"] += session.messages - session.sent_before_checkout
+        if session.messages >= self.max_messages:
+            session.close()
+            return
+        with self._lock:
+            self._idle.append(session)
+
+    @staticmethod
+    def _is_usable(session):
+        try:
+            return session.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def stats(self):
+        """Snapshot of idle sessions and counters for monitoring"""
+        with self._lock:
+            return {"idle": len(self._idle), **self._counters}
+
+    def close(self):
+        """Close all idle sessions"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for session in idle:
+            session.close()
+
+_smtp_pools = {}
+_smtp_pools_lock = threading.Lock()
+
+def get_smtp_pool(smtp_server: str, smtp_port: int, sender_email: str, sender_password: str,
+                  use_tls: bool = True) -> SMTPSessionPool:
+    """Return the process-wide session pool for an SMTP server and account, creating it on first use"""
+    key = (smtp_server, smtp_port, sender_email, sender_password, use_tls)
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            def connect():
+                server = smtplib.SMTP(smtp_server, smtp_port, timeout=SMTP_SESSION_CONFIG['timeout'])
+                try:
+                    if use_tls:
+                        server.starttls()  # Enable TLS encryption
+                    server.login(sender_email, sender_password)
+                except Exception:
+                    server.close()
+                    raise
+                return server
+
+            pool = SMTPSessionPool(
+                connect,
+                max_sessions=SMTP_SESSION_CONFIG['max_sessions'],
+                idle_timeout=SMTP_SESSION_CONFIG['idle_timeout'],
+                max_messages=SMTP_SESSION_CONFIG['max_messages']
+            )
+            _smtp_pools[key] = pool
+        return pool
+
+def close_smtp_pools():
+    """Close every pooled SMTP session (called on application shutdown)"""
+    with _smtp_pools_lock:
+        pools = list(_smtp_pools.values())
+        _smtp_pools.clear()
+    for pool in pools:
+        pool.close()
+
 class EmailHelper:
     """Helper class for sending emails via Google SMTP server (Gmail)"""
     
@@ -22,6 +204,7 @@ class EmailHelper:
         self.sender_password = sender_password or os.getenv("GMAIL_PASSWORD")
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.use_tls = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
         
         if not self.sender_email or not self.sender_password:
             raise ValueError("Gmail credentials not provided. Set GMAIL_ADDRESS and GMAIL_PASSWORD in .env file")
@@ -55,36 +238,11 @@ class EmailHelper:
             Exception: If email sending fails
         """
         try:
-            # Create message
-            message = MIMEMultipart()
-            message["From"] = self.sender_email
-            message["To"] = recipient_email
-            message["Subject"] = subject
-            
-            # Add CC and BCC if provided
-            if cc:
-                message["Cc"] = ", ".join(cc)
-            
-            # Add body
-            content_type = "html" if is_html else "plain"
-            message.attach(MIMEText(body, content_type))
-            
-            # Add attachments if provided
-            if attachments:
-                self._attach_files(message, attachments)
+            message, recipients = self._build_message(recipient_email, subject, body, is_html, cc, bcc, attachments)
             
-            # Prepare recipients list
-            recipients = [recipient_email]
-            if cc:
-                recipients.extend(cc)
-            if bcc:
-                recipients.extend(bcc)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Enable TLS encryption
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipients, message.as_string())
+            # Send email over a pooled, already authenticated session
+            with self._pool().session() as session:
+                session.sendmail(self.sender_email, recipients, message)
             
             return {
                 "status": "success",
@@ -99,6 +257,59 @@ class EmailHelper:
         except Exception as e:
             raise Exception(f"Error sending email: {str(e)}")
     
+    def send_batch(self, emails: List[dict]) -> List[dict]:
+        """
+        Send several different emails over one SMTP session.
+        
+        Args:
+            emails: List of dicts taking the send_email keyword arguments
+                (recipient_email, subject, body and optionally is_html, cc, bcc, attachments)
+        
+        Returns:
+            One result dict per email, in order, with status "success" or "failed"
+        
+        Raises:
+            Exception: If no SMTP session can be opened (e.g. authentication fails)
+        """
+        results = []
+        try:
+            with self._pool().session() as session:
+                for email in emails:
+                    recipient = email["recipient_email"]
+                    try:
+                        message, recipients = self._build_message(
+                            recipient,
+                            email["subject"],
+                            email["body"],
+                            email.get("is_html", False),
+                            email.get("cc"),
+                            email.get("bcc"),
+                            email.get("attachments")
+                        )
+                        session.sendmail(self.sender_email, recipients, message)
+                        results.append({
+                            "status": "success",
+                            "message": f"Email sent successfully to {recipient}",
+                            "recipient": recipient
+                        })
+                    except (smtplib.SMTPServerDisconnected, smtplib.SMTPAuthenticationError):
+                        # The session could not be re-established; fail the rest of the batch below
+                        raise
+                    except Exception as e:
+                        results.append({"status": "failed", "recipient": recipient, "error": str(e)})
+        except smtplib.SMTPAuthenticationError:
+            error = "Gmail authentication failed. Check GMAIL_ADDRESS and GMAIL_PASSWORD in .env"
+            if not results:
+                raise Exception(error)
+            results.extend({"status": "failed", "recipient": email["recipient_email"], "error": error}
+                           for email in emails[len(results):])
+        except Exception as e:
+            if not results:
+                raise Exception(f"Error sending email: {str(e)}")
+            results.extend({"status": "failed", "recipient": email["recipient_email"], "error": str(e)}
+                           for email in emails[len(results):])
+        return results
+    
     def send_bulk_email(
         self,
         recipients: List[str],
@@ -128,24 +339,23 @@ class EmailHelper:
             "details": []
         }
         
-        for recipient in recipients:
-            try:
-                result = self.send_email(
-                    recipient_email=recipient,
-                    subject=subject,
-                    body=body,
-                    is_html=is_html,
-                    attachments=attachments
-                )
-                results["successful"] += 1
-                results["details"].append(result)
-            except Exception as e:
-                results["failed"] += 1
-                results["details"].append({
-                    "status": "failed",
-                    "recipient": recipient,
-                    "error": str(e)
-                })
+        try:
+            details = self.send_batch([
+                {
+                    "recipient_email": recipient,
+                    "subject": subject,
+                    "body": body,
+                    "is_html": is_html,
+                    "attachments": attachments
+                }
+                for recipient in recipients
+            ])
+        except Exception as e:
+            details = [{"status": "failed", "recipient": recipient, "error": str(e)} for recipient in recipients]
+        
+        for result in details:
+            results["successful" if result["status"] == "success" else "failed"] += 1
+            results["details"].append(result)
         
         return results
     
@@ -182,6 +392,52 @@ class EmailHelper:
             attachments=attachments
         )
     
+    def _pool(self) -> SMTPSessionPool:
+        return get_smtp_pool(self.smtp_server, self.smtp_port, self.sender_email, self.sender_password, self.use_tls)
+    
+    def _build_message(
+        self,
+        recipient_email: str,
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        cc: Optional[List[str]] = None,
+        bcc: Optional[List[str]] = None,
+        attachments: Optional[List[str]] = None
+    ):
+        """
+        Build the MIME message for one email.
+        
+        Returns:
+            Tuple of (message string, list of all envelope recipients)
+        """
+        # Create message
+        message = MIMEMultipart()
+        message["From"] = self.sender_email
+        message["To"] = recipient_email
+        message["Subject"] = subject
+        
+        # Add CC and BCC if provided
+        if cc:
+            message["Cc"] = ", ".join(cc)
+        
+        # Add body
+        content_type = "html" if is_html else "plain"
+        message.attach(MIMEText(body, content_type))
+        
+        # Add attachments if provided
+        if attachments:
+            self._attach_files(message, attachments)
+        
+        # Prepare recipients list
+        recipients = [recipient_email]
+        if cc:
+            recipients.extend(cc)
+        if bcc:
+            recipients.extend(bcc)
+        
+        return message.as_string(), recipients
+    
     @staticmethod
     def _attach_files(message: MIMEMultipart, file_paths: List[str]) -> None:
         """
@@ -0,0 +1,239 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from utils.database import get_db_connection
+from utils.email_helper import EmailHelper
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CONFIG = {
+    'workers': int(os.getenv('EMAIL_OUTBOX_WORKERS', '1')),
+    'poll_interval': float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', '5')),
+    'batch_size': int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '20')),
+    'max_attempts': int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5')),
+    'backoff_base': float(os.getenv('EMAIL_OUTBOX_BACKOFF_BASE', '30')),
+    'backoff_max': float(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', '3600')),
+    'lock_timeout': float(os.getenv('EMAIL_OUTBOX_LOCK_TIMEOUT', '300'))
+}
+
+# Outbox row states: pending -> sending -> sent, or back to pending with a later
+# next_attempt_at on failure, or dead once max_attempts is reached
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_DEAD = "dead"
+
+def enqueue_email(cursor, recipient_email: str, subject: str, body: str, is_html: bool = True) -> None:
+    """
+    Queue an email for background delivery.
+
+    Runs on the caller's cursor, so the email is committed (or rolled back) together
+    with the rest of the caller's transaction. Call wake_outbox_workers() after the
+    commit to have it delivered right away rather than on the next poll.
+    """
+    cursor.execute(
+        """
+        INSERT INTO [dbo].[EmailOutbox] (recipient_email, subject, body, is_html, status, attempts, next_attempt_at, created_at)
+        VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+        """,
+        (recipient_email, subject, body, is_html, STATUS_PENDING, datetime.now(), datetime.now())
+    )
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt after the given number of failures"""
+    return min(OUTBOX_CONFIG['backoff_max'], OUTBOX_CONFIG['backoff_base'] * (2 ** (attempts - 1)))
+
+def claim_batch(batch_size: int):
+    """
+    Lock up to batch_size due emails for this worker.
+
+    Rows are moved to "sending" with a lease (locked_until), and READPAST lets several
+    workers or processes claim different rows concurrently. Rows left in "sending" by a
+    worker that died are picked up again once their lease has expired. Every claim
+    counts as an attempt, so an email whose sends keep dying with their worker is
+    dead-lettered after max_attempts like one whose sends keep failing.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        now = datetime.now()
+        cursor.execute(
+            """
+            UPDATE [dbo].[EmailOutbox] WITH (UPDLOCK, READPAST, ROWLOCK)
+            SET status = ?, locked_until = NULL,
+                last_error = COALESCE(last_error, 'Delivery lease expired')
+            OUTPUT inserted.email_id, inserted.recipient_email, inserted.attempts
+            WHERE status = ? AND locked_until < ? AND attempts >= ?
+            """,
+            (STATUS_DEAD, STATUS_SENDING, now, OUTBOX_CONFIG['max_attempts'])
+        )
+        for email_id, recipient_email, attempts in cursor.fetchall():
+            logger.error(f"Email {email_id} to {recipient_email} moved to dead letter after {attempts} attempts: delivery lease expired")
+
+        cursor.execute(
+            """
+            UPDATE TOP (?) [dbo].[EmailOutbox] WITH (UPDLOCK, READPAST, ROWLOCK)
+            SET status = ?, locked_until = ?, attempts = attempts + 1
+            OUTPUT inserted.email_id, inserted.recipient_email, inserted.subject,
+                   inserted.body, inserted.is_html, inserted.attempts
+            WHERE (status = ? AND next_attempt_at <= ?)
+               OR (status = ? AND locked_until < ?)
+            """,
+            (batch_size, STATUS_SENDING, now + timedelta(seconds=OUTBOX_CONFIG['lock_timeout']),
+             STATUS_PENDING, now, STATUS_SENDING, now)
+        )
+        rows = cursor.fetchall()
+        conn.commit()
+
+        return [
+            {
+                "email_id": row[0],
+                "recipient_email": row[1],
+                "subject": row[2],
+                "body": row[3],
+                "is_html": bool(row[4]),
+                "attempts": row[5]
+            }
+            for row in rows
+        ]
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+def mark_sent(email_id: int) -> None:
+    """Record a successful delivery (the body is cleared, as it may contain a temporary password)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "UPDATE [dbo].[EmailOutbox] SET status = ?, sent_at = ?, "
+            "locked_until = NULL, last_error = NULL, body = '' WHERE email_id = ?",
+            (STATUS_SENT, datetime.now(), email_id)
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def mark_failed(email: dict, error: str) -> None:
+    """Schedule a retry with exponential backoff, or dead-letter the email after max_attempts"""
+    # claim_batch already counted this attempt
+    attempts = email["attempts"]
+    if attempts >= OUTBOX_CONFIG['max_attempts']:
+        status, next_attempt_at = STATUS_DEAD, datetime.now()
+    else:
+        status, next_attempt_at = STATUS_PENDING, datetime.now() + timedelta(seconds=retry_delay(attempts))
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "UPDATE [dbo].[EmailOutbox] SET status = ?, attempts = ?, next_attempt_at = ?, "
+            "locked_until = NULL, last_error = ? WHERE email_id = ?",
+            (status, attempts, next_attempt_at, error[:1000], email["email_id"])
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if status == STATUS_DEAD:
+        logger.error(f"Email {email['email_id']} to {email['recipient_email']} moved to dead letter after {attempts} attempts: {error}")
+    else:
+        logger.warning(f"Email {email['email_id']} to {email['recipient_email']} failed (attempt {attempts}), retrying: {error}")
+
+def deliver_batch(batch_size: int = None) -> int:
+    """Claim and send one batch of due emails; returns the number of emails claimed"""
+    emails = claim_batch(batch_size or OUTBOX_CONFIG['batch_size'])
+    if not emails:
+        return 0
+
+    try:
+        # One SMTP session for the whole batch
+        results = EmailHelper().send_batch([
+            {
+                "recipient_email": email["recipient_email"],
+                "subject": email["subject"],
+                "body": email["body"],
+                "is_html": email["is_html"]
+            }
+            for email in emails
+        ])
+    except Exception as e:
+        results = [{"status": "failed", "error": str(e)} for _ in emails]
+
+    for email, result in zip(emails, results):
+        if result["status"] == "success":
+            mark_sent(email["email_id"])
+        else:
+            mark_failed(email, result["error"])
+    return len(emails)
+
+def get_outbox_stats():
+    """Count outbox emails per status for monitoring"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT status, COUNT(*) FROM [dbo].[EmailOutbox] GROUP BY status")
+        counts = {STATUS_PENDING: 0, STATUS_SENDING: 0, STATUS_SENT: 0, STATUS_DEAD: 0}
+        counts.update({row[0]: row[1] for row in cursor.fetchall()})
+        return counts
+    finally:
+        cursor.close()
+        conn.close()
+
+# ============== BACKGROUND WORKERS ==============
+
+_workers = []
+_stop_event = threading.Event()
+_wake_event = threading.Event()
+_workers_lock = threading.Lock()
+
+def wake_outbox_workers() -> None:
+    """Ask idle workers to poll now instead of waiting for the next poll interval"""
+    _wake_event.set()
+
+def _worker_loop():
+    while not _stop_event.is_set():
+        try:
+            claimed = deliver_batch()
+        except Exception as e:
+            logger.warning(f"Email outbox worker could not poll the outbox: {str(e)}")
+            claimed = 0
+
+        # Keep draining while full batches come back; otherwise sleep until woken
+        if claimed < OUTBOX_CONFIG['batch_size']:
+            _wake_event.wait(OUTBOX_CONFIG['poll_interval'])
+            _wake_event.clear()
+
+def start_outbox_workers() -> None:
+    """Start the background delivery threads (called on application startup)"""
+    with _workers_lock:
+        if _workers:
+            return
+        _stop_event.clear()
+        for index in range(OUTBOX_CONFIG['workers']):
+            worker = threading.Thread(target=_worker_loop, name=f"email-outbox-{index}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+def stop_outbox_workers(timeout: float = 10.0) -> None:
+    """Stop the background delivery threads (called on application shutdown)"""
+    with _workers_lock:
+        _stop_event.set()
+        _wake_event.set()
+        for worker in _workers:
+            worker.join(timeout)
+        _workers.clear()
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Optional, Type
+from fastapi import Response
+from pydantic import BaseModel
+
+def collection_etag(model: Type[BaseModel], *parts) -> str:
+    """
+    Build a weak ETag for a list response from its version summary.
+
+    Args:
+        model: Response model of one item; its fields are part of the tag so a
+            release that changes the response shape invalidates cached copies
+        parts: Version summary of the rows (e.g. from build_version_query) plus any
+            request parameters that select them (limit, after_id)
+
+    Returns:
+        ETag header value, e.g. W/"3f2a..."
+    """
+    key = repr((model.__name__, tuple(model.model_fields), parts))
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+def set_etag(response: Response, etag: str) -> None:
+    """Set the ETag on a 200 response; no-cache makes clients revalidate before reusing it"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a client whose cached copy is still current"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
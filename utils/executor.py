@@ -0,0 +1,76 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from utils.database import POOL_CONFIG, DB_BACKEND
+
+load_dotenv()
+
+# One worker per pooled connection by default, so a worker never blocks waiting
+# for a connection that another worker is holding
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', str(POOL_CONFIG['max_size'])))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Sync CRUD function -> native async implementation used when DB_BACKEND=async
+_async_implementations = {}
+
+def async_counterpart(sync_func):
+    """
+    Register the decorated coroutine as the async-backend implementation of sync_func.
+
+    Both implementations must accept the same arguments and return the same data.
+    Stack it under @staticmethod inside a CRUD class:
+
+        @staticmethod
+        @async_counterpart(get_attendance)
+        async def get_attendance_async(attendance_id: int): ...
+    """
+    target = getattr(sync_func, "__func__", sync_func)
+
+    def decorator(async_func):
+        _async_implementations[target] = async_func
+        return async_func
+    return decorator
+
+def get_db_executor():
+    """Return the thread pool used for blocking database calls, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="db-worker"
+                )
+    return _executor
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run a blocking CRUD call on the database thread pool and await its result.
+
+    Keeps pyodbc round trips off the event loop so one slow query does not stall
+    every other request on the worker. With DB_BACKEND=async, functions that have
+    a registered async counterpart are awaited directly instead.
+
+    Example:
+        attendance = await run_db(AttendanceCRUD.get_attendance, attendance_id)
+    """
+    if DB_BACKEND == "async":
+        async_func = _async_implementations.get(func)
+        if async_func is not None:
+            return await async_func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """Stop the database thread pool (called on application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
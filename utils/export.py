@@ -0,0 +1,116 @@
+import csv
+import io
+import threading
+import anyio
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from utils.executor import run_db
+from utils.responses import json_dumps
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+EXPORT_CHUNK_SIZE = 1000
+
+def _ndjson_chunks(chunks):
+    """Turn chunks of record dicts into NDJSON, one bytes string per chunk"""
+    for records in chunks:
+        yield b"".join(json_dumps(record) + b"\n" for record in records)
+
+def _csv_chunks(chunks):
+    """Turn chunks of record dicts into CSV text (header first), one string per chunk"""
+    buffer = io.StringIO()
+    writer = None
+    for records in chunks:
+        if not records:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(records[0].keys()))
+            writer.writeheader()
+        writer.writerows(records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+class _ChunkReader:
+    """
+    Pulls serialized chunks from the blocking export generators, one call at a time.
+
+    A fetch whose request was cancelled keeps running on the database pool; the
+    lock makes close() wait for it instead of closing the generator under it.
+    """
+
+    def __init__(self, body, chunks):
+        self._body = body
+        self._chunks = chunks
+        self._lock = threading.Lock()
+
+    def read(self):
+        with self._lock:
+            return next(self._body, None)
+
+    def close(self) -> None:
+        """Close the generators, which releases the cursor and connection of the export"""
+        with self._lock:
+            self._body.close()
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+
+async def _stream_chunks(reader: _ChunkReader, first):
+    """Yield the export body, reading each chunk on the database pool"""
+    chunk = first
+    while chunk is not None:
+        yield chunk
+        chunk = await run_db(reader.read)
+
+class ExportResponse(StreamingResponse):
+    """
+    StreamingResponse over a _ChunkReader that closes the reader as soon as the
+    response ends: exhausted, failed, or cancelled because the client disconnected.
+    """
+
+    def __init__(self, reader: _ChunkReader, first, **kwargs):
+        self.reader = reader
+        super().__init__(_stream_chunks(reader, first), **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Shielded so the connection is released even while the request is being cancelled
+            with anyio.CancelScope(shield=True):
+                await run_db(self.reader.close)
+
+async def export_response(chunks, export_format: str, filename: str) -> StreamingResponse:
+    """
+    Stream chunks of records as NDJSON or CSV.
+
+    The first chunk is fetched before the response starts, so connection and query
+    errors still surface as a normal error response instead of a truncated body.
+    Every chunk is fetched and serialized on the database pool, and the export's
+    connection is released as soon as the stream ends, fails or the client goes away.
+
+    Args:
+        chunks: Generator yielding lists of record dicts (e.g. one list per cursor.fetchmany)
+        export_format: "ndjson" or "csv"
+        filename: Download filename without extension
+
+    Returns:
+        StreamingResponse that serializes each chunk as it is fetched
+    """
+    body = _csv_chunks(chunks) if export_format == "csv" else _ndjson_chunks(chunks)
+    reader = _ChunkReader(body, chunks)
+    try:
+        first = await run_db(reader.read)
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await run_db(reader.close)
+        raise
+    return ExportResponse(
+        reader, first,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
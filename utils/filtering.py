@@ -0,0 +1,181 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+from fastapi import Depends, HTTPException, Query
+from pydantic import TypeAdapter, ValidationError
+from utils.pagination import PageParams
+
+# Most values one "in" filter may list
+MAX_FILTER_VALUES = 100
+
+EQUALITY_OPERATORS = {"eq": "=", "in": "IN"}
+RANGE_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+class FilterField:
+    """
+    A column the list endpoints of an entity may filter, and optionally sort, on.
+
+    Only indexed columns belong in an entity's filter table, so every filter the
+    API accepts can seek an index instead of scanning the table.
+
+    Args:
+        column: Column in the entity's SELECT (e.g. "a.marked_at")
+        value_type: Type filter values are parsed to (str, int, bool, date or datetime);
+            datetime fields also accept a plain date, meaning midnight
+        range: Also allow gt / gte / lt / lte, not just eq / in
+        sortable: Allow sort on this field; only NOT NULL columns, so keyset
+            cursors never have to compare NULLs
+        cast: SQL type parameters are cast to before comparing (e.g. "DATETIME", so a
+            cursor's datetime matches the stored value exactly rather than as datetime2)
+    """
+
+    def __init__(self, column: str, value_type: type, range: bool = False, sortable: bool = False,
+                 cast: Optional[str] = None):
+        self.column = column
+        self.value_type = value_type
+        self.operators = {**EQUALITY_OPERATORS, **RANGE_OPERATORS} if range else dict(EQUALITY_OPERATORS)
+        self.sortable = sortable
+        self.placeholder = f"CAST(? AS {cast})" if cast else "?"
+        self._adapter = TypeAdapter(Union[datetime, date] if value_type is datetime else value_type)
+
+    def parse(self, name: str, value):
+        """
+        Parse one filter value (or cursor sort key) for this field.
+
+        Raises:
+            ValueError: If the value is not of the field's type
+        """
+        try:
+            return self._adapter.validate_python(value)
+        except ValidationError:
+            raise ValueError(f"Invalid value '{value}' for '{name}'")
+
+class ListQuery:
+    """
+    Filters and sort of one list request, compiled to SQL.
+
+    Passed to build_page_query / build_version_query, which add the conditions and
+    order the page by the sort field with the primary key as tie-breaker.
+    """
+
+    def __init__(self, conditions: List[str], params: list, sort: Optional[str] = None,
+                 sort_field: Optional[str] = None, field: Optional[FilterField] = None, after_key=None):
+        self.conditions = conditions
+        self.params = params
+        self.sort = sort
+        self.sort_field = sort_field
+        self.descending = bool(sort and sort.startswith("-"))
+        self._field = field
+        self.after_key = after_key
+
+    @property
+    def sorted(self) -> bool:
+        return self._field is not None
+
+    @property
+    def key(self):
+        """Hashable description of the filters and sort (e.g. for ETags)"""
+        return (tuple(self.conditions), tuple(map(repr, self.params)), self.sort, repr(self.after_key))
+
+    def apply(self, id_column: str, conditions: List[str], params: list, after_id: Optional[int]) -> str:
+        """
+        Add the filters and the keyset condition after after_id to conditions / params.
+
+        Returns:
+            ORDER BY list for the page
+        """
+        conditions.extend(self.conditions)
+        params.extend(self.params)
+
+        if not self.sorted:
+            if after_id is not None:
+                conditions.append(f"{id_column} > ?")
+                params.append(after_id)
+            return id_column
+
+        # The key follows the sort direction, so an index on the sort column (which
+        # carries the clustered key) returns the rows in order either way
+        column, placeholder = self._field.column, self._field.placeholder
+        direction = " DESC" if self.descending else ""
+        if after_id is not None:
+            op = "<" if self.descending else ">"
+            conditions.append(f"({column} {op} {placeholder} OR ({column} = {placeholder} AND {id_column} {op} ?))")
+            params.extend([self.after_key, self.after_key, after_id])
+        return f"{column}{direction}, {id_column}{direction}"
+
+def compile_list_query(fields: Dict[str, FilterField], filters: List[str], sort: Optional[str],
+                       page: Optional[PageParams] = None) -> ListQuery:
+    """
+    Compile filter expressions and a sort into a ListQuery.
+
+    Args:
+        fields: The entity's filter table (response field name -> FilterField)
+        filters: Expressions of the form field:operator:value, combined with AND;
+            "in" takes values separated by | (e.g. status:in:pending|overdue)
+        sort: Field to sort on, prefixed with - for descending (e.g. -due_date)
+        page: Pagination of the request; a cursor must come from the same sort
+
+    Raises:
+        ValueError: If a field, operator, value or cursor is not allowed
+    """
+    conditions = []
+    params = []
+    for expression in filters:
+        name, _, rest = expression.partition(":")
+        operator, _, value = rest.partition(":")
+        field = fields.get(name)
+        if field is None:
+            raise ValueError(f"Unknown filter field '{name}' (allowed: {', '.join(fields)})")
+        if operator not in field.operators:
+            raise ValueError(f"Unsupported operator '{operator}' for '{name}' (allowed: {', '.join(field.operators)})")
+
+        if operator == "in":
+            values = [field.parse(name, item) for item in value.split("|")]
+            if len(values) > MAX_FILTER_VALUES:
+                raise ValueError(f"At most {MAX_FILTER_VALUES} values can be listed for '{name}'")
+            conditions.append(f"{field.column} IN ({', '.join([field.placeholder] * len(values))})")
+            params.extend(values)
+        else:
+            conditions.append(f"{field.column} {field.operators[operator]} {field.placeholder}")
+            params.append(field.parse(name, value))
+
+    after_sort = page.after_sort if page is not None and page.after_id is not None else None
+    if sort is None:
+        if after_sort is not None:
+            raise ValueError("Pagination cursor does not match sort")
+        return ListQuery(conditions, params)
+
+    sort_field = sort.removeprefix("-")
+    field = fields.get(sort_field)
+    if field is None or not field.sortable:
+        sortable = [name for name, candidate in fields.items() if candidate.sortable]
+        raise ValueError(f"Cannot sort on '{sort_field}' (allowed: {', '.join(sortable)})")
+
+    after_key = None
+    if page is not None and page.after_id is not None:
+        if after_sort != sort:
+            raise ValueError("Pagination cursor does not match sort")
+        after_key = field.parse(sort_field, page.after_key)
+    return ListQuery(conditions, params, sort, sort_field, field, after_key)
+
+class ListParams:
+    """
+    filter and sort query parameters of an entity's list endpoints, used as a
+    FastAPI dependency: Depends(ListParams(INVOICE_FILTERS)).
+
+    - **filter**: field:operator:value, repeatable (e.g. ?filter=status:eq:pending&filter=due_date:lt:2024-07-01)
+    - **sort**: Field to sort on, - prefix for descending (e.g. ?sort=-due_date)
+    """
+
+    def __init__(self, fields: Dict[str, FilterField]):
+        self.fields = fields
+
+    def __call__(
+        self,
+        page: PageParams = Depends(),
+        filter: Optional[List[str]] = Query(None, description="field:operator:value (operators eq, in, gt, gte, lt, lte; in values separated by |), repeatable"),
+        sort: Optional[str] = Query(None, description="Field to sort on, prefixed with - for descending")
+    ) -> ListQuery:
+        try:
+            return compile_list_query(self.fields, filter or [], sort, page)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,205 @@
+import glob
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import uuid
+from dotenv import load_dotenv
+from utils.reference_cache import add_invalidation_listener, get_reference_cache
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed when INVALIDATION_BUS=redis
+    redis = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_BUS_CONFIG = {
+    # "local" (UNIX datagram sockets between workers on one host), "redis" or "none"
+    'backend': os.getenv('INVALIDATION_BUS', 'local').lower(),
+    'socket_dir': os.getenv('INVALIDATION_BUS_DIR', os.path.join(tempfile.gettempdir(), 'activity-api-invalidations')),
+    'redis_url': os.getenv('INVALIDATION_BUS_REDIS_URL', 'redis://localhost:6379/0'),
+    'redis_channel': os.getenv('INVALIDATION_BUS_CHANNEL', 'activity-api:invalidations')
+}
+
+class UnixSocketChannel:
+    """
+    Broadcast channel between the workers of one host.
+
+    Each worker binds a datagram socket in socket_dir; publishing sends the message
+    to every other socket there. Sockets left behind by workers that exited are
+    removed when a send to them is refused.
+    """
+
+    def __init__(self, socket_dir: str):
+        self.socket_dir = socket_dir
+        self._path = os.path.join(socket_dir, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._receiver = None
+        self._sender = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self, on_message) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise Exception("INVALIDATION_BUS=local requires UNIX domain sockets; use INVALIDATION_BUS=redis on this platform")
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self._path)
+        self._receiver.settimeout(1.0)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._thread = threading.Thread(target=self._receive, args=(on_message,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def _receive(self, on_message):
+        while not self._stop_event.is_set():
+            try:
+                data = self._receiver.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            on_message(data)
+
+    def publish(self, message: bytes) -> None:
+        for path in glob.glob(os.path.join(self.socket_dir, "*.sock")):
+            if path == self._path:
+                continue
+            try:
+                self._sender.sendto(message, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker that bound this socket has exited
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning(f"Could not send cache invalidation to {path}: {str(e)}")
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+        for sock in (self._receiver, self._sender):
+            if sock is not None:
+                sock.close()
+        try:
+            os.unlink(self._path)
+        except OSError:
+            pass
+
+class RedisChannel:
+    """Broadcast channel over Redis pub/sub, for workers on several hosts"""
+
+    def __init__(self, url: str, channel: str):
+        if redis is None:
+            raise Exception(
+                "INVALIDATION_BUS=redis requires the redis package. "
+                "Install it with 'pip install redis' or set INVALIDATION_BUS=local."
+            )
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self, on_message) -> None:
+        self._thread = threading.Thread(target=self._receive, args=(on_message,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def _receive(self, on_message):
+        while not self._stop_event.is_set():
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        on_message(message["data"])
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscriber lost its Redis connection, reconnecting: {str(e)}")
+                self._stop_event.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def publish(self, message: bytes) -> None:
+        try:
+            self._client.publish(self.channel, message)
+        except Exception as e:
+            logger.warning(f"Could not publish cache invalidation: {str(e)}")
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+        self._client.close()
+
+_channel = None
+_channel_lock = threading.Lock()
+_counters = {"published": 0, "received": 0}
+
+# Identifies this worker's messages so it ignores its own broadcasts; assigned on
+# start, after any fork of preloaded workers
+_worker_id = None
+
+def _publish(cache_name: str) -> None:
+    """Invalidation listener: broadcast a local write's invalidation to the other workers"""
+    channel = _channel
+    if channel is None:
+        return
+    channel.publish(json.dumps({"origin": _worker_id, "cache": cache_name}).encode())
+    _counters["published"] += 1
+
+def _on_message(data: bytes) -> None:
+    try:
+        message = json.loads(data)
+        origin, cache_name = message["origin"], message["cache"]
+    except (ValueError, TypeError, KeyError):
+        logger.warning("Ignoring malformed cache invalidation message")
+        return
+    if origin == _worker_id:
+        return
+    # Invalidate directly (not through @invalidates) so the message is not re-broadcast
+    get_reference_cache(cache_name).invalidate()
+    _counters["received"] += 1
+
+def start_invalidation_bus() -> None:
+    """Connect this worker to the invalidation bus (called on application startup)"""
+    global _channel, _worker_id
+    backend = INVALIDATION_BUS_CONFIG['backend']
+    if backend == "none":
+        return
+    with _channel_lock:
+        if _channel is not None:
+            return
+        if backend == "redis":
+            channel = RedisChannel(INVALIDATION_BUS_CONFIG['redis_url'], INVALIDATION_BUS_CONFIG['redis_channel'])
+        elif backend == "local":
+            channel = UnixSocketChannel(INVALIDATION_BUS_CONFIG['socket_dir'])
+        else:
+            raise Exception(f"Unknown INVALIDATION_BUS '{backend}' (expected local, redis or none)")
+        _worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        channel.start(_on_message)
+        _channel = channel
+
+def stop_invalidation_bus() -> None:
+    """Disconnect from the invalidation bus (called on application shutdown)"""
+    global _channel
+    with _channel_lock:
+        if _channel is not None:
+            _channel.close()
+            _channel = None
+
+def get_invalidation_bus_stats():
+    """Backend and message counters for monitoring"""
+    return {
+        "backend": INVALIDATION_BUS_CONFIG['backend'],
+        "connected": _channel is not None,
+        "worker_id": _worker_id,
+        **_counters
+    }
+
+add_invalidation_listener(_publish)
@@ -0,0 +1,67 @@
+import json
+from typing import List, Optional
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, Field, conint
+
+# Most IDs one multi-get may ask for (GET ?ids= or POST /by-ids)
+MAX_MULTI_GET_IDS = 5000
+
+# IDs are INT columns; build_ids_query casts each one, which overflows outside this range
+MIN_ID = -2 ** 31
+MAX_ID = 2 ** 31 - 1
+
+class IdList(BaseModel):
+    ids: List[conint(ge=MIN_ID, le=MAX_ID)] = Field(..., min_length=1, max_length=MAX_MULTI_GET_IDS, description="Record IDs")
+
+def parse_ids(ids: str) -> List[int]:
+    """
+    Parse an ids query parameter ("3,1,3,2") into IDs, keeping their order.
+
+    Raises:
+        HTTPException: 400 if an ID is not an integer, is out of the INT range, or there are too many
+    """
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must contain at least one ID")
+    if len(parsed) > MAX_MULTI_GET_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MULTI_GET_IDS} ids can be requested at once")
+    if any(value < MIN_ID or value > MAX_ID for value in parsed):
+        raise HTTPException(status_code=400, detail=f"ids must be between {MIN_ID} and {MAX_ID}")
+    return parsed
+
+class IdsParams:
+    """
+    Optional ids query parameter of list endpoints, used as a FastAPI dependency.
+
+    - **ids**: Comma-separated IDs (e.g. 3,1,2) to fetch instead of the full list (optional)
+    """
+
+    def __init__(self, ids: Optional[str] = Query(None, description="Comma-separated IDs to fetch (e.g. 3,1,2) instead of the full list")):
+        self.ids = parse_ids(ids) if ids is not None else None
+
+def build_ids_query(select: str, id_column: str, ids: list):
+    """
+    Append a WHERE ... IN filter for many IDs to a SELECT.
+
+    The IDs are sent as one JSON array parameter expanded with OPENJSON, so the
+    query text and plan are the same for any number of IDs and SQL Server's
+    2100-parameter limit does not apply.
+
+    Args:
+        select: SELECT ... FROM ... statement without WHERE
+        id_column: Primary key column (e.g. "u.user_id")
+        ids: IDs to fetch (duplicates are sent once)
+
+    Returns:
+        Tuple of (query, params)
+    """
+    query = f"{select} WHERE {id_column} IN (SELECT CAST([value] AS INT) FROM OPENJSON(?))"
+    return query, [json.dumps(list(dict.fromkeys(ids)))]
+
+def order_by_ids(rows: list, id_field: str, ids: list) -> list:
+    """Return rows in the order of ids, once per ID; IDs with no row are skipped"""
+    rows_by_id = {row[id_field]: row for row in rows}
+    return [rows_by_id[record_id] for record_id in dict.fromkeys(ids) if record_id in rows_by_id]
@@ -0,0 +1,161 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Query, Response
+
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _json_key(value):
+    """JSON form of a sort key (dates and datetimes as ISO 8601, decimals as strings)"""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+def encode_cursor(last_id: int, sort: Optional[str] = None, sort_key=None) -> str:
+    """Encode the last primary key of a page, plus its sort key on sorted lists, as an opaque cursor token"""
+    payload = {"id": last_id}
+    if sort is not None:
+        payload.update({"s": sort, "k": sort_key})
+    payload = json.dumps(payload, separators=(",", ":"), default=_json_key).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[int, Optional[str], Any]:
+    """
+    Decode a cursor token produced by encode_cursor.
+
+    Returns:
+        Tuple of (last_id, sort, sort_key); sort and sort_key are None for unsorted lists
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id, sort = payload["id"], payload.get("s")
+        if not isinstance(last_id, int) or not (sort is None or isinstance(sort, str)):
+            raise ValueError
+        return last_id, sort, payload.get("k")
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+class PageParams:
+    """
+    Query parameters for keyset pagination, used as a FastAPI dependency.
+
+    - **limit**: Maximum number of records to return (optional, returns all records when omitted)
+    - **after**: Cursor from the previous page's X-Next-Cursor response header (optional)
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of records to return"),
+        after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header")
+    ):
+        self.limit = limit
+        try:
+            self.after_id, self.after_sort, self.after_key = decode_cursor(after) if after else (None, None, None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+def build_page_query(select: str, id_column: str, conditions: List[str], params: list,
+                     limit: Optional[int] = None, after_id: Optional[int] = None, list_query=None):
+    """
+    Append WHERE conditions plus keyset pagination on the IDENTITY key to a SELECT.
+
+    Args:
+        select: SELECT ... FROM ... statement without WHERE or ORDER BY
+        id_column: Primary key column to page on (e.g. "a.attendance_id")
+        conditions: WHERE conditions with ? placeholders, joined with AND
+        params: Parameters for the conditions
+        limit: Page size (None returns every matching row)
+        after_id: Only return rows with a key greater than this
+        list_query: Client filters and sort (utils.filtering.ListQuery); on a sorted
+            list, after_id continues after the cursor's sort key instead
+
+    Returns:
+        Tuple of (query, params)
+    """
+    conditions = list(conditions)
+    params = list(params)
+    order_by = _apply_keyset(id_column, conditions, params, after_id, list_query)
+
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order_by}"
+
+    if limit is not None:
+        query += " OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+        params.append(limit)
+
+    return query, params
+
+def _apply_keyset(id_column: str, conditions: List[str], params: list, after_id: Optional[int], list_query) -> str:
+    """Add the filters and keyset condition to conditions / params; return the ORDER BY list"""
+    if list_query is not None:
+        return list_query.apply(id_column, conditions, params, after_id)
+    if after_id is not None:
+        conditions.append(f"{id_column} > ?")
+        params.append(after_id)
+    return id_column
+
+def set_next_cursor(response: Response, items: list, id_field: str, limit: Optional[int], list_query=None) -> None:
+    """Set the X-Next-Cursor header when a full page was returned (carrying the sort key on sorted lists)"""
+    if limit is not None and len(items) == limit:
+        last = items[-1]
+        if list_query is not None and list_query.sorted:
+            cursor = encode_cursor(last[id_field], list_query.sort, last[list_query.sort_field])
+        else:
+            cursor = encode_cursor(last[id_field])
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+def build_version_query(from_clause: str, id_column: str, version_columns: List[str], conditions: List[str],
+                        params: list, limit: Optional[int] = None, after_id: Optional[int] = None, list_query=None):
+    """
+    Build a query summarising the rows one page of build_page_query would return.
+
+    The summary is the row count, the lowest and highest key, and the highest
+    rowversion of each version column. An insert or update of a row on the page
+    raises a rowversion; a delete lowers the count or pulls the next row (a higher
+    key) onto the page. So the summary changes whenever the page does, and it can
+    back an ETag without reading the rows. On a sorted page a row can leave or
+    join it without moving either key, so the summary adds a checksum of its keys.
+
+    Args:
+        from_clause: FROM ... (including joins) of the page's SELECT
+        id_column: Primary key column the page is keyed on (e.g. "a.attendance_id")
+        version_columns: rowversion columns covering every table the page reads
+        conditions: WHERE conditions with ? placeholders, joined with AND
+        params: Parameters for the conditions
+        limit: Page size (None summarises every matching row)
+        after_id: Only summarise rows with a key greater than this
+        list_query: Client filters and sort, as passed to build_page_query
+
+    Returns:
+        Tuple of (query, params); the query returns one row of
+        (count, min key, max key, max version per version column)
+    """
+    conditions = list(conditions)
+    params = list(params)
+    order_by = _apply_keyset(id_column, conditions, params, after_id, list_query)
+
+    columns = [f"{id_column} AS row_id"] + [f"{column} AS v{index}" for index, column in enumerate(version_columns)]
+    top = ""
+    if limit is not None:
+        # TOP comes before the WHERE placeholders, so its parameter goes first
+        top = "TOP (?) "
+        params.insert(0, limit)
+
+    page = f"SELECT {top}{', '.join(columns)} {from_clause}"
+    if conditions:
+        page += " WHERE " + " AND ".join(conditions)
+    if limit is not None:
+        page += f" ORDER BY {order_by}"
+
+    # rowversion is cast so the maxima come back as plain integers
+    summary = ["COUNT(*)", "MIN(row_id)", "MAX(row_id)"] + [f"MAX(CAST(v{index} AS BIGINT))" for index in range(len(version_columns))]
+    if list_query is not None and list_query.sorted:
+        summary.append("CHECKSUM_AGG(CHECKSUM(row_id))")
+    return f"SELECT {', '.join(summary)} FROM ({page}) AS page", params
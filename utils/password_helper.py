@@ -1,7 +1,107 @@
+import asyncio
+import base64
 import hashlib
+import hmac
+import os
 import secrets
 import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# scrypt cost: N=2**14, r=8 needs 16 MB per hash and takes tens of ms on one core
+PASSWORD_HASH_CONFIG = {
+    'scrypt_n': int(os.getenv('PASSWORD_SCRYPT_N', str(2 ** 14))),
+    'scrypt_r': int(os.getenv('PASSWORD_SCRYPT_R', '8')),
+    'scrypt_p': int(os.getenv('PASSWORD_SCRYPT_P', '1')),
+    # Only used when this Python's OpenSSL has no scrypt
+    'pbkdf2_iterations': int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '600000'))
+}
+
+# hashlib releases the GIL while deriving keys, so threads hash in parallel. The pool
+# bounds concurrent hashes (CPU and scrypt memory) no matter how many requests log in.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+_hash_worker_threads = threading.local()
+
+def get_hash_executor():
+    """Return the thread pool dedicated to password hashing, creating it on first use"""
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                    initializer=lambda: setattr(_hash_worker_threads, "active", True)
+                )
+    return _hash_executor
+
+def shutdown_hash_executor():
+    """Stop the password hashing pool (called on application shutdown)"""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=True)
+            _hash_executor = None
+
+def _in_hash_pool(func, *args):
+    """Run func on the hashing pool and wait for it (directly if already on a hashing thread)"""
+    if getattr(_hash_worker_threads, "active", False):
+        return func(*args)
+    return get_hash_executor().submit(func, *args).result()
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data.encode())
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=2 * 128 * r * n + 1024 * 1024, dklen=_KEY_BYTES
+    )
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=_KEY_BYTES)
+
+def _hash(password: str) -> str:
+    salt = secrets.token_bytes(_SALT_BYTES)
+    if hasattr(hashlib, "scrypt"):
+        n, r, p = PASSWORD_HASH_CONFIG['scrypt_n'], PASSWORD_HASH_CONFIG['scrypt_r'], PASSWORD_HASH_CONFIG['scrypt_p']
+        return f"scrypt${n}${r}${p}${_b64encode(salt)}${_b64encode(_scrypt(password, salt, n, r, p))}"
+    iterations = PASSWORD_HASH_CONFIG['pbkdf2_iterations']
+    return f"pbkdf2_sha256${iterations}${_b64encode(salt)}${_b64encode(_pbkdf2(password, salt, iterations))}"
+
+def _verify(password: str, hashed_password: str) -> bool:
+    if not hashed_password:
+        return False
+    parts = hashed_password.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            expected = _b64decode(parts[5])
+            return hmac.compare_digest(_scrypt(password, _b64decode(parts[4]), n, r, p), expected)
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            expected = _b64decode(parts[3])
+            return hmac.compare_digest(_pbkdf2(password, _b64decode(parts[2]), int(parts[1])), expected)
+    except (ValueError, TypeError):
+        return False
+    # Legacy unsalted SHA-256 hex digest
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed_password)
+
+# A valid hash to verify against when the user does not exist, so unknown emails
+# take as long to reject as wrong passwords
+_DUMMY_HASH = None
 
 class PasswordHelper:
     """Helper class for password generation, hashing, and validation"""
@@ -44,15 +144,16 @@ class PasswordHelper:
     @staticmethod
     def hash_password(password: str) -> str:
         """
-        Hash password using SHA256.
+        Hash password with a salted, memory-hard KDF (scrypt, or PBKDF2-SHA256 if
+        scrypt is unavailable) on the password hashing pool.
         
         Args:
             password: Plain text password
         
         Returns:
-            SHA256 hashed password
+            Encoded hash, e.g. "scrypt$16384$8$1$<salt>$<key>"
         """
-        return hashlib.sha256(password.encode()).hexdigest()
+        return _in_hash_pool(_hash, password)
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -61,12 +162,54 @@ class PasswordHelper:
         
         Args:
             plain_password: Plain text password to verify
-            hashed_password: SHA256 hashed password from database
+            hashed_password: Encoded hash from database (scrypt, PBKDF2 or legacy SHA256)
         
         Returns:
             True if password matches, False otherwise
         """
-        return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+        return _in_hash_pool(_verify, plain_password, hashed_password)
+    
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """hash_password for async code: awaits the hashing pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), _hash, password)
+    
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """verify_password for async code: awaits the hashing pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), _verify, plain_password, hashed_password)
+    
+    @staticmethod
+    async def verify_unknown_user_async(plain_password: str) -> bool:
+        """Spend the same hashing time as a real verification, then fail"""
+        global _DUMMY_HASH
+        if _DUMMY_HASH is None:
+            _DUMMY_HASH = await PasswordHelper.hash_password_async(secrets.token_urlsafe(16))
+        await PasswordHelper.verify_password_async(plain_password, _DUMMY_HASH)
+        return False
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """
+        Check whether a stored hash should be replaced on the next successful login.
+        
+        True for legacy SHA256 hashes, and for KDF hashes made with other parameters
+        than the current PASSWORD_HASH_CONFIG.
+        """
+        if not hashed_password:
+            return False
+        parts = hashed_password.split("$")
+        if hasattr(hashlib, "scrypt"):
+            current = [
+                "scrypt",
+                str(PASSWORD_HASH_CONFIG['scrypt_n']),
+                str(PASSWORD_HASH_CONFIG['scrypt_r']),
+                str(PASSWORD_HASH_CONFIG['scrypt_p'])
+            ]
+            return parts[:4] != current
+        return parts[:2] != ["pbkdf2_sha256", str(PASSWORD_HASH_CONFIG['pbkdf2_iterations'])]
     
     @staticmethod
     def generate_and_hash_password(length: int = 12) -> Tuple[str, str]:
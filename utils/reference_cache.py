@@ -0,0 +1,139 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REFERENCE_CACHE_CONFIG = {
+    'ttl': float(os.getenv('REFERENCE_CACHE_TTL', '300')),
+    'max_size': int(os.getenv('REFERENCE_CACHE_SIZE', '1024'))
+}
+
+class ReferenceCache:
+    """
+    TTL cache in front of the reads of one rarely-changing table (e.g. Categories).
+
+    Read methods decorated with cached_read store their result per argument tuple
+    for ttl seconds; write methods decorated with invalidates clear the whole cache
+    when they return, so get / get_all / by_org results never outlive a write made
+    through this process. A read that was loading while a write invalidated the
+    cache is returned but not stored. Cached values are shared between callers and
+    must not be mutated.
+    """
+
+    def __init__(self, name: str, ttl: float = REFERENCE_CACHE_CONFIG['ttl'],
+                 max_size: int = REFERENCE_CACHE_CONFIG['max_size']):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "expirations": 0, "evictions": 0}
+
+    def get_or_load(self, key, load):
+        """Return the cached value for key, or call load() and cache its result"""
+        if self.ttl <= 0 or self.max_size <= 0:
+            return load()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            generation = self._generation
+
+        value = load()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every cached read (called after a write to the table)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        """Snapshot of cache size, counters and hit rate for monitoring"""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None
+            }
+
+# Cache name -> ReferenceCache, one per cached table
+_caches = {}
+
+# Called with the cache name after a write in this process invalidated it, e.g. to
+# broadcast the invalidation to other workers (see utils/invalidation_bus.py)
+_invalidation_listeners = []
+
+def add_invalidation_listener(listener) -> None:
+    """Register listener(cache_name), called after every write-triggered invalidation"""
+    _invalidation_listeners.append(listener)
+
+def get_reference_cache(name: str) -> ReferenceCache:
+    """Return the process-wide cache for a table, creating it on first use"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches.setdefault(name, ReferenceCache(name))
+    return cache
+
+def get_reference_cache_stats():
+    """Return statistics for every reference cache, keyed by name"""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+def cached_read(cache: ReferenceCache):
+    """
+    Cache the decorated CRUD read in cache, keyed by its name and arguments (list
+    arguments, such as the IDs of a multi-get, are keyed as tuples).
+
+    Stack it under @staticmethod:
+
+        @staticmethod
+        @cached_read(category_cache)
+        def get_category(category_id: int): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__name__, tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+                   tuple(sorted(kwargs.items())))
+            return cache.get_or_load(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def invalidates(cache: ReferenceCache):
+    """Invalidate cache, and notify the invalidation listeners, after the decorated CRUD write returns or raises"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache.invalidate()
+                for listener in _invalidation_listeners:
+                    listener(cache.name)
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+import os
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Type
+import orjson
+from dotenv import load_dotenv
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+load_dotenv()
+
+# Set to "false" to send list_response content back through response_model validation
+FAST_LIST_RESPONSES = os.getenv("FAST_LIST_RESPONSES", "true").lower() != "false"
+
+def _json_default(value):
+    """Serialize the types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        # As a string, like response_model output, so no precision is lost
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_dumps(content) -> bytes:
+    """
+    Encode content as JSON with orjson.
+
+    Decimal values are written as strings; date, time and datetime values as ISO 8601
+    (e.g. "2024-01-31", "09:30:00", "2024-01-31T09:30:00.123000"), matching the
+    output of pydantic's JSON mode. Non-string dict keys are converted to strings,
+    as json.dumps does.
+    """
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSONResponse, the application's default response class"""
+
+    def render(self, content) -> bytes:
+        return json_dumps(content)
+
+@lru_cache(maxsize=None)
+def _field_names(model: Type[BaseModel]) -> frozenset:
+    return frozenset(model.model_fields)
+
+def list_response(items: list, model: Type[BaseModel], response: Optional[Response] = None):
+    """
+    Return a list of row dicts without response_model re-validation (opt-in fast path).
+
+    For large list endpoints whose CRUD rows already carry the model's fields and
+    types (e.g. from fetch_dicts). Keep response_model=List[Model] on the route for
+    the OpenAPI schema; FastAPI sends a returned Response as-is. Keys that are not
+    fields of the model are dropped, as response_model would.
+
+    Args:
+        items: Row dicts
+        model: Response model of one item
+        response: The endpoint's injected Response; headers set on it (e.g.
+            X-Next-Cursor) are copied to the returned response
+
+    Returns:
+        FastJSONResponse, or items unchanged when FAST_LIST_RESPONSES is off
+    """
+    if not FAST_LIST_RESPONSES:
+        return items
+
+    fields = _field_names(model)
+    if items and items[0].keys() != fields:
+        items = [{key: value for key, value in item.items() if key in fields} for item in items]
+
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key not in ("content-length", "content-type")}
+    return FastJSONResponse(items, headers=headers)
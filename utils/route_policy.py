@@ -0,0 +1,101 @@
+import threading
+from typing import Callable, NamedTuple, Optional
+
+PUBLIC = "public"
+PROTECTED = "protected"
+ROLE_REQUIRED = "role_required"
+
+class RoutePolicy(NamedTuple):
+    """Access rule for one method + route: public, any valid token, or specific roles"""
+    access: str
+    roles: frozenset = frozenset()
+
+class _Node:
+    """One path segment of the route trie"""
+
+    __slots__ = ("children", "param", "rest", "policies")
+
+    def __init__(self):
+        self.children = {}   # literal segment -> _Node
+        self.param = None    # _Node for a {param} segment
+        self.rest = None     # policies for a trailing {param:path} segment
+        self.policies = None # method -> RoutePolicy for a route ending here
+
+class RoutePolicyTable:
+    """
+    Route-to-policy lookup compiled from the application's routes.
+
+    Each route template is resolved once with resolve_template(method, template)
+    and stored in a trie of path segments, so deciding the policy of a request is a
+    walk over its path segments instead of a scan over rules. Paths that match no
+    route (which will 404) fall back to resolve_path(method, path).
+    """
+
+    def __init__(self, resolve_template: Callable[[str, str], RoutePolicy],
+                 resolve_path: Callable[[str, str], RoutePolicy]):
+        self._resolve_template = resolve_template
+        self._resolve_path = resolve_path
+        self._root = None
+        self._lock = threading.Lock()
+
+    @property
+    def compiled(self) -> bool:
+        return self._root is not None
+
+    def compile(self, routes) -> None:
+        """Build the trie from app.routes (called on startup, or on the first request)"""
+        root = _Node()
+        for route in routes:
+            path = getattr(route, "path", None)
+            if path is None:
+                continue
+            methods = getattr(route, "methods", None) or {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"}
+            policies = {method: self._resolve_template(method, path) for method in methods}
+
+            node = root
+            segments = self._segments(path)
+            for index, segment in enumerate(segments):
+                if segment.startswith("{") and segment.endswith(":path}") and index == len(segments) - 1:
+                    node.rest = {**(node.rest or {}), **policies}
+                    break
+                if segment.startswith("{") and segment.endswith("}"):
+                    node.param = node.param or _Node()
+                    node = node.param
+                else:
+                    node = node.children.setdefault(segment, _Node())
+            else:
+                # First registered route wins, as in the router
+                node.policies = {**policies, **(node.policies or {})}
+
+        with self._lock:
+            self._root = root
+
+    def resolve(self, method: str, path: str) -> RoutePolicy:
+        """Return the policy for a request method and concrete path"""
+        policies = self._match(self._root, self._segments(path), 0) if self._root is not None else None
+        if policies is not None:
+            policy = policies.get(method)
+            if policy is not None:
+                return policy
+        return self._resolve_path(method, path)
+
+    @staticmethod
+    def _segments(path: str):
+        # Split without stripping, so "/students/" stays distinct from "/students"
+        return path.split("/")[1:]
+
+    def _match(self, node: _Node, segments, index: int) -> Optional[dict]:
+        if index == len(segments):
+            return node.policies
+        segment = segments[index]
+        # Literal segments take precedence over {param} ones
+        child = node.children.get(segment)
+        if child is not None:
+            policies = self._match(child, segments, index + 1)
+            if policies is not None:
+                return policies
+        if node.param is not None and segment:
+            policies = self._match(node.param, segments, index + 1)
+            if policies is not None:
+                return policies
+        return node.rest
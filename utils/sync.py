@@ -0,0 +1,257 @@
+import base64
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, Query
+from utils.database import get_db_connection
+from utils.pagination import MAX_PAGE_SIZE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNC_PAGE_SIZE = 500
+
+SYNC_CONFIG = {
+    # Days tombstones are kept (0 keeps them indefinitely)
+    'tombstone_retention_days': float(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30')),
+    'prune_interval': float(os.getenv('SYNC_TOMBSTONE_PRUNE_INTERVAL', '3600'))
+}
+
+# Upper sync horizon: every rowversion below this is committed; rows changed by
+# transactions still in flight get a version at or above it, so a sync never skips past them.
+#
+# Lower sync horizon (SYNC_RETENTION_QUERY): tombstones older than
+# SYNC_TOMBSTONE_RETENTION_DAYS are pruned, and the highest version pruned is kept in
+# SyncRetention.pruned_through. A token below it may have missed deletes, so it is
+# answered with 410 and the client starts over with a full sync. The lower horizon is
+# read after the tombstones, so a prune that commits during the request is noticed.
+SYNC_HORIZON_QUERY = "SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT)"
+SYNC_RETENTION_QUERY = "SELECT MAX(pruned_through) FROM [dbo].[SyncRetention]"
+
+SYNC_TOKEN_EXPIRED = "Sync token has expired, start a full sync by omitting since"
+
+def encode_sync_token(version: int) -> str:
+    """Encode the last rowversion a client has seen as an opaque sync token"""
+    payload = json.dumps({"v": version}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_sync_token(token: str) -> int:
+    """
+    Decode a sync token produced by encode_sync_token.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        version = json.loads(base64.urlsafe_b64decode(padded.encode()))["v"]
+        if not isinstance(version, int) or version < 0:
+            raise ValueError
+        return version
+    except Exception:
+        raise ValueError("Invalid sync token")
+
+class SyncParams:
+    """
+    Query parameters of a /changes endpoint, used as a FastAPI dependency.
+
+    - **since**: sync_token from the previous response (optional, omit for a full sync)
+    - **limit**: Maximum number of changes to return (optional, defaults to 500)
+    """
+
+    def __init__(
+        self,
+        since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+        limit: int = Query(DEFAULT_SYNC_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of changes to return")
+    ):
+        self.limit = limit
+        try:
+            self.since_version = decode_sync_token(since) if since else 0
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+def tombstone_output(entity_type: str, id_column: str, parent_column: str) -> str:
+    """
+    OUTPUT clause that records a tombstone for every row a DELETE (or an UPDATE
+    moving rows to another parent) touches, in the same statement.
+
+    Example:
+        f"DELETE FROM [dbo].[Attendance] {tombstone_output('attendance', 'attendance_id', 'session_id')} WHERE attendance_id = ?"
+    """
+    return (f"OUTPUT '{entity_type}', deleted.{id_column}, deleted.{parent_column} "
+            "INTO [dbo].[SyncTombstones] (entity_type, entity_id, parent_id)")
+
+def build_changes_query(columns: str, from_clause: str, version_column: str, conditions: List[str], params: list,
+                        since_version: int, horizon: int, limit: int):
+    """
+    Select the rows changed after since_version, oldest change first.
+
+    Args:
+        columns: Column list of the entity's SELECT
+        from_clause: FROM ... (including joins) of the entity's SELECT
+        version_column: rowversion column of the synced table (e.g. "a.row_version")
+        conditions: Scope conditions with ? placeholders (e.g. a parent id)
+        params: Parameters for the conditions
+        since_version: Last version the client has seen
+        horizon: SYNC_HORIZON_QUERY result, read before this query
+        limit: Page size; limit + 1 rows are selected so merge_changes can tell
+            whether more changes remain
+
+    Returns:
+        Tuple of (query, params); each row carries its version as sync_version
+    """
+    conditions = list(conditions) + [f"{version_column} > CAST(? AS BINARY(8))", f"{version_column} < CAST(? AS BINARY(8))"]
+    params = [limit + 1] + list(params) + [since_version, horizon]
+    query = (f"SELECT TOP (?) {columns}, CAST({version_column} AS BIGINT) AS sync_version {from_clause}"
+             f" WHERE {' AND '.join(conditions)} ORDER BY {version_column}")
+    return query, params
+
+def build_tombstones_query(entity_type: str, table: str, id_column: str, parent_column: str,
+                           parent_id: Optional[int], since_version: int, horizon: int, limit: int):
+    """
+    Select the ids deleted from (or moved out of) the synced scope after since_version.
+
+    Tombstones of rows that exist in the scope again (moved back, or a tombstone
+    left by a move when no parent is given) are skipped.
+
+    Returns:
+        Tuple of (query, params); rows are (entity_id, version)
+    """
+    conditions = ["ts.entity_type = ?", "ts.row_version > CAST(? AS BINARY(8))", "ts.row_version < CAST(? AS BINARY(8))"]
+    params = [limit + 1, entity_type, since_version, horizon]
+    live = f"SELECT 1 FROM {table} t WHERE t.{id_column} = ts.entity_id"
+    if parent_id is not None:
+        conditions.append("ts.parent_id = ?")
+        params.append(parent_id)
+        live += f" AND t.{parent_column} = ?"
+        params.append(parent_id)
+    conditions.append(f"NOT EXISTS ({live})")
+    query = (f"SELECT TOP (?) ts.entity_id, CAST(ts.row_version AS BIGINT) FROM [dbo].[SyncTombstones] ts"
+             f" WHERE {' AND '.join(conditions)} ORDER BY ts.row_version")
+    return query, params
+
+def check_sync_retention(pruned_through: Optional[int], since_version: int) -> None:
+    """
+    Reject a sync token older than the retained tombstones (see SYNC_HORIZON_QUERY).
+
+    Args:
+        pruned_through: SYNC_RETENTION_QUERY result, read after the tombstones
+        since_version: Last version the client has seen (0 for a full sync)
+
+    Raises:
+        Exception: SYNC_TOKEN_EXPIRED if tombstones the token needs have been pruned
+    """
+    if since_version and pruned_through is not None and since_version < pruned_through:
+        raise Exception(SYNC_TOKEN_EXPIRED)
+
+def merge_changes(rows: list, tombstones: list, since_version: int, horizon: int, limit: int):
+    """
+    Merge changed rows and tombstones into one page of the change feed.
+
+    Returns:
+        Dictionary with changes (rows), deleted (ids), sync_token (pass it back as
+        since) and has_more (request again straight away when true)
+    """
+    events = [(row.pop("sync_version"), row, None) for row in rows]
+    events.extend((version, None, entity_id) for entity_id, version in tombstones)
+    events.sort(key=lambda event: event[0])
+
+    has_more = len(events) > limit
+    events = events[:limit]
+    if has_more:
+        version = events[-1][0]
+    else:
+        # Everything below the horizon has been seen, including changes outside the scope
+        version = max(since_version, horizon - 1)
+
+    return {
+        "changes": [row for _, row, _ in events if row is not None],
+        "deleted": [entity_id for _, row, entity_id in events if row is None],
+        "sync_token": encode_sync_token(version),
+        "has_more": has_more
+    }
+
+def prune_tombstones() -> int:
+    """
+    Delete the tombstones older than the retention window and raise the lower sync horizon.
+
+    Tombstones are deleted up to the highest version among the expired ones, and that
+    version is stored in the same transaction, so every token a pruned tombstone was
+    still needed for gets a 410. Returns the number of tombstones deleted.
+    """
+    if SYNC_CONFIG['tombstone_retention_days'] <= 0:
+        return 0
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cutoff = datetime.now() - timedelta(days=SYNC_CONFIG['tombstone_retention_days'])
+        cursor.execute(
+            """
+            SET NOCOUNT ON;
+            DECLARE @pruned_through BIGINT = (
+                SELECT CAST(MAX(row_version) AS BIGINT) FROM [dbo].[SyncTombstones] WHERE deleted_at < ?
+            );
+            DECLARE @deleted INT = 0;
+            UPDATE [dbo].[SyncRetention] SET pruned_through = @pruned_through, pruned_at = GETDATE()
+            WHERE pruned_through < @pruned_through;
+            IF @@ROWCOUNT > 0
+            BEGIN
+                DELETE FROM [dbo].[SyncTombstones] WHERE row_version <= CAST(@pruned_through AS BINARY(8));
+                SET @deleted = @@ROWCOUNT;
+            END
+            SELECT @deleted;
+            """,
+            (cutoff,)
+        )
+        deleted = cursor.fetchone()[0]
+        conn.commit()
+        return deleted
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+# ============== BACKGROUND PRUNING ==============
+
+_pruner = None
+_stop_event = threading.Event()
+_pruner_lock = threading.Lock()
+
+def _pruner_loop():
+    while not _stop_event.is_set():
+        try:
+            deleted = prune_tombstones()
+            if deleted:
+                logger.info(f"Pruned {deleted} sync tombstones older than {SYNC_CONFIG['tombstone_retention_days']} days")
+        except Exception as e:
+            logger.warning(f"Could not prune sync tombstones: {str(e)}")
+        _stop_event.wait(SYNC_CONFIG['prune_interval'])
+
+def start_tombstone_pruner() -> None:
+    """Start the background thread that prunes expired tombstones (called on application startup)"""
+    global _pruner
+    with _pruner_lock:
+        if _pruner is not None or SYNC_CONFIG['tombstone_retention_days'] <= 0:
+            return
+        _stop_event.clear()
+        _pruner = threading.Thread(target=_pruner_loop, name="sync-tombstone-pruner", daemon=True)
+        _pruner.start()
+
+def stop_tombstone_pruner(timeout: float = 10.0) -> None:
+    """Stop the tombstone pruning thread (called on application shutdown)"""
+    global _pruner
+    with _pruner_lock:
+        _stop_event.set()
+        if _pruner is not None:
+            _pruner.join(timeout)
+            _pruner = None